@@ -0,0 +1,264 @@
+"""ASGI serving mode for the spell checking service.
+
+Serves the unchanged Flask application from main.py, so every route and
+JSON contract stays the same, under an asyncio server:
+
+    uvicorn asgi:app --host 0.0.0.0 --port 5000
+
+Cheap requests that never touch the checker (/api/health, /api/metrics and
+static files) are handled directly on the event loop. Everything else, i.e.
+the pages and the spell checking, status and update endpoints, runs in a
+bounded thread pool, so slow clients only hold a coroutine and expensive
+corrections queue up instead of blocking health checks. Once
+SPELLCHECK_MAX_PENDING requests are queued or running, further ones are
+rejected with 503 and a Retry-After header.
+
+Request bodies are read from the client on demand and responses are sent
+as the Flask app produces them, so /api/check/stream keeps streaming.
+"""
+
+import asyncio
+import io
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from main import app as flask_app
+
+# Threads running spell checks; checks are CPU bound and share the GIL, so
+# more threads mainly help overlap request I/O
+CHECK_THREADS = int(os.environ.get("SPELLCHECK_THREADS", "4"))
+# Requests queued or running in the pool before new ones get 503
+MAX_PENDING = int(os.environ.get("SPELLCHECK_MAX_PENDING", "64"))
+# Largest body read up front for requests handled on the event loop
+MAX_INLINE_BODY = 1024 * 1024
+INLINE_METHODS = ("GET", "HEAD", "OPTIONS")
+INLINE_PATHS = ("/api/health", "/api/metrics")
+INLINE_PREFIXES = ("/static/",)
+
+Scope = Dict[str, Any]
+Receive = Callable[[], Any]
+Send = Callable[[Dict[str, Any]], Any]
+
+
+class _RequestBody(io.RawIOBase):
+    """WSGI input stream pulling ASGI body messages from a worker thread."""
+
+    def __init__(self, receive: Receive, loop: asyncio.AbstractEventLoop) -> None:
+        self._receive = receive
+        self._loop = loop
+        self._buffer = b""
+        self._more = True
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self._buffer and self._more:
+            future = asyncio.run_coroutine_threadsafe(self._receive(), self._loop)
+            message = future.result()
+            if message["type"] == "http.disconnect":
+                raise OSError("Client disconnected")
+            self._buffer = message.get("body", b"")
+            self._more = message.get("more_body", False)
+        size = min(len(buffer), len(self._buffer))
+        buffer[:size] = self._buffer[:size]
+        self._buffer = self._buffer[size:]
+        return size
+
+
+def build_environ(scope: Scope, body: io.RawIOBase) -> Dict[str, Any]:
+    """Translate an ASGI HTTP scope into a WSGI environ.
+
+    Args:
+        scope: ASGI connection scope
+        body: Stream providing the request body
+
+    Returns:
+        WSGI environ dictionary
+    """
+    server = scope.get("server") or ("localhost", 80)
+    client = scope.get("client") or ("", 0)
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": scope.get("root_path", "").encode("utf-8").decode("latin-1"),
+        "PATH_INFO": scope["path"].encode("utf-8").decode("latin-1"),
+        "QUERY_STRING": scope.get("query_string", b"").decode("latin-1"),
+        "SERVER_NAME": server[0],
+        "SERVER_PORT": str(server[1]),
+        "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+        "REMOTE_ADDR": client[0],
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": io.BufferedReader(body),
+        "wsgi.input_terminated": True,
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": False,
+        "wsgi.run_once": False,
+    }
+    for raw_name, raw_value in scope.get("headers", []):
+        name = raw_name.decode("latin-1").upper().replace("-", "_")
+        value = raw_value.decode("latin-1")
+        if name not in ("CONTENT_TYPE", "CONTENT_LENGTH"):
+            name = f"HTTP_{name}"
+        if name in environ:
+            value = f"{environ[name]},{value}"
+        environ[name] = value
+    return environ
+
+
+def is_inline(scope: Scope) -> bool:
+    """Return whether a request is cheap enough for the event loop."""
+    path = scope["path"]
+    return scope["method"] in INLINE_METHODS and (
+        path in INLINE_PATHS or path.startswith(INLINE_PREFIXES)
+    )
+
+
+def call_wsgi(environ: Dict[str, Any], send: Callable[[Dict[str, Any]], None]) -> None:
+    """Run the Flask app on environ and pass ASGI messages to send.
+
+    The response start is delayed until the first body chunk, as WSGI
+    allows the status to change until then.
+    """
+    state: Dict[str, Any] = {"started": False}
+
+    def start_response(status: str, headers: List[Tuple[str, str]], exc_info=None):
+        if exc_info and state["started"]:
+            raise exc_info[1].with_traceback(exc_info[2])
+        state["status"] = int(status.split(" ", 1)[0])
+        state["headers"] = [
+            (name.lower().encode("latin-1"), value.encode("latin-1"))
+            for name, value in headers
+        ]
+        return write
+
+    def write(data: bytes) -> None:
+        if not state["started"]:
+            state["started"] = True
+            send(
+                {
+                    "type": "http.response.start",
+                    "status": state["status"],
+                    "headers": state["headers"],
+                }
+            )
+        if data:
+            send({"type": "http.response.body", "body": data, "more_body": True})
+
+    result = flask_app(environ, start_response)
+    try:
+        for chunk in result:
+            write(chunk)
+        write(b"")
+    finally:
+        if hasattr(result, "close"):
+            result.close()
+    send({"type": "http.response.body", "body": b"", "more_body": False})
+
+
+class SpellCheckASGI:
+    """ASGI application wrapping the Flask app with a bounded check pool.
+
+    Attributes:
+        executor: Thread pool running expensive requests
+        pending: Number of requests queued or running in the pool
+        max_pending: Limit on pending before requests are rejected
+    """
+
+    def __init__(
+        self, threads: int = CHECK_THREADS, max_pending: int = MAX_PENDING
+    ) -> None:
+        """Create the application.
+
+        Args:
+            threads: Number of threads running spell checks
+            max_pending: Requests queued or running before new ones get 503
+        """
+        self.executor = ThreadPoolExecutor(
+            max_workers=threads, thread_name_prefix="spellcheck"
+        )
+        self.pending = 0
+        self.max_pending = max_pending
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "lifespan":
+            await self.lifespan(receive, send)
+        elif scope["type"] == "http":
+            if is_inline(scope):
+                await self.handle_inline(scope, receive, send)
+            else:
+                await self.handle_offloaded(scope, receive, send)
+        else:
+            raise ValueError(f"Unsupported ASGI scope type: {scope['type']}")
+
+    async def lifespan(self, receive: Receive, send: Send) -> None:
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                self.executor.shutdown(wait=True)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def handle_inline(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Serve a cheap request directly on the event loop."""
+        body = b""
+        more = True
+        while more:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+            body += message.get("body", b"")
+            more = message.get("more_body", False)
+            if len(body) > MAX_INLINE_BODY:
+                await self.reject(send, 413, "Request body too large")
+                return
+        messages: List[Dict[str, Any]] = []
+        call_wsgi(build_environ(scope, io.BytesIO(body)), messages.append)
+        for message in messages:
+            await send(message)
+
+    async def handle_offloaded(
+        self, scope: Scope, receive: Receive, send: Send
+    ) -> None:
+        """Serve an expensive request in the thread pool."""
+        if self.pending >= self.max_pending:
+            await self.reject(send, 503, "Server busy, please retry")
+            return
+        loop = asyncio.get_running_loop()
+        environ = build_environ(scope, _RequestBody(receive, loop))
+
+        def send_from_thread(message: Dict[str, Any]) -> None:
+            asyncio.run_coroutine_threadsafe(send(message), loop).result()
+
+        self.pending += 1
+        try:
+            await loop.run_in_executor(
+                self.executor, call_wsgi, environ, send_from_thread
+            )
+        finally:
+            self.pending -= 1
+
+    async def reject(
+        self, send: Send, status: int, error: str, retry_after: Optional[int] = 1
+    ) -> None:
+        """Send a JSON error response in the same shape as the Flask app."""
+        body = json.dumps({"success": False, "error": error}).encode("utf-8")
+        headers = [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode("latin-1")),
+        ]
+        if status == 503 and retry_after is not None:
+            headers.append((b"retry-after", str(retry_after).encode("latin-1")))
+        await send(
+            {"type": "http.response.start", "status": status, "headers": headers}
+        )
+        await send({"type": "http.response.body", "body": body})
+
+
+app = SpellCheckASGI()
@@ -0,0 +1,80 @@
+"""Compare /api/check with /api/check/batch throughput.
+
+Sends the same set of short texts once per request to /api/check and in
+batches of several sizes to /api/check/batch, through Flask's test client
+so that only request handling and spell checking are measured, not the
+network. The texts are drawn from a small pool of words and misspellings,
+so tokens repeat across texts as they do in real traffic.
+
+Usage:
+    python benchmarks/bench_api.py [--texts 2000] [--batch-sizes 10 100 1000]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import main as server  # noqa: E402
+
+LETTERS = "abcdefghijklmnopqrstuvwxyz"
+
+
+def make_texts(count: int, pool: int = 500, seed: int = 0):
+    """Return count short texts drawn from a pool of words and typos."""
+    rng = random.Random(seed)
+    words = sorted(w for w in server.checker.word_count if len(w) > 3)
+    tokens = rng.sample(words, pool)
+    for i in range(0, pool, 4):
+        typo = list(tokens[i])
+        typo[rng.randrange(len(typo))] = rng.choice(LETTERS)
+        tokens[i] = "".join(typo)
+    return [" ".join(rng.choices(tokens, k=rng.randint(3, 8))) for _ in range(count)]
+
+
+def post(client, url: str, payload) -> None:
+    response = client.post(
+        url, data=json.dumps(payload), content_type="application/json"
+    )
+    if response.status_code != 200:
+        raise RuntimeError(f"{url} returned {response.status_code}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--texts", type=int, default=2000)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[10, 100, 1000])
+    args = parser.parse_args()
+
+    client = server.app.test_client()
+    texts = make_texts(args.texts)
+    print(f"{len(texts)} texts, {sum(len(t.split()) for t in texts)} tokens")
+    print(f"{'endpoint':22}{'requests':>10}{'seconds':>10}{'req/s':>10}{'texts/s':>10}")
+
+    rows = []
+    start = time.perf_counter()
+    for text in texts:
+        post(client, "/api/check", {"text": text})
+    rows.append(("/api/check", len(texts), time.perf_counter() - start))
+
+    for size in args.batch_sizes:
+        batches = [texts[i : i + size] for i in range(0, len(texts), size)]
+        start = time.perf_counter()
+        for batch in batches:
+            post(client, "/api/check/batch", {"texts": batch})
+        rows.append(
+            (f"/api/check/batch x{size}", len(batches), time.perf_counter() - start)
+        )
+
+    for name, requests, seconds in rows:
+        print(
+            f"{name:22}{requests:10}{seconds:10.2f}"
+            f"{requests / seconds:10.1f}{len(texts) / seconds:10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Benchmark BK-tree radius and nearest-k queries against a linear scan.
+
+Reports the average number of distance evaluations and latency per query
+for the misspellings in tests/errors.py.
+
+Usage:
+    python benchmarks/bench_bktree.py [--corpus corpus.txt] [--radius 2]
+"""
+
+import argparse
+import functools
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from lib.checker import Checker  # noqa: E402
+from lib.distance import bounded_levenshtein  # noqa: E402
+from lib.trainer import Trainer  # noqa: E402
+from tests.errors import unigram_one  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--corpus", default="corpus.txt")
+    parser.add_argument("--radius", type=int, default=2)
+    parser.add_argument("--k", type=int, default=5)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    checker = Checker(
+        trainer=functools.partial(Trainer, corpus=args.corpus), use_bktree=True
+    )
+    print(f"load with BK-tree: {time.perf_counter() - start:.2f}s")
+    vocabulary = list(checker.word_count)
+    words = [w for wrongs in unigram_one.values() for w in wrongs.split()]
+
+    rows = []
+    for name, query in (
+        (f"radius {args.radius}", lambda w: checker.words_within(w, args.radius)),
+        (f"nearest {args.k}", lambda w: checker.nearest_words(w, args.k)),
+    ):
+        evaluations, latencies = [], []
+        for word in words:
+            start = time.perf_counter()
+            _, count = query(word)
+            latencies.append((time.perf_counter() - start) * 1e3)
+            evaluations.append(count)
+        rows.append((name, evaluations, latencies))
+
+    scan_latencies = []
+    for word in words:
+        start = time.perf_counter()
+        [
+            w
+            for w in vocabulary
+            if bounded_levenshtein(word, w, args.radius) <= args.radius
+        ]
+        scan_latencies.append((time.perf_counter() - start) * 1e3)
+    rows.append(("linear scan", [len(vocabulary)] * len(words), scan_latencies))
+
+    print(f"{len(words)} queries, vocabulary {len(vocabulary)}")
+    print(f"{'':14}{'evals':>10}{'% vocab':>10}{'mean ms':>10}{'p95 ms':>10}")
+    for name, evaluations, latencies in rows:
+        mean_evals = statistics.mean(evaluations)
+        p95 = statistics.quantiles(latencies, n=20)[-1]
+        print(
+            f"{name:14}{mean_evals:10.0f}{100 * mean_evals / len(vocabulary):10.1f}"
+            f"{statistics.mean(latencies):10.2f}{p95:10.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Compare correction cache backends across several worker processes.
+
+Starts --workers processes at once, like gunicorn workers, and has each
+correct its own stream of --words tokens drawn from the same Zipf-like
+pool of misspellings, so common typos recur across workers. Reports the
+wall time of the slowest worker and how many corrections were computed
+instead of served from the cache. With the "file" backend all workers
+share one SQLite cache, so a typo is computed once per host instead of
+once per worker.
+
+Usage:
+    python benchmarks/bench_cache.py [--corpus corpus.txt] [--workers 4]
+        [--words 20000] [--backends none lru file]
+"""
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from lib.cache import BACKENDS, create_cache  # noqa: E402
+from lib.checker import Checker  # noqa: E402
+from lib.trainer import Trainer  # noqa: E402
+
+LETTERS = "abcdefghijklmnopqrstuvwxyz"
+
+
+def make_typos(vocabulary, pool: int = 2000, seed: int = 0):
+    """Return pool distinct misspellings of vocabulary words."""
+    rng = random.Random(seed)
+    known = set(vocabulary)
+    typos = set()
+    while len(typos) < pool:
+        typo = list(rng.choice(vocabulary))
+        typo[rng.randrange(len(typo))] = rng.choice(LETTERS)
+        word = "".join(typo)
+        if word not in known:
+            typos.add(word)
+    return sorted(typos)
+
+
+def run_worker(args, seed: int) -> None:
+    """Correct one token stream and print timing and cache stats as JSON."""
+    cache = create_cache(args.worker, args.cache_size, args.cache_path)
+    # memo_size=0 so that the "none" backend really computes every typo
+    checker = Checker(
+        trainer=lambda: Trainer(corpus=args.corpus), cache=cache, memo_size=0
+    )
+    vocabulary = sorted(w for w in checker.word_count if len(w) > 3)
+    typos = make_typos(vocabulary)
+    rng = random.Random(seed)
+    weights = [1 / rank for rank in range(1, len(typos) + 1)]
+    stream = rng.choices(typos, weights=weights, k=args.words)
+    start = time.perf_counter()
+    for word in stream:
+        checker.correct(word)
+    seconds = time.perf_counter() - start
+    misses = (cache or checker._memo).stats()["misses"]
+    print(json.dumps({"seconds": seconds, "computed": misses}))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--corpus", default="corpus.txt")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--words", type=int, default=20000)
+    parser.add_argument("--cache-size", type=int, default=65536)
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=BACKENDS)
+    parser.add_argument("--cache-path", help=argparse.SUPPRESS)
+    parser.add_argument("--seed", type=int, default=0, help=argparse.SUPPRESS)
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args, args.seed)
+        return
+
+    print(f"{'backend':10}{'workers':>9}{'slowest s':>11}{'computed':>10}{'of':>9}")
+    for backend in args.backends:
+        with tempfile.TemporaryDirectory() as directory:
+            command = [
+                sys.executable,
+                __file__,
+                "--corpus",
+                args.corpus,
+                "--words",
+                str(args.words),
+                "--cache-size",
+                str(args.cache_size),
+                "--cache-path",
+                os.path.join(directory, "corrections.sqlite"),
+                "--worker",
+                backend,
+            ]
+            workers = [
+                subprocess.Popen(
+                    command + ["--seed", str(i)], stdout=subprocess.PIPE, text=True
+                )
+                for i in range(args.workers)
+            ]
+            results = [json.loads(w.communicate()[0].splitlines()[-1]) for w in workers]
+        print(
+            f"{backend:10}{args.workers:9}"
+            f"{max(r['seconds'] for r in results):11.2f}"
+            f"{sum(r['computed'] for r in results):10}"
+            f"{args.workers * args.words:9}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Benchmark candidate lookup through edits, the deletion index and the trie.
+
+Measures per-word latency of ``Checker.correct`` over the misspellings in
+tests/errors.py and verifies that all paths agree.
+
+Usage:
+    python benchmarks/bench_candidates.py [--corpus corpus.txt]
+"""
+
+import argparse
+import functools
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from lib.checker import Checker  # noqa: E402
+from lib.trainer import Trainer  # noqa: E402
+from tests.errors import unigram_one  # noqa: E402
+
+
+def time_corrections(checker: Checker, words):
+    """Return (results, per-word latencies in microseconds)."""
+    results, latencies = [], []
+    for word in words:
+        start = time.perf_counter()
+        results.append(checker.correct(word))
+        latencies.append((time.perf_counter() - start) * 1e6)
+    return results, latencies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--corpus", default="corpus.txt")
+    args = parser.parse_args()
+
+    trainer = functools.partial(Trainer, corpus=args.corpus)
+    words = [w for wrongs in unigram_one.values() for w in wrongs.split()]
+
+    variants = {
+        "edits": {},
+        "index": {"use_index": True},
+        "trie": {"use_trie": True},
+    }
+    rows = []
+    for name, options in variants.items():
+        start = time.perf_counter()
+        checker = Checker(trainer=trainer, memo_size=0, **options)
+        load = time.perf_counter() - start
+        results, latencies = time_corrections(checker, words)
+        rows.append((name, load, results, latencies))
+
+    baseline_results, baseline_lat = rows[0][2], rows[0][3]
+    print(f"{len(words)} words, vocabulary {len(checker.word_count)}")
+    print(
+        f"{'':10}{'load s':>10}{'mean us':>12}{'median us':>12}{'max us':>12}"
+        f"{'speedup':>10}{'mismatch':>10}"
+    )
+    for name, load, results, lat in rows:
+        speedup = statistics.mean(baseline_lat) / statistics.mean(lat)
+        mismatches = sum(a != b for a, b in zip(baseline_results, results))
+        print(
+            f"{name:10}{load:10.2f}{statistics.mean(lat):12.1f}"
+            f"{statistics.median(lat):12.1f}{max(lat):12.1f}"
+            f"{speedup:9.1f}x{mismatches:10}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Compare the memory footprint of model representations.
+
+Sizes are computed by walking the object graph and summing
+``sys.getsizeof`` of every distinct object, so shared objects such as
+interned strings and small integers are only counted once per structure.
+
+Usage:
+    python benchmarks/bench_memory.py [--corpus corpus.txt]
+"""
+
+import argparse
+import os
+import sys
+import time
+from array import array
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from lib.ngram_store import NGramTable, Vocabulary  # noqa: E402
+from lib.trainer import Trainer  # noqa: E402
+from lib.trie import VocabularyTrie  # noqa: E402
+
+
+def deep_size(obj, seen=None) -> int:
+    """Return the size in bytes of obj and everything it references."""
+    if seen is None:
+        seen = set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, (str, bytes, int, float, array)):
+        return size
+    if isinstance(obj, dict):
+        for key, value in obj.items():
+            size += deep_size(key, seen) + deep_size(value, seen)
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        for item in obj:
+            size += deep_size(item, seen)
+    if hasattr(obj, "__dict__"):
+        size += deep_size(vars(obj), seen)
+    for slot in getattr(type(obj), "__slots__", ()):
+        if hasattr(obj, slot):
+            size += deep_size(getattr(obj, slot), seen)
+    return size
+
+
+def report(rows) -> None:
+    """Print (name, entries, bytes) rows.
+
+    Bytes per entry equals megabytes per million entries.
+    """
+    print(f"{'':28}{'entries':>10}{'MB':>10}{'MB per 1M entries':>19}")
+    for name, entries, size in rows:
+        per_entry = size / entries if entries else 0
+        print(f"{name:28}{entries:10}{size / 1e6:10.2f}{per_entry:19.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--corpus", default="corpus.txt")
+    args = parser.parse_args()
+
+    data = Trainer(corpus=args.corpus).data
+    word_count = data["word_count"]
+    start = time.perf_counter()
+    trie = VocabularyTrie.from_counts(word_count)
+    build = time.perf_counter() - start
+    print(f"trie built in {build:.2f}s, {len(trie.labels)} nodes")
+
+    report(
+        [
+            ("word_count defaultdict", len(word_count), deep_size(word_count)),
+            ("packed VocabularyTrie", len(trie), deep_size(trie)),
+        ]
+    )
+
+    vocabulary = Vocabulary(word_count)
+    rows = []
+    for name, order in (("bigram_probs", 2), ("trigram_probs", 3)):
+        table = data[name]
+        compact = NGramTable.from_dict(table, vocabulary, order)
+        rows.append((f"{name} defaultdict", len(table), deep_size(table)))
+        # The vocabulary is shared by every compact table, count it once below
+        size = deep_size(compact, {id(vocabulary)})
+        rows.append((f"{name} NGramTable", len(compact), size))
+    rows.append(("shared Vocabulary", len(vocabulary), deep_size(vocabulary)))
+    print()
+    report(rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""Report per-worker memory of gunicorn deployments.
+
+Starts `gunicorn main:app` with --workers workers in each mode, from the
+current directory (which must contain data/) with the repository's
+gunicorn.conf.py:
+
+- separate: every worker loads its own model (SPELLCHECK_PRELOAD=0)
+- preload: the master loads the model and freezes it from the GC before
+  forking the workers
+- prefork: preload plus packed n-gram tables (SPELLCHECK_COMPACT=1)
+
+Memory is read from /proc/<pid>/smaps_rollup once the workers are idle and
+again after --requests spell checks. USS (unique set size) is the memory
+only that worker uses and would be freed if it exited; PSS splits shared
+pages between the processes sharing them, so the PSS total over master and
+workers is what the deployment really costs. Linux only.
+
+Usage:
+    python benchmarks/bench_prefork.py [--workers 4] [--requests 2000]
+        [--modes separate preload prefork]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import time
+import urllib.error
+import urllib.request
+from typing import Dict, List
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+MODES = {
+    "separate": {"SPELLCHECK_PRELOAD": "0"},
+    "preload": {"SPELLCHECK_PRELOAD": "1"},
+    "prefork": {"SPELLCHECK_PRELOAD": "1", "SPELLCHECK_COMPACT": "1"},
+}
+TEXTS = [
+    "Ths is a tst of the spell chekcer",
+    "the quikc brown fox jumsp over the lazy dog",
+    "retrun the vlaue of teh functon",
+]
+
+
+def memory_mb(pid: int) -> Dict[str, float]:
+    """Return RSS, PSS and USS of a process in MB."""
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                fields[parts[0].rstrip(":")] = int(parts[1]) / 1024
+    return {
+        "rss": fields["Rss"],
+        "pss": fields["Pss"],
+        "uss": fields["Private_Clean"] + fields["Private_Dirty"],
+    }
+
+
+def children(pid: int) -> List[int]:
+    with open(f"/proc/{pid}/task/{pid}/children") as f:
+        return sorted(int(child) for child in f.read().split())
+
+
+def get(url: str) -> int:
+    try:
+        with urllib.request.urlopen(url, timeout=5) as response:
+            return response.status
+    except (urllib.error.URLError, OSError):
+        return 0
+
+
+def check(url: str, text: str) -> None:
+    body = json.dumps({"text": text}).encode("utf-8")
+    req = urllib.request.Request(
+        url, data=body, headers={"Content-Type": "application/json"}
+    )
+    with urllib.request.urlopen(req, timeout=60) as response:
+        response.read()
+
+
+def wait_ready(master: int, port: int, workers: int, timeout: float = 600) -> None:
+    """Wait until every worker has booted and the server answers."""
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if len(children(master)) == workers:
+            if get(f"http://127.0.0.1:{port}/api/health") == 200:
+                # Give the workers that did not answer time to finish loading
+                time.sleep(2)
+                return
+        time.sleep(0.5)
+    raise RuntimeError("gunicorn did not start")
+
+
+def report(label: str, master: int, workers: List[int]) -> None:
+    rows = [memory_mb(pid) for pid in workers]
+    total_pss = memory_mb(master)["pss"] + sum(row["pss"] for row in rows)
+    uss = [row["uss"] for row in rows]
+    rss = [row["rss"] for row in rows]
+    print(
+        f"  {label:8}{sum(uss) / len(uss):10.1f}{max(uss):10.1f}"
+        f"{sum(rss) / len(rss):10.1f}{total_pss:12.1f}"
+    )
+
+
+def run_mode(mode: str, port: int, args) -> None:
+    env = dict(os.environ, PYTHONPATH=ROOT, **MODES[mode])
+    command = [
+        "gunicorn",
+        "main:app",
+        "--config",
+        os.path.join(ROOT, "gunicorn.conf.py"),
+        "--workers",
+        str(args.workers),
+        "--bind",
+        f"127.0.0.1:{port}",
+    ]
+    server = subprocess.Popen(
+        command, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        wait_ready(server.pid, port, args.workers)
+        workers = children(server.pid)
+        print(f"{mode} ({args.workers} workers)")
+        report("idle", server.pid, workers)
+        url = f"http://127.0.0.1:{port}/api/check"
+        for i in range(args.requests):
+            check(url, TEXTS[i % len(TEXTS)])
+        report("loaded", server.pid, workers)
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--port", type=int, default=5090)
+    args = parser.parse_args()
+
+    print(
+        f"  {'':8}{'USS avg':>10}{'USS max':>10}{'RSS avg':>10}{'total PSS':>12}"
+        "  (MB, per worker except total)"
+    )
+    for offset, mode in enumerate(args.modes):
+        run_mode(mode, args.port + offset, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Compare resident memory of a loaded Checker per table mode.
+
+A larger corpus is simulated by concatenating --scale copies of the corpus,
+each with a different letter appended to every word, so that the n-gram
+tables grow linearly with the scale. It is trained once and exported as a
+snapshot. Every mode then loads that snapshot in a fresh interpreter and
+reports its resident set size once loading has finished, plus the time
+needed to rank a few misspellings.
+
+Usage:
+    python benchmarks/bench_rss.py [--corpus corpus.txt] [--scale 4]
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from lib.checker import Checker  # noqa: E402
+from lib.model import KEEP_TABLES  # noqa: E402
+from lib.trainer import Trainer, current_rss_mb  # noqa: E402
+
+SENTENCES = [
+    "the quikc brown fox jumsp over the lazy dog",
+    "retrun the vlaue of teh functon",
+    "thsi argumnet is not a strng",
+]
+
+
+def run_worker(snapshot: str, keep: str) -> None:
+    """Load the snapshot in this process and print the figures as JSON."""
+    baseline = current_rss_mb()
+    checker = Checker(snapshot=snapshot, keep_tables=keep)
+    rss = current_rss_mb() - baseline
+    start = time.perf_counter()
+    for sentence in SENTENCES:
+        checker.check_sentence(sentence)
+    seconds = time.perf_counter() - start
+    print(json.dumps({"rss_mb": rss, "check_seconds": seconds}))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--corpus", default="corpus.txt")
+    parser.add_argument("--scale", type=int, default=4, choices=range(1, 28))
+    parser.add_argument("--snapshot", help=argparse.SUPPRESS)
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.snapshot, args.worker)
+        return
+
+    with open(os.path.join("data", args.corpus), encoding="utf-8") as f:
+        text = f.read()
+    name = f"_bench_rss_x{args.scale}.txt"
+    corpus_path = os.path.join("data", name)
+    snapshot = os.path.join("data", f"_bench_rss_x{args.scale}.snap")
+    with open(corpus_path, "w", encoding="utf-8") as f:
+        for copy in range(args.scale):
+            suffix = "abcdefghijklmnopqrstuvwxyz"[copy - 1] if copy else ""
+            f.write(re.sub(r"[A-Za-z']+", lambda m: m.group() + suffix, text))
+            f.write("\n")
+    del text
+
+    try:
+        trainer = Trainer(corpus=name, streaming=True)
+        trainer.save_snapshot(snapshot)
+        print(
+            f"corpus: {os.path.getsize(corpus_path) / 1e6:.1f} MB, "
+            f"{len(trainer.data['bigram_count'])} bigrams, "
+            f"{len(trainer.data['trigram_count'])} trigrams"
+        )
+        del trainer
+        print(f"{'keep_tables':14}{'RSS MB':>10}{'vs all':>10}{'check ms':>12}")
+        reference = None
+        for keep in KEEP_TABLES:
+            output = subprocess.run(
+                [
+                    sys.executable,
+                    __file__,
+                    "--snapshot",
+                    snapshot,
+                    "--worker",
+                    keep,
+                ],
+                check=True,
+                capture_output=True,
+                text=True,
+            ).stdout
+            stats = json.loads(output.strip().splitlines()[-1])
+            if reference is None:
+                reference = stats["rss_mb"]
+            print(
+                f"{keep:14}{stats['rss_mb']:10.1f}"
+                f"{stats['rss_mb'] / reference:9.2f}x"
+                f"{stats['check_seconds'] * 1000:12.1f}"
+            )
+    finally:
+        os.remove(corpus_path)
+        if os.path.exists(snapshot):
+            os.remove(snapshot)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""Load test the sync (gunicorn) and async (uvicorn) deployments.
+
+Each deployment is started on a local port from the current directory,
+which must contain data/, with the repository root on PYTHONPATH.
+--concurrency clients then send POST /api/check requests with misspelled
+text back to back for --duration seconds, while a probe sends GET
+/api/health every 100 ms, and --slow-clients connections trickle their
+request bodies in slowly. The report shows check throughput and latency,
+health check latency and the number of failed or rejected requests.
+
+Usage:
+    python benchmarks/bench_serving.py [--duration 20] [--concurrency 8]
+        [--slow-clients 2] [--modes sync async]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import time
+from typing import Dict, List, Optional, Tuple
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Server command per deployment, {port} is filled in
+MODES = {
+    "sync": ["gunicorn", "main:app", "--bind", "127.0.0.1:{port}"],
+    "async": ["uvicorn", "asgi:app", "--port", "{port}", "--log-level", "warning"],
+}
+TEXTS = [
+    "Ths is a tst of the spell chekcer",
+    "the quikc brown fox jumsp over the lazy dog",
+    "retrun the vlaue of teh functon",
+]
+
+
+async def request(
+    port: int, method: str, path: str, body: bytes = b"", delay: float = 0.0
+) -> Tuple[int, float]:
+    """Send one HTTP/1.1 request and return (status, seconds).
+
+    With a delay the body is sent one byte at a time, delay seconds apart,
+    like a slow client.
+    """
+    start = time.perf_counter()
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    head = (
+        f"{method} {path} HTTP/1.1\r\nHost: 127.0.0.1\r\n"
+        "Content-Type: application/json\r\nConnection: close\r\n"
+        f"Content-Length: {len(body)}\r\n\r\n"
+    )
+    writer.write(head.encode("latin-1"))
+    if delay:
+        for i in range(len(body)):
+            writer.write(body[i : i + 1])
+            await writer.drain()
+            await asyncio.sleep(delay)
+    else:
+        writer.write(body)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    status = int(response.split(b" ", 2)[1]) if response else 0
+    return status, time.perf_counter() - start
+
+
+async def run_load(
+    port: int, duration: float, concurrency: int, slow_clients: int
+) -> Dict[str, List]:
+    """Drive mixed load against a server and collect latencies."""
+    results: Dict[str, List] = {"check": [], "health": [], "errors": []}
+    deadline = time.perf_counter() + duration
+
+    async def checker_client(i: int) -> None:
+        while time.perf_counter() < deadline:
+            body = json.dumps({"text": TEXTS[i % len(TEXTS)]}).encode("utf-8")
+            try:
+                status, seconds = await request(port, "POST", "/api/check", body)
+            except OSError as e:
+                results["errors"].append(str(e))
+                continue
+            if status == 200:
+                results["check"].append(seconds)
+            else:
+                results["errors"].append(status)
+            i += 1
+
+    async def slow_client() -> None:
+        while time.perf_counter() < deadline:
+            body = json.dumps({"text": TEXTS[0]}).encode("utf-8")
+            try:
+                await request(port, "POST", "/api/check", body, delay=0.05)
+            except OSError as e:
+                results["errors"].append(str(e))
+
+    async def probe() -> None:
+        while time.perf_counter() < deadline:
+            try:
+                status, seconds = await request(port, "GET", "/api/health")
+                results["health"].append(seconds)
+            except OSError as e:
+                results["errors"].append(str(e))
+            await asyncio.sleep(0.1)
+
+    await asyncio.gather(
+        probe(),
+        *(checker_client(i) for i in range(concurrency)),
+        *(slow_client() for _ in range(slow_clients)),
+    )
+    return results
+
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def wait_ready(port: int, timeout: float = 300.0) -> None:
+    """Wait until the server answers health checks (training may be slow)."""
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            status, _ = asyncio.run(request(port, "GET", "/api/health"))
+            if status == 200:
+                return
+        except OSError:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError(f"Server on port {port} did not start")
+
+
+def run_mode(mode: str, port: int, args) -> Optional[Dict[str, List]]:
+    command = [part.format(port=port) for part in MODES[mode]]
+    try:
+        env = dict(os.environ, PYTHONPATH=ROOT)
+        server = subprocess.Popen(command, env=env, stdout=subprocess.DEVNULL)
+    except FileNotFoundError:
+        print(f"{mode}: {command[0]} is not installed, skipped")
+        return None
+    try:
+        wait_ready(port)
+        return asyncio.run(
+            run_load(port, args.duration, args.concurrency, args.slow_clients)
+        )
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--slow-clients", type=int, default=2)
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--port", type=int, default=5080)
+    args = parser.parse_args()
+
+    print(
+        f"{'mode':8}{'check/s':>10}{'check p50':>11}{'check p95':>11}"
+        f"{'health p50':>12}{'health p95':>12}{'health max':>12}{'errors':>8}"
+    )
+    for offset, mode in enumerate(args.modes):
+        results = run_mode(mode, args.port + offset, args)
+        if results is None:
+            continue
+        check, health = results["check"], results["health"]
+        print(
+            f"{mode:8}{len(check) / args.duration:10.1f}"
+            f"{percentile(check, 0.5) * 1000:9.0f}ms"
+            f"{percentile(check, 0.95) * 1000:9.0f}ms"
+            f"{percentile(health, 0.5) * 1000:10.0f}ms"
+            f"{percentile(health, 0.95) * 1000:10.0f}ms"
+            f"{max(health, default=float('nan')) * 1000:10.0f}ms"
+            f"{len(results['errors']):8}"
+        )
+        if health:
+            spread = statistics.pstdev(health) * 1000
+            print(f"{'':8}health checks: {len(health)}, stdev {spread:.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
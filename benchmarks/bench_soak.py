@@ -0,0 +1,115 @@
+"""Soak test: model size and memory over many check_sentence calls.
+
+Every call checks a random sentence of vocabulary words in random order
+with one misspelled word, so nearly every n-gram looked up while ranking
+has never been seen. With defaultdict tables each such lookup inserts a
+new entry and memory climbs steadily; frozen tables stay the same size.
+
+Each mode runs in a fresh interpreter with pruned ranking and the deletion
+index, the cheapest exact ranking setup. The defaultdict mode grows by
+roughly 20 MB per thousand calls, so long soaks should only run the frozen
+mode, e.g. --modes frozen --calls 2000000.
+
+Usage:
+    python benchmarks/bench_soak.py [--corpus corpus.txt] [--calls 50000]
+        [--samples 10] [--modes defaultdict frozen]
+"""
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from lib.checker import Checker  # noqa: E402
+from lib.trainer import Trainer, current_rss_mb  # noqa: E402
+
+MODES = {
+    "defaultdict": {},
+    "frozen": {"frozen": True},
+}
+LETTERS = "abcdefghijklmnopqrstuvwxyz"
+
+
+def sentences(vocabulary, count: int, seed: int = 0):
+    """Yield count random sentences with one misspelled word each."""
+    rng = random.Random(seed)
+    for _ in range(count):
+        words = rng.sample(vocabulary, 6)
+        typo = list(words[2])
+        typo.insert(rng.randrange(len(typo) + 1), rng.choice(LETTERS))
+        words[2] = "".join(typo)
+        yield " ".join(words)
+
+
+def model_entries(checker: Checker) -> int:
+    """Return the number of entries held by the checker's model tables."""
+    return sum(len(table) for table in checker.model.data.values())
+
+
+def run_worker(corpus: str, mode: str, calls: int, samples: int) -> None:
+    """Soak one mode in this process and print the samples as JSON."""
+    checker = Checker(
+        trainer=lambda: Trainer(corpus=corpus),
+        ranking="pruned",
+        use_index=True,
+        **MODES[mode],
+    )
+    vocabulary = sorted(w for w in checker.word_count if len(w) > 2)
+    every = max(1, calls // samples)
+    rows = [(0, current_rss_mb(), model_entries(checker), 0.0)]
+    start = time.perf_counter()
+    for i, sentence in enumerate(sentences(vocabulary, calls), 1):
+        checker.check_sentence(sentence)
+        if i % every == 0 or i == calls:
+            elapsed = time.perf_counter() - start
+            rows.append((i, current_rss_mb(), model_entries(checker), elapsed))
+    print(json.dumps(rows))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--corpus", default="corpus.txt")
+    parser.add_argument("--calls", type=int, default=50000)
+    parser.add_argument("--samples", type=int, default=10)
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.corpus, args.worker, args.calls, args.samples)
+        return
+
+    for mode in args.modes:
+        output = subprocess.run(
+            [
+                sys.executable,
+                __file__,
+                "--corpus",
+                args.corpus,
+                "--calls",
+                str(args.calls),
+                "--samples",
+                str(args.samples),
+                "--worker",
+                mode,
+            ],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        rows = json.loads(output.strip().splitlines()[-1])
+        print(f"\n{mode}")
+        print(f"{'calls':>10}{'RSS MB':>10}{'growth MB':>12}{'entries':>12}{'s':>9}")
+        for calls, rss, entries, seconds in rows:
+            print(
+                f"{calls:10}{rss:10.1f}{rss - rows[0][1]:12.1f}"
+                f"{entries:12}{seconds:9.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
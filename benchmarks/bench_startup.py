@@ -0,0 +1,60 @@
+"""Compare model startup: training from the corpus vs loading a snapshot.
+
+Larger corpora are simulated by concatenating the corpus with itself, which
+grows training time while the model size stays roughly constant.
+
+Usage:
+    python benchmarks/bench_startup.py [--corpus corpus.txt] [--scales 1 4 16]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from lib.snapshot import load_snapshot  # noqa: E402
+from lib.trainer import Trainer  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--corpus", default="corpus.txt")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 4, 16])
+    args = parser.parse_args()
+
+    with open(os.path.join("data", args.corpus), encoding="utf-8") as f:
+        text = f.read()
+
+    print(f"{'scale':>6}{'corpus MB':>12}{'train s':>10}{'load s':>10}{'snap MB':>10}")
+    for scale in args.scales:
+        name = f"_bench_startup_x{scale}.txt"
+        corpus_path = os.path.join("data", name)
+        with open(corpus_path, "w", encoding="utf-8") as f:
+            for _ in range(scale):
+                f.write(text)
+                f.write("\n")
+        try:
+            start = time.perf_counter()
+            trainer = Trainer(corpus=name)
+            train = time.perf_counter() - start
+            with tempfile.TemporaryDirectory() as tmp:
+                snapshot_path = os.path.join(tmp, "model.snap")
+                trainer.save_snapshot(snapshot_path)
+                del trainer
+                start = time.perf_counter()
+                load_snapshot(snapshot_path)
+                load = time.perf_counter() - start
+                snapshot_size = os.path.getsize(snapshot_path)
+            corpus_size = os.path.getsize(corpus_path)
+        finally:
+            os.remove(corpus_path)
+        print(
+            f"{scale:6}{corpus_size / 1e6:12.1f}{train:10.2f}{load:10.2f}"
+            f"{snapshot_size / 1e6:10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
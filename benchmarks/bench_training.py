@@ -0,0 +1,94 @@
+"""Benchmark Trainer throughput and peak memory per training mode.
+
+Each mode runs in a fresh interpreter so that peak RSS figures do not
+include memory left behind by a previous run. Larger corpora are simulated
+by concatenating the corpus with itself. Parallel modes are run for every
+worker count in --workers to show how sharded training scales.
+
+Usage:
+    python benchmarks/bench_training.py [--corpus corpus.txt] [--scale 8]
+        [--workers 1 2 4]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from lib.trainer import Trainer, peak_rss_mb  # noqa: E402
+
+MODES = {
+    "in-memory": {},
+    "streaming": {"streaming": True},
+}
+
+
+def mode_options(mode: str) -> dict:
+    """Return Trainer keyword arguments for a mode name."""
+    if mode.startswith("parallel-"):
+        return {"workers": int(mode.split("-")[1])}
+    return MODES[mode]
+
+
+def run_worker(corpus: str, mode: str) -> None:
+    """Train once in this process and print the stats as JSON."""
+    baseline = peak_rss_mb()
+    trainer = Trainer(corpus=corpus, **mode_options(mode))
+    stats = dict(trainer.stats, baseline_rss_mb=baseline)
+    print(json.dumps(stats))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--corpus", default="corpus.txt")
+    parser.add_argument("--scale", type=int, default=8)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.corpus, args.worker)
+        return
+
+    with open(os.path.join("data", args.corpus), encoding="utf-8") as f:
+        text = f.read()
+    name = f"_bench_training_x{args.scale}.txt"
+    corpus_path = os.path.join("data", name)
+    with open(corpus_path, "w", encoding="utf-8") as f:
+        for _ in range(args.scale):
+            f.write(text)
+            f.write("\n")
+    del text
+
+    try:
+        print(f"corpus: {os.path.getsize(corpus_path) / 1e6:.1f} MB")
+        print(
+            f"{'mode':14}{'seconds':>10}{'MB/s':>10}{'peak RSS MB':>14}"
+            f"{'speedup':>10}"
+        )
+        modes = list(MODES) + [f"parallel-{n}" for n in args.workers if n > 1]
+        serial_seconds = None
+        for mode in modes:
+            output = subprocess.run(
+                [sys.executable, __file__, "--corpus", name, "--worker", mode],
+                check=True,
+                capture_output=True,
+                text=True,
+            ).stdout
+            stats = json.loads(output.strip().splitlines()[-1])
+            if serial_seconds is None:
+                serial_seconds = stats["seconds"]
+            # Peak RSS of the parent only; pool workers are separate processes
+            print(
+                f"{mode:14}{stats['seconds']:10.2f}{stats['mb_per_s']:10.2f}"
+                f"{stats['peak_rss_mb'] - stats['baseline_rss_mb']:14.1f}"
+                f"{serial_seconds / stats['seconds']:9.2f}x"
+            )
+    finally:
+        os.remove(corpus_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,319 @@
+"""Benchmark suite with stored baselines and regression detection.
+
+Micro-benchmarks time the checker's hot paths on fixed inputs, the
+misspellings of tests/errors.py, with the model configured as main.py
+configures it:
+
+    edits1, edit_distance, get_candidates, get_candidates_edits2, correct,
+    check_sentence, check_sentence_full
+
+get_candidates and correct use the misspellings that have a known word at
+edit distance one; get_candidates_edits2 uses a few that need the slower
+distance-two search.
+
+Macro-benchmarks time training and the HTTP endpoints through Flask's test
+client (request handling and checking, no network):
+
+    train, http_check, http_batch, http_stream
+
+Every benchmark is calibrated so that a round takes at least --min-time
+seconds, warmed up, then timed for --repeat rounds. The median, p95, mean,
+standard deviation and variance of the per-operation time are reported.
+The distance cache is cleared before every operation and the checkers keep
+no memo of corrected unknown words, so that rounds are independent.
+
+Usage:
+    python benchmarks/suite.py [--corpus corpus.txt] [--only correct train]
+        [--repeat 15] [--save baseline.json]
+    python benchmarks/suite.py --compare baseline.json [--threshold 0.1]
+
+--compare exits with status 1 if the median of any benchmark grew by more
+than --threshold (10% by default) compared to the baseline. Baselines are
+specific to the machine and corpus they were recorded on.
+"""
+
+import argparse
+import json
+import math
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Tuple
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from lib.checker import Checker  # noqa: E402
+from lib.trainer import Trainer  # noqa: E402
+from tests.errors import unigram_one  # noqa: E402
+
+TYPOS = sorted(w for wrongs in unigram_one.values() for w in wrongs.split())[:40]
+# Misspellings timed by get_candidates_edits2
+EDITS2_TYPOS = 3
+SENTENCES = [
+    "the quikc brown fox jumsp over the lazy dog",
+    "she was definately going to acommodate them",
+    "retrun the adress of the comittee",
+    "it is basicaly a begining",
+]
+# (name, benchmark factory); a factory builds its fixtures and returns the
+# operation to time
+Benchmark = Tuple[str, Callable[[argparse.Namespace], Callable[[], None]]]
+
+
+def make_checker(args, **options) -> Checker:
+    return Checker(
+        trainer=lambda: Trainer(corpus=args.corpus),
+        keep_tables="counts",
+        frozen=True,
+        # Without the memo of unknown words, every round recomputes them
+        memo_size=0,
+        **options,
+    )
+
+
+def bench_edits1(args):
+    checker = make_checker(args)
+    return lambda: [checker.edits1(word) for word in TYPOS]
+
+
+def bench_edit_distance(args):
+    checker = make_checker(args)
+    pairs = [(typo, word) for typo in TYPOS for word in unigram_one][:400]
+
+    def run():
+        checker.distances.clear()
+        for s1, s2 in pairs:
+            checker.edit_distance(s1, s2)
+
+    return run
+
+
+def split_typos(checker: Checker) -> Tuple[List[str], List[str]]:
+    """Split TYPOS into those with a known word at distance one and the rest."""
+    near = [word for word in TYPOS if checker.knowns(checker.edits1(word))]
+    far = [word for word in TYPOS if word not in near]
+    return near, far
+
+
+def bench_get_candidates(args):
+    checker = make_checker(args)
+    near, _ = split_typos(checker)
+    return lambda: [checker.get_candidates(word) for word in near]
+
+
+def bench_get_candidates_edits2(args):
+    checker = make_checker(args)
+    _, far = split_typos(checker)
+    return lambda: [checker.get_candidates(word) for word in far[:EDITS2_TYPOS]]
+
+
+def bench_correct(args):
+    checker = make_checker(args)
+    near, _ = split_typos(checker)
+    return lambda: [checker.correct(word) for word in near]
+
+
+def bench_check_sentence(args):
+    checker = make_checker(args, ranking="pruned")
+
+    def run():
+        checker.distances.clear()
+        for sentence in SENTENCES:
+            checker.check_sentence(sentence)
+
+    return run
+
+
+def bench_check_sentence_full(args):
+    checker = make_checker(args)
+
+    def run():
+        checker.distances.clear()
+        checker.check_sentence(SENTENCES[0])
+
+    return run
+
+
+def bench_train(args):
+    return lambda: Trainer(corpus=args.corpus)
+
+
+def _client():
+    import main as server
+
+    return server.app.test_client()
+
+
+def _post(client, url: str, **kwargs) -> None:
+    response = client.post(url, **kwargs)
+    if response.status_code != 200:
+        raise RuntimeError(f"{url} returned {response.status_code}")
+    response.get_data()
+
+
+def bench_http_check(args):
+    client = _client()
+    body = json.dumps({"text": " ".join(SENTENCES)})
+    return lambda: _post(
+        client, "/api/check", data=body, content_type="application/json"
+    )
+
+
+def bench_http_batch(args):
+    client = _client()
+    body = json.dumps({"texts": SENTENCES * 25})
+    return lambda: _post(
+        client, "/api/check/batch", data=body, content_type="application/json"
+    )
+
+
+def bench_http_stream(args):
+    client = _client()
+    document = (" ".join(SENTENCES) + "\n") * 200
+    return lambda: _post(client, "/api/check/stream", data=document.encode("utf-8"))
+
+
+BENCHMARKS: List[Benchmark] = [
+    ("edits1", bench_edits1),
+    ("edit_distance", bench_edit_distance),
+    ("get_candidates", bench_get_candidates),
+    ("get_candidates_edits2", bench_get_candidates_edits2),
+    ("correct", bench_correct),
+    ("check_sentence", bench_check_sentence),
+    ("check_sentence_full", bench_check_sentence_full),
+    ("train", bench_train),
+    ("http_check", bench_http_check),
+    ("http_batch", bench_http_batch),
+    ("http_stream", bench_http_stream),
+]
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Return the q-th quantile of values, interpolating between ranks."""
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q
+    low = math.floor(position)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+
+
+def measure(operation: Callable[[], None], repeat: int, min_time: float) -> Dict:
+    """Time an operation and return statistics of its duration in seconds."""
+    start = time.perf_counter()
+    operation()
+    single = time.perf_counter() - start
+    number = max(1, math.ceil(min_time / single)) if single > 0 else 1000
+    # Warm-up round, not recorded
+    for _ in range(number):
+        operation()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            operation()
+        times.append((time.perf_counter() - start) / number)
+    stdev = statistics.stdev(times) if len(times) > 1 else 0.0
+    return {
+        "median": statistics.median(times),
+        "p95": percentile(times, 0.95),
+        "mean": statistics.fmean(times),
+        "stdev": stdev,
+        "variance": stdev**2,
+        "min": min(times),
+        "rounds": repeat,
+        "number": number,
+    }
+
+
+def format_time(seconds: float) -> str:
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f}{unit}"
+    return f"{seconds / 1e-9:.0f}ns"
+
+
+def compare(baseline: Dict, results: Dict, threshold: float) -> List[str]:
+    """Print a comparison and return the names of regressed benchmarks."""
+    print(f"\n{'benchmark':22}{'baseline':>12}{'current':>12}{'change':>10}")
+    regressions = []
+    for name, result in results.items():
+        before = baseline["results"].get(name)
+        if before is None:
+            print(f"{name:22}{'-':>12}{format_time(result['median']):>12}{'new':>10}")
+            continue
+        change = result["median"] / before["median"] - 1
+        flag = ""
+        if change > threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(
+            f"{name:22}{format_time(before['median']):>12}"
+            f"{format_time(result['median']):>12}{change:>+10.1%}{flag}"
+        )
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    names = [name for name, _ in BENCHMARKS]
+    parser.add_argument("--corpus", default="corpus.txt")
+    parser.add_argument("--only", nargs="+", choices=names, default=names)
+    parser.add_argument("--repeat", type=int, default=15)
+    parser.add_argument("--min-time", type=float, default=0.05)
+    parser.add_argument("--save", help="Write the results as a JSON baseline")
+    parser.add_argument("--compare", help="Baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10)
+    args = parser.parse_args()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    print(
+        f"{'benchmark':22}{'median':>10}{'p95':>10}{'stdev':>10}"
+        f"{'variance':>12}{'rounds':>8}{'x':>6}"
+    )
+    results = {}
+    for name, factory in BENCHMARKS:
+        if name not in args.only:
+            continue
+        operation = factory(args)
+        result = results[name] = measure(operation, args.repeat, args.min_time)
+        print(
+            f"{name:22}{format_time(result['median']):>10}"
+            f"{format_time(result['p95']):>10}{format_time(result['stdev']):>10}"
+            f"{result['variance']:12.3e}{result['rounds']:8}{result['number']:6}"
+        )
+
+    if args.save:
+        report = {
+            "meta": {
+                "date": datetime.now(timezone.utc).isoformat(),
+                "python": sys.version.split()[0],
+                "platform": platform.platform(),
+                "corpus": args.corpus,
+                "repeat": args.repeat,
+                "min_time": args.min_time,
+            },
+            "results": results,
+        }
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nBaseline written to {args.save}")
+
+    if baseline is not None:
+        regressions = compare(baseline, results, args.threshold)
+        if regressions:
+            print(
+                f"\n{len(regressions)} benchmark(s) regressed by more than "
+                f"{args.threshold:.0%}: {', '.join(regressions)}"
+            )
+            sys.exit(1)
+        print(f"\nNo regressions above {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
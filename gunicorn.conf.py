@@ -0,0 +1,62 @@
+"""Gunicorn settings for the spell checking service.
+
+Gunicorn reads this file from the working directory, so the Procfile
+command `gunicorn main:app` uses it as well.
+
+By default the app is preloaded: main.py and its model are loaded once in
+the master, which then forks the workers, so all workers start on the same
+memory pages. Left alone, the garbage collector would write to the header
+of every model object in each worker and turn those shared pages into
+private copies. The collector is therefore disabled while the model loads,
+every object that exists at fork time is moved to the permanent generation
+with gc.freeze(), and collection is re-enabled in each worker. Refcount
+updates on the objects a worker reads still copy pages; set
+SPELLCHECK_COMPACT=1 as well to keep the n-gram tables in flat arrays.
+
+Set SPELLCHECK_PRELOAD=0 to load the model separately in every worker.
+
+Online updates (/api/update, enabled by SPELLCHECK_UPDATE_TOKEN) only change
+the model of the worker that receives them, so the server refuses to start
+with more than one worker while they are enabled.
+
+If SPELLCHECK_METRICS_DIR is set, workers write their metrics there for
+/api/metrics to merge; snapshots left by a previous run are removed when
+the server starts.
+"""
+
+import gc
+import os
+
+preload_app = os.environ.get("SPELLCHECK_PRELOAD", "1") == "1"
+
+if preload_app:
+    # Avoid collections while the model loads; objects freed by one would
+    # leave holes in pages shared with the workers
+    gc.disable()
+
+
+def on_starting(server) -> None:
+    """Check that updates are not spread over workers; reset metrics."""
+    if os.environ.get("SPELLCHECK_UPDATE_TOKEN") and server.cfg.workers > 1:
+        raise RuntimeError(
+            "SPELLCHECK_UPDATE_TOKEN requires a single worker (-w 1): an update "
+            "only reaches the worker that handles it"
+        )
+    directory = os.environ.get("SPELLCHECK_METRICS_DIR")
+    if directory and os.path.isdir(directory):
+        from lib.metrics import clear_directory
+
+        clear_directory(directory)
+
+
+def when_ready(server) -> None:
+    """Freeze everything the master loaded, right before workers fork."""
+    if preload_app:
+        gc.freeze()
+        server.log.info("Froze %d objects shared with workers", gc.get_freeze_count())
+
+
+def post_fork(server, worker) -> None:
+    """Re-enable garbage collection for objects created by the worker."""
+    if preload_app:
+        gc.enable()
@@ -0,0 +1,161 @@
+"""BK-tree index for edit distance radius queries.
+
+A BK-tree exploits the triangle inequality of the Levenshtein metric: every
+child hangs off its parent under the edge labelled with their distance, so a
+query only needs to descend into edges within ``radius`` of the distance to
+the current node. This answers "all words within k edits" with a fraction
+of the distance evaluations needed by a linear vocabulary scan.
+"""
+
+import heapq
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from .distance import bounded_levenshtein
+
+DistanceFunc = Callable[[str, str, Optional[int]], int]
+
+
+class _Node:
+    __slots__ = ("word", "children")
+
+    def __init__(self, word: str) -> None:
+        self.word = word
+        self.children: Dict[int, "_Node"] = {}
+
+
+class BKTree:
+    """Metric tree over a vocabulary.
+
+    Attributes:
+        size: Number of words in the tree
+    """
+
+    def __init__(
+        self, words: Iterable[str] = (), distance: DistanceFunc = bounded_levenshtein
+    ) -> None:
+        """Build the tree.
+
+        Args:
+            words: Words to insert
+            distance: Bounded metric taking (s1, s2, max_dist)
+        """
+        self._distance = distance
+        self._root: Optional[_Node] = None
+        self.size = 0
+        for word in words:
+            self.add(word)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def add(self, word: str) -> None:
+        """Insert a word, ignoring duplicates.
+
+        Args:
+            word: Word to insert
+        """
+        if self._root is None:
+            self._root = _Node(word)
+            self.size = 1
+            return
+        node = self._root
+        while True:
+            d = self._distance(word, node.word, None)
+            if d == 0:
+                return
+            child = node.children.get(d)
+            if child is None:
+                node.children[d] = _Node(word)
+                self.size += 1
+                return
+            node = child
+
+    def query(self, word: str, radius: int) -> Tuple[List[Tuple[int, str]], int]:
+        """Find all words within radius edits of word.
+
+        Args:
+            word: Query word
+            radius: Maximum edit distance
+
+        Returns:
+            Tuple of (matches as (distance, word) sorted by distance then
+            word, number of distance evaluations performed)
+        """
+        matches: List[Tuple[int, str]] = []
+        evaluations = 0
+        stack = [self._root] if self._root is not None else []
+        while stack:
+            node = stack.pop()
+            # Beyond radius + largest edge no child can qualify either
+            bound = radius + max(node.children, default=0)
+            d = self._distance(word, node.word, bound)
+            evaluations += 1
+            if d > bound:
+                continue
+            if d <= radius:
+                matches.append((d, node.word))
+            for edge, child in node.children.items():
+                if d - radius <= edge <= d + radius:
+                    stack.append(child)
+        matches.sort()
+        return matches, evaluations
+
+    def nearest(self, word: str, k: int = 5) -> Tuple[List[Tuple[int, str]], int]:
+        """Find the k words closest to word.
+
+        Args:
+            word: Query word
+            k: Number of neighbours to return
+
+        Returns:
+            Tuple of (up to k (distance, word) pairs sorted by distance then
+            word, number of distance evaluations performed)
+        """
+        if k <= 0 or self._root is None:
+            return [], 0
+        # Max-heap of the best k so far, stored as (-distance, inverted word)
+        best: List[Tuple[int, str]] = []
+        evaluations = 0
+        radius: Optional[int] = None
+        # Explore nodes closest to the query first to shrink the radius early
+        frontier: List[Tuple[int, int, _Node]] = [(0, 0, self._root)]
+        counter = 1
+        while frontier:
+            lower, _, node = heapq.heappop(frontier)
+            if radius is not None and lower > radius:
+                break
+            bound = None
+            if radius is not None:
+                bound = radius + max(node.children, default=0)
+            d = self._distance(word, node.word, bound)
+            evaluations += 1
+            if bound is not None and d > bound:
+                continue
+            if radius is None or d <= radius:
+                heapq.heappush(best, (-d, _Reversed(node.word)))
+                if len(best) > k:
+                    heapq.heappop(best)
+                if len(best) == k:
+                    radius = -best[0][0]
+            for edge, child in node.children.items():
+                child_lower = abs(edge - d)
+                if radius is None or child_lower <= radius:
+                    heapq.heappush(frontier, (child_lower, counter, child))
+                    counter += 1
+        result = sorted((-neg, rev.word) for neg, rev in best)
+        return result, evaluations
+
+
+class _Reversed:
+    """Wrapper inverting string order so the heap evicts the largest word."""
+
+    __slots__ = ("word",)
+
+    def __init__(self, word: str) -> None:
+        self.word = word
+
+    def __lt__(self, other: "_Reversed") -> bool:
+        return self.word > other.word
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, _Reversed) and self.word == other.word
@@ -0,0 +1,286 @@
+"""Word to correction caches shared by Checker.correct.
+
+A correction only depends on the vocabulary and its counts, so results can
+be reused across requests for as long as the model does not change. Every
+cache is tied to a model version, a fingerprint of the word counts and of
+the updates applied since, and never returns entries stored under another
+version.
+
+Two backends are provided:
+
+- LRUCache keeps entries in the process, like the edit distance cache.
+- FileCache keeps them in a SQLite file that every worker process on the
+  host opens, so a correction computed by one worker is reused by all.
+"""
+
+import abc
+import collections
+import hashlib
+import os
+import sqlite3
+import threading
+from typing import Dict, Mapping, Optional
+
+BACKENDS = ("none", "lru", "file")
+
+
+def model_version(word_count: Mapping[str, int]) -> str:
+    """Fingerprint the word counts that corrections are computed from.
+
+    Workers loading the same model get the same version, and any update
+    that changes a count gives a new one.
+
+    Args:
+        word_count: Word frequency table of the model
+
+    Returns:
+        Hex digest identifying the model
+    """
+    digest = hashlib.sha1()
+    for word, count in word_count.items():
+        digest.update(f"{word}\t{count}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def next_version(version: str, added: Mapping[str, int]) -> str:
+    """Derive the model version after an update from the counts it added.
+
+    Hashes only the update, so the cost is proportional to the document
+    rather than the vocabulary. Workers that load the same model and apply
+    the same updates in the same order agree on the version.
+
+    Args:
+        version: Model version before the update
+        added: Occurrences of each word added by the update
+
+    Returns:
+        Hex digest identifying the updated model
+    """
+    digest = hashlib.sha1(version.encode("ascii"))
+    for word in sorted(added):
+        digest.update(f"{word}\t{added[word]}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+class CorrectionCache(abc.ABC):
+    """Base class of correction caches.
+
+    Attributes:
+        max_size: Maximum number of cached corrections
+        version: Model version the cached corrections belong to
+        hits: Number of lookups answered from the cache
+        misses: Number of lookups that found nothing
+    """
+
+    def __init__(self, max_size: int = 65536) -> None:
+        """Initialize the cache.
+
+        Args:
+            max_size: Maximum number of cached corrections
+        """
+        self.max_size = max_size
+        self.version: Optional[str] = None
+        self.hits = 0
+        self.misses = 0
+
+    def set_version(self, version: str) -> None:
+        """Switch to another model version.
+
+        Corrections stored under other versions are no longer returned.
+
+        Args:
+            version: New model version
+        """
+        self.version = version
+
+    def get(self, word: str) -> Optional[str]:
+        """Return the cached correction of word, or None.
+
+        Args:
+            word: Word as passed to Checker.correct
+        """
+        correction = self._get(word)
+        if correction is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return correction
+
+    @abc.abstractmethod
+    def put(self, word: str, correction: str) -> None:
+        """Store the correction of word for the current version.
+
+        Args:
+            word: Word as passed to Checker.correct
+            correction: Its correction
+        """
+
+    @abc.abstractmethod
+    def _get(self, word: str) -> Optional[str]:
+        """Look up word under the current version, without counting it."""
+
+    @abc.abstractmethod
+    def size(self) -> int:
+        """Return the number of cached corrections."""
+
+    def stats(self) -> Dict[str, int]:
+        """Return cache statistics.
+
+        Returns:
+            Dictionary with hits, misses, current size and maximum size
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": self.size(),
+            "max_size": self.max_size,
+        }
+
+
+class LRUCache(CorrectionCache):
+    """In-process cache evicting the least recently used corrections."""
+
+    def __init__(self, max_size: int = 65536) -> None:
+        super().__init__(max_size)
+        self._entries: "collections.OrderedDict[str, str]" = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def set_version(self, version: str) -> None:
+        with self._lock:
+            if version != self.version:
+                self._entries.clear()
+            super().set_version(version)
+
+    def _get(self, word: str) -> Optional[str]:
+        with self._lock:
+            correction = self._entries.get(word)
+            if correction is not None:
+                self._entries.move_to_end(word)
+            return correction
+
+    def put(self, word: str, correction: str) -> None:
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[word] = correction
+            self._entries.move_to_end(word)
+            if len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def size(self) -> int:
+        return len(self._entries)
+
+
+class FileCache(CorrectionCache):
+    """Cache stored in a SQLite file shared by processes on one host.
+
+    Entries are keyed by model version and word. When the file holds more
+    than max_size entries the oldest inserted ones are deleted first, so
+    workers that have moved on to a new model version push the entries of
+    the old one out. Hits are not written back, which keeps lookups
+    read-only; the eviction order is therefore first in, first out.
+
+    The connection is opened lazily and reopened in a forked child, so a
+    cache created before gunicorn forks its workers is safe to use.
+    """
+
+    def __init__(self, path: str, max_size: int = 65536, timeout: float = 5.0) -> None:
+        """Initialize the cache.
+
+        Args:
+            path: Path of the SQLite file, created if missing
+            max_size: Maximum number of entries kept in the file
+            timeout: Seconds to wait for another process holding the lock
+        """
+        super().__init__(max_size)
+        self.path = path
+        self.timeout = timeout
+        self._connection: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None or self._pid != os.getpid():
+            connection = sqlite3.connect(
+                self.path, timeout=self.timeout, check_same_thread=False
+            )
+            # WAL lets readers in other workers proceed while one writes
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS corrections ("
+                "version TEXT NOT NULL, word TEXT NOT NULL, "
+                "correction TEXT NOT NULL, PRIMARY KEY (version, word))"
+            )
+            connection.commit()
+            self._connection = connection
+            self._pid = os.getpid()
+        return self._connection
+
+    def _get(self, word: str) -> Optional[str]:
+        with self._lock:
+            row = (
+                self._connect()
+                .execute(
+                    "SELECT correction FROM corrections WHERE version = ? AND word = ?",
+                    (self.version, word),
+                )
+                .fetchone()
+            )
+        return row[0] if row else None
+
+    def put(self, word: str, correction: str) -> None:
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                connection.execute(
+                    "INSERT OR REPLACE INTO corrections VALUES (?, ?, ?)",
+                    (self.version, word, correction),
+                )
+                # Rowids grow with every insert, so this drops the oldest
+                connection.execute(
+                    "DELETE FROM corrections WHERE rowid <= "
+                    "(SELECT MAX(rowid) FROM corrections) - ?",
+                    (self.max_size,),
+                )
+
+    def size(self) -> int:
+        with self._lock:
+            row = self._connect().execute("SELECT COUNT(*) FROM corrections").fetchone()
+        return row[0]
+
+    def close(self) -> None:
+        """Close the connection of this process."""
+        with self._lock:
+            if self._connection is not None and self._pid == os.getpid():
+                self._connection.close()
+            self._connection = None
+
+
+def create_cache(
+    backend: str, max_size: int = 65536, path: Optional[str] = None
+) -> Optional[CorrectionCache]:
+    """Create a correction cache by backend name.
+
+    Args:
+        backend: "none", "lru" or "file"
+        max_size: Maximum number of cached corrections
+        path: SQLite file of the "file" backend
+
+    Returns:
+        The cache, or None for "none"
+
+    Raises:
+        ValueError: If backend is unknown or "file" is given without a path
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown cache backend: {backend}")
+    if backend == "lru":
+        return LRUCache(max_size)
+    if backend == "file":
+        if not path:
+            raise ValueError("The file cache backend needs a path")
+        return FileCache(path, max_size)
+    return None
@@ -4,11 +4,37 @@ Provides spell checking functionality using n-gram language models
 and edit distance algorithms for word correction.
 """
 
-import re
-from functools import lru_cache
-from typing import Set, List, Dict
-
+import heapq
+import itertools
+import math
+import time
+from typing import Set, List, Dict, Optional, Tuple
+
+from . import tokenizer
+from .bktree import BKTree
+from .cache import CorrectionCache, LRUCache, model_version, next_version
+from .distance import EditDistance
+from .locks import ReadWriteLock
+from .metrics import NULL_TIMER, Metrics
+from .model import KEEP_TABLES, drop_tables, freeze
+from .ngram_store import NGramTable, Vocabulary
+from .scoring import HAS_NUMPY, EncodedWords, error_probs, np, top_k
+from .snapshot import load_snapshot
+from .symspell import DeletionIndex
 from .trainer import Trainer
+from .trie import VocabularyTrie
+
+
+def letter_mask(word: str) -> int:
+    """Return a bit set of the characters in word.
+
+    Characters share one of 64 bits, so the number of bits set in one mask
+    but not the other is a lower bound of the edit distance.
+    """
+    mask = 0
+    for c in word:
+        mask |= 1 << (ord(c) & 63)
+    return mask
 
 
 class Checker:
@@ -19,20 +45,167 @@ class Checker:
         unigram_probs: Unigram probability distribution
         bigram_probs: Bigram probability distribution
         trigram_probs: Trigram probability distribution
+        index: Optional deletion index used by get_candidates
+        ranking: Ranking mode used by check_sentence, "full" or "pruned"
+        max_candidates: Cap on the candidate set scored in pruned ranking
+        distances: Bounded edit distance engine with its own cache
+        bktree: Optional BK-tree over the vocabulary for radius queries
+        trie: Optional packed vocabulary trie used by get_candidates
+        vocabulary: Word IDs of the compact n-gram tables, None otherwise
+        model: Trainer holding the model data, used for online updates
+        frozen: Whether the model tables are read-only
+        cache: Optional word to correction cache used by correct
+        model_version: Fingerprint of the loaded word counts, advanced by
+            every update
+        metrics: Optional registry receiving per-stage timings
+        scoring: How candidates are ranked, "numpy" or "python"
     """
 
-    def __init__(self, trainer: type = Trainer) -> None:
+    def __init__(
+        self,
+        trainer: type = Trainer,
+        use_index: bool = False,
+        ranking: str = "full",
+        max_candidates: int = 100,
+        distance_cache_size: int = 65536,
+        use_bktree: bool = False,
+        use_trie: bool = False,
+        snapshot: Optional[str] = None,
+        compact: bool = False,
+        keep_tables: str = "all",
+        frozen: bool = False,
+        cache: Optional[CorrectionCache] = None,
+        metrics: Optional[Metrics] = None,
+        scoring: str = "auto",
+        memo_size: int = 4096,
+    ) -> None:
         """Initialize the spell checker with trained model data.
 
         Args:
             trainer: Trainer class to use for loading language model data
+            use_index: Build a precomputed deletion index so that candidate
+                lookups avoid generating the full edits2 neighbourhood
+            ranking: "full" scores the whole vocabulary for every unknown
+                word, "pruned" only scores a bounded candidate set, looked
+                up in the index or a vocabulary trie built if needed
+            max_candidates: Maximum number of candidates scored per word in
+                pruned ranking
+            distance_cache_size: Number of string pairs kept in the edit
+                distance cache
+            use_bktree: Build the BK-tree used by words_within and
+                nearest_words at load time instead of on first use
+            use_trie: Generate candidates by walking a vocabulary trie
+                instead of enumerating edits1/edits2; a trie prebuilt by
+                the trainer is reused
+            snapshot: Path of a binary model snapshot to load instead of
+                training from the corpus
+            compact: Store bigram and trigram probabilities as packed
+                integer-ID arrays instead of tuple-keyed dicts; the dicts and
+                bigram and trigram counts are released, which rules out
+                online updates
+            keep_tables: "all" keeps both counts and probabilities,
+                "counts" derives probabilities from the counts on lookup and
+                "probs" drops the bigram and trigram counts, which rules
+                out online updates
+            frozen: Make every table read-only so that lookups of unseen
+                n-grams do not insert them; rules out online updates
+            cache: Correction cache consulted by correct for unknown words;
+                it is tied to the model version and invalidated by updates
+            metrics: Registry timing the tokenize, candidates and ranking
+                stages in stage_seconds
+            scoring: "numpy" scores candidates in batches with NumPy,
+                "python" one at a time; "auto" uses NumPy if it is
+                installed. Both give the same rankings
+            memo_size: Number of corrections of unknown words remembered by
+                correct when no cache is given
+
+        Raises:
+            ValueError: If ranking, keep_tables or scoring is not a known
+                mode, if scoring is "numpy" and NumPy is not installed, or
+                if compact is set and the vocabulary does not fit 21-bit
+                word IDs
         """
-        trainer_instance = trainer()
-        data = trainer_instance.data
+        if ranking not in ("full", "pruned"):
+            raise ValueError(f"Unknown ranking mode: {ranking}")
+        if scoring not in ("auto", "numpy", "python"):
+            raise ValueError(f"Unknown scoring mode: {scoring}")
+        if scoring == "numpy" and not HAS_NUMPY:
+            raise ValueError("NumPy scoring requires numpy to be installed")
+        if keep_tables not in KEEP_TABLES:
+            raise ValueError(f"Unknown table mode: {keep_tables}")
+        if snapshot is not None:
+            data = load_snapshot(snapshot, tables=KEEP_TABLES[keep_tables])
+            self.model = Trainer.from_data(data)
+        else:
+            self.model = trainer()
+        data = drop_tables(self.model.data, keep_tables)
+        if frozen:
+            data = freeze(data)
+        self.frozen = frozen
         self.word_count: Dict = data["word_count"]
         self.unigram_probs: Dict = data["unigram_probs"]
         self.bigram_probs: Dict = data["bigram_probs"]
         self.trigram_probs: Dict = data["trigram_probs"]
+        self.vocabulary: Optional[Vocabulary] = None
+        if compact:
+            self.vocabulary = Vocabulary(self.word_count)
+            self.bigram_probs = NGramTable.from_dict(
+                self.bigram_probs, self.vocabulary, 2
+            )
+            self.trigram_probs = NGramTable.from_dict(
+                self.trigram_probs, self.vocabulary, 3
+            )
+            # Compact models cannot be updated, so the dicts the packed
+            # tables were built from, and their counts, are released
+            data["bigram_probs"] = self.bigram_probs
+            data["trigram_probs"] = self.trigram_probs
+            data.pop("bigram_count", None)
+            data.pop("trigram_count", None)
+        self.trie: Optional[VocabularyTrie] = None
+        if use_trie:
+            self.trie = data.get("trie")
+            if self.trie is None:
+                self.trie = VocabularyTrie.from_counts(self.word_count)
+        self.index: Optional[DeletionIndex] = None
+        if use_index:
+            self.index = DeletionIndex(self.word_count)
+        self.distances = EditDistance(cache_size=distance_cache_size)
+        self.bktree: Optional[BKTree] = None
+        if use_bktree:
+            self.bktree = BKTree(self.word_count)
+        self.model_version = model_version(self.word_count)
+        self.cache = cache
+        if cache is not None:
+            cache.set_version(self.model_version)
+        # Without a shared cache, repeated unknown words are still corrected
+        # only once per model version
+        self._memo = LRUCache(memo_size)
+        self._memo.set_version(self.model_version)
+        self.metrics = metrics
+        self.ranking = ranking
+        self.max_candidates = max_candidates
+        if scoring == "auto":
+            scoring = "numpy" if HAS_NUMPY else "python"
+        self.scoring = scoring
+        # Encoded vocabulary and unigram scores for vectorized full ranking,
+        # rebuilt when the model version changes
+        self._vocabulary_arrays: Optional[Tuple[str, EncodedWords, object]] = None
+        # (model version, length -> [(unigram probability, word, letter
+        # mask)] most probable first, word -> letter mask) for threshold
+        # ranking of the whole vocabulary
+        self._length_buckets: Optional[Tuple[str, Dict[int, List], Dict]] = None
+        self._followers: Optional[Dict[str, List[str]]] = None
+        self._predecessors: Optional[Dict[str, List[str]]] = None
+        self._by_frequency: Optional[List[str]] = None
+        self._position: Dict[str, int] = {}
+        # Lookups share the tables; online updates mutate them in place and
+        # wait for running lookups to finish
+        self._lock = ReadWriteLock()
+        if ranking == "pruned":
+            self._build_context_maps()
+            if self.index is None and self.trie is None:
+                # Bounds the candidate lookup of ranking_candidates
+                self.trie = VocabularyTrie.from_counts(self.word_count)
 
     def knowns(self, words: Set[str]) -> Set[str]:
         """Return subset of words that exist in the vocabulary.
@@ -65,37 +238,402 @@ class Checker:
         Returns:
             List of lowercase words and contractions
         """
-        return re.findall("[a-z']+", text.lower())
+        return tokenizer.words(text)
+
+    def _stage(self, name: str):
+        """Return a context manager timing one stage, if metrics are on."""
+        if self.metrics is None:
+            return NULL_TIMER
+        return self.metrics.time("stage_seconds", stage=name)
 
     def check_sentence(self, sentence):
-        sentence_list = ["^"] + self.words(sentence) + ["$"]
+        rank = self.calculate_pruned if self.ranking == "pruned" else self.calculate
+        with self._stage("tokenize"):
+            sentence_list = ["^"] + self.words(sentence) + ["$"]
         corrections_list = []
-        for i, word in enumerate(sentence_list):
-            if self.is_known(word) or word in ["^", "$"]:
-                continue
-            else:
-                before = sentence_list[i - 1]
-                after = sentence_list[i + 1]
-                corrections_list.append(self.calculate(word, before, after))
+        with self._lock.read:
+            for i, word in enumerate(sentence_list):
+                if self.is_known(word) or word in ["^", "$"]:
+                    continue
+                else:
+                    before = sentence_list[i - 1]
+                    after = sentence_list[i + 1]
+                    corrections_list.append(rank(word, before, after))
         return corrections_list
 
+    def update(self, text: str) -> List[str]:
+        """Learn from a new document while the checker keeps serving.
+
+        Counts are updated in place through the trainer, and new words are
+        added to the deletion index and BK-tree. The packed trie cannot
+        grow, so it is rebuilt when new words appear. Lookups wait for the
+        update to finish and then see the new model; lookups run
+        concurrently with each other.
+
+        Args:
+            text: Document to learn from
+
+        Returns:
+            Words that were not in the vocabulary before
+
+        Raises:
+            ValueError: If the checker is frozen, uses compact n-gram tables
+                or its count tables were dropped
+        """
+        if self.frozen:
+            raise ValueError("Frozen models cannot be updated")
+        if self.vocabulary is not None:
+            raise ValueError("Compact n-gram tables cannot be updated")
+        if "bigram_count" not in self.model.data:
+            raise ValueError("Count tables were dropped, the model is read-only")
+        with self._lock.write:
+            words, bigrams, _ = self.model.update(text)
+            # A word is new if its count is exactly the smoothed 1 plus the
+            # occurrences just added
+            new_words = [w for w, n in words.items() if self.word_count[w] == n + 1]
+            data = self.model.data
+            self.unigram_probs = data["unigram_probs"]
+            self.bigram_probs = data["bigram_probs"]
+            self.trigram_probs = data["trigram_probs"]
+            for word in new_words:
+                if self.index is not None:
+                    self.index.add(word)
+                if self.bktree is not None:
+                    self.bktree.add(word)
+            if new_words and self.trie is not None:
+                self.trie = data.get("trie")
+                if self.trie is None:
+                    self.trie = VocabularyTrie.from_counts(self.word_count)
+            if self._followers is not None:
+                self._update_context_maps(new_words, bigrams)
+            self.model_version = next_version(self.model_version, words)
+            if self.cache is not None:
+                self.cache.set_version(self.model_version)
+            self._memo.set_version(self.model_version)
+        return new_words
+
     def calculate(self, word, before, after):
-        rl = []
-        for poss in self.word_count:
-            prob = self.prob(word, poss, before, after)
-            rl.append((poss, prob))
-        rl.sort(key=lambda tup: tup[1])
-        rl.reverse()
-        return rl[:5]
+        with self._stage("ranking"):
+            return self._rank(word, before, after, self.word_count)
+
+    def calculate_pruned(
+        self, word: str, before: str, after: str
+    ) -> List[Tuple[str, float]]:
+        """Rank corrections for word using a bounded candidate set.
+
+        Scores the same way as calculate, but only over the candidates
+        returned by ranking_candidates instead of the whole vocabulary.
+
+        Args:
+            word: The misspelled word
+            before: Preceding word or "^" at sentence start
+            after: Following word or "$" at sentence end
+
+        Returns:
+            Up to five (word, score) tuples, best first
+        """
+        with self._stage("candidates"):
+            candidates = self.ranking_candidates(word, before, after)
+        with self._stage("ranking"):
+            return self._rank(word, before, after, candidates)
+
+    def _rank(self, word, before, after, candidates):
+        if self.scoring == "numpy":
+            return self._rank_vectorized(word, before, after, candidates)
+        if candidates is self.word_count:
+            return self._rank_threshold(word, before, after)
+        best: List[Tuple[float, int, str]] = []
+        for i, poss in enumerate(candidates):
+            rest = self.context_prob(poss, before, after)
+            self._offer(best, word, poss, i, rest)
+        return [(poss, prob) for prob, _, poss in sorted(best, reverse=True)]
+
+    def _offer(self, best, word, poss, order, rest, k=5):
+        """Score poss and keep it if it belongs in the top k.
+
+        best is a min-heap of (score, order, word). Ties go to the higher
+        order, which matches sorting candidates by score and reversing.
+
+        Args:
+            best: Heap of the k best candidates so far, updated in place
+            word: The misspelled word
+            poss: Candidate correction
+            order: Position of poss in the candidate sequence
+            rest: Context probability of poss
+            k: Number of candidates kept
+        """
+        max_dist = None
+        # A candidate only needs an exact distance if its error term could
+        # still lift it into the top k
+        if len(best) == k and best[0][0] > rest:
+            max_dist = max(0, int(-math.log2(best[0][0] - rest)) + 1)
+        prob = rest + self.error_prob(word, poss, max_dist)
+        if len(best) < k:
+            heapq.heappush(best, (prob, order, poss))
+        elif (prob, order) > best[0][:2]:
+            heapq.heapreplace(best, (prob, order, poss))
+
+    def _rank_threshold(self, word, before, after, k=5):
+        """Rank the whole vocabulary without scoring every word.
+
+        A word scores its context probability plus an error term of at most
+        1 / 2**d, where d is a lower bound of its edit distance: the length
+        difference, or the number of letters only one of the two words
+        contains. Words never seen next to before or after have no context
+        but their unigram probability. They are visited per length in
+        descending unigram probability, the words with context in
+        descending bound, always from the source with the highest bound,
+        until no bound can beat the k-th best score.
+
+        Returns:
+            Up to k (word, score) tuples, best first, as calculate returns
+        """
+        if self._followers is None or self._predecessors is None:
+            self._build_context_maps()
+        if (
+            self._length_buckets is None
+            or self._length_buckets[0] != self.model_version
+        ):
+            buckets: Dict[int, List[Tuple[float, str, int]]] = {}
+            masks = {poss: letter_mask(poss) for poss in self.word_count}
+            for poss, letters in masks.items():
+                buckets.setdefault(len(poss), []).append(
+                    (self.unigram_prob(poss), poss, letters)
+                )
+            for bucket in buckets.values():
+                bucket.sort(key=lambda entry: entry[0], reverse=True)
+            self._length_buckets = (self.model_version, buckets, masks)
+        _, buckets, masks = self._length_buckets
+
+        gaps = {length: abs(length - len(word)) for length in buckets}
+        # Largest error term of each distance lower bound
+        errors = [1.0] + [
+            1 / (2**d) for d in range(1, max(gaps.values(), default=0) + 65)
+        ]
+        mask = letter_mask(word)
+
+        def error_bound(poss: str, letters: int) -> float:
+            return errors[
+                max(
+                    abs(len(poss) - len(word)),
+                    (letters & ~mask).bit_count(),
+                    (mask & ~letters).bit_count(),
+                )
+            ]
+
+        context = set(self._followers.get(before, ()))
+        context.update(self._predecessors.get(after, ()))
+        context.intersection_update(self._position)
+        ranked = []
+        for poss in context:
+            rest = self.context_prob(poss, before, after)
+            ranked.append((rest + error_bound(poss, masks[poss]), rest, poss))
+        ranked.sort(reverse=True)
+
+        best: List[Tuple[float, int, str]] = []
+        # Max-heap of (-bound, source, position); source is a word length,
+        # or -1 for the words with context
+        frontier = [
+            (-(bucket[0][0] + errors[gaps[length]]), length, 0)
+            for length, bucket in buckets.items()
+        ]
+        if ranked:
+            frontier.append((-ranked[0][0], -1, 0))
+        heapq.heapify(frontier)
+        while frontier:
+            bound, source, i = frontier[0]
+            if len(best) == k and -bound < best[0][0]:
+                break
+            if source < 0:
+                _, rest, poss = ranked[i]
+                self._offer(best, word, poss, self._position[poss], rest, k)
+                following = ranked[i + 1][0] if i + 1 < len(ranked) else None
+            else:
+                bucket = buckets[source]
+                unigram, poss, letters = bucket[i]
+                if poss not in context and (
+                    len(best) < k or unigram + error_bound(poss, letters) >= best[0][0]
+                ):
+                    self._offer(best, word, poss, self._position[poss], unigram, k)
+                following = None
+                if i + 1 < len(bucket):
+                    following = bucket[i + 1][0] + errors[gaps[source]]
+            if following is None:
+                heapq.heappop(frontier)
+            else:
+                heapq.heapreplace(frontier, (-following, source, i + 1))
+        return [(poss, prob) for prob, _, poss in sorted(best, reverse=True)]
+
+    def _rank_vectorized(self, word, before, after, candidates):
+        """Score all candidates at once; same result as the Python ranking."""
+        if candidates is self.word_count:
+            encoded, scores = self._vocabulary_context(before, after)
+        else:
+            encoded = EncodedWords(candidates)
+            scores = np.fromiter(
+                (self.context_prob(poss, before, after) for poss in encoded.words),
+                np.float64,
+                len(encoded.words),
+            )
+        scores += error_probs(encoded.distances(word))
+        return [(encoded.words[i], float(scores[i])) for i in top_k(scores, 5)]
+
+    def _vocabulary_context(self, before: str, after: str):
+        """Return the encoded vocabulary and its context scores.
+
+        Only words seen next to before or after have non-zero bigram and
+        trigram probabilities, so those are looked up from the context maps
+        and the rest of the vocabulary keeps its unigram score.
+        """
+        if self._followers is None or self._predecessors is None:
+            self._build_context_maps()
+        arrays = self._vocabulary_arrays
+        if arrays is None or arrays[0] != self.model_version:
+            encoded = EncodedWords(self.word_count)
+            unigrams = np.fromiter(
+                (self.unigram_prob(w) for w in encoded.words),
+                np.float64,
+                len(encoded.words),
+            )
+            arrays = self._vocabulary_arrays = (self.model_version, encoded, unigrams)
+        _, encoded, unigrams = arrays
+        followers = self._followers.get(before, ())
+        predecessors = self._predecessors.get(after, ())
+        bigrams_after = np.zeros_like(unigrams)
+        for poss in predecessors:
+            if poss in self._position:
+                bigrams_after[self._position[poss]] = self.bigram_probs.get(
+                    (poss, after), 0
+                )
+        bigrams_before = np.zeros_like(unigrams)
+        trigrams = np.zeros_like(unigrams)
+        for poss in followers:
+            if poss in self._position:
+                i = self._position[poss]
+                bigrams_before[i] = self.bigram_probs.get((before, poss), 0)
+                # A trigram implies its first bigram
+                trigrams[i] = self.trigram_probs.get((before, poss, after), 0)
+        return encoded, unigrams + bigrams_after + bigrams_before + trigrams
+
+    def ranking_candidates(self, word: str, before: str, after: str) -> List[str]:
+        """Collect a bounded candidate set for contextual ranking.
+
+        Candidates come from the edit neighbourhood of word (distance 2,
+        most frequent first), followed by words seen after before or ahead
+        of after in the bigram model. If fewer than five candidates are
+        found the set is padded with the most frequent words so that the
+        ranking keeps its top-5 shape.
+
+        The neighbourhood is looked up in the deletion index or the
+        vocabulary trie, which is built on first use if there is neither,
+        so the cost is bounded by the vocabulary rather than by the edits2
+        set of a long word. The neighbourhood counts transpositions while
+        ranking uses Levenshtein distance, so the top 5 can differ from the
+        full ranking.
+
+        Args:
+            word: The misspelled word
+            before: Preceding word or "^" at sentence start
+            after: Following word or "$" at sentence end
+
+        Returns:
+            At most max_candidates distinct vocabulary words
+        """
+        if self._followers is None or self._predecessors is None:
+            self._build_context_maps()
+        if self._by_frequency is None:
+            self._by_frequency = self._sort_by_frequency()
+        limit = max(self.max_candidates, 5)
+        if self.index is not None:
+            near1 = self.index.lookup(word, 1)
+            near2 = self.index.lookup(word, 2)
+        else:
+            if self.trie is None:
+                self.trie = VocabularyTrie.from_counts(self.word_count)
+            near1 = set(self.trie.search(word, 1))
+            near2 = set(self.trie.search(word, 2))
+        by_count = lambda w: self.word_count.get(w, 0)  # noqa: E731
+        ordered = itertools.chain(
+            sorted(near1, key=by_count, reverse=True),
+            sorted(near2 - near1, key=by_count, reverse=True),
+            self._followers.get(before, ()),
+            self._predecessors.get(after, ()),
+            self._by_frequency,
+        )
+
+        candidates: List[str] = []
+        seen: Set[str] = set()
+        for poss in ordered:
+            if poss not in seen and poss in self.word_count:
+                seen.add(poss)
+                candidates.append(poss)
+                if len(candidates) >= limit:
+                    break
+        # Score in vocabulary order so that ties break exactly as in calculate
+        candidates.sort(key=lambda w: self._position.get(w, -1))
+        return candidates
+
+    def _build_context_maps(self) -> None:
+        """Index the bigram model by first and second word."""
+        followers: Dict[str, List[Tuple[float, str]]] = {}
+        predecessors: Dict[str, List[Tuple[float, str]]] = {}
+        for (first, second), p in self.bigram_probs.items():
+            if not p:
+                continue
+            followers.setdefault(first, []).append((p, second))
+            predecessors.setdefault(second, []).append((p, first))
+        self._followers = {
+            w: [x for _, x in sorted(v, reverse=True)] for w, v in followers.items()
+        }
+        self._predecessors = {
+            w: [x for _, x in sorted(v, reverse=True)] for w, v in predecessors.items()
+        }
+        self._by_frequency = self._sort_by_frequency()
+        self._position = {w: i for i, w in enumerate(self.word_count)}
+
+    def _sort_by_frequency(self) -> List[str]:
+        return sorted(self.word_count, key=lambda w: self.word_count[w], reverse=True)
+
+    def _update_context_maps(self, new_words: List[str], bigrams: Dict) -> None:
+        """Refresh the pruned ranking maps after an online update."""
+        for word in new_words:
+            self._position[word] = len(self._position)
+        # Every probability shares the same denominator, so only the lists
+        # holding an updated bigram can change order
+        firsts: Set[str] = set()
+        seconds: Set[str] = set()
+        for first, second in bigrams:
+            for ranked, word in (
+                (self._followers.setdefault(first, []), second),
+                (self._predecessors.setdefault(second, []), first),
+            ):
+                if word not in ranked:
+                    ranked.append(word)
+            firsts.add(first)
+            seconds.add(second)
+        for first in firsts:
+            self._followers[first].sort(
+                key=lambda w: (self.bigram_probs[(first, w)], w), reverse=True
+            )
+        for second in seconds:
+            self._predecessors[second].sort(
+                key=lambda w: (self.bigram_probs[(w, second)], w), reverse=True
+            )
+        # Re-sorted on the next pruned ranking
+        self._by_frequency = None
 
     def prob(self, word, poss, before, after):
-        a, b, c, d, e = 1, 1, 1, 1, 1
+        e = 1
+        r = self.context_prob(poss, before, after) + (e * self.error_prob(word, poss))
+        return r
+
+    def context_prob(self, poss, before, after):
+        a, b, c, d = 1, 1, 1, 1
         r = (
             (a * self.unigram_prob(poss))
             + (b * self.bigram_prob((poss, after)))
             + (c * self.bigram_prob((before, poss)))
             + (d * self.trigram_prob((before, poss, after)))
-            + (e * self.error_prob(word, poss))
         )
         return r
 
@@ -111,12 +649,10 @@ class Checker:
         prob = self.trigram_probs[trigram]
         return prob
 
-    @lru_cache(maxsize=1024)
     def edit_distance(self, s1: str, s2: str) -> int:
         """Calculate the Levenshtein distance between two strings.
 
-        Uses dynamic programming to compute minimum edit distance.
-        Results are cached for performance.
+        Results are cached in the checker's distance engine.
 
         Args:
             s1: First string
@@ -126,25 +662,27 @@ class Checker:
             Minimum number of single-character edits (insertions,
             deletions, or substitutions) required to change s1 into s2
         """
-        if len(s1) < len(s2):
-            return self.edit_distance(s2, s1)
+        return self.distances.distance(s1, s2)
 
-        if len(s2) == 0:
-            return len(s1)
+    def distance(self, s1: str, s2: str, max_dist: Optional[int] = None) -> int:
+        """Calculate the Levenshtein distance between two strings up to a bound.
 
-        previous_row = list(range(len(s2) + 1))
-        for i, c1 in enumerate(s1):
-            current_row = [i + 1]
-            for j, c2 in enumerate(s2):
-                insertions = previous_row[j + 1] + 1
-                deletions = current_row[j] + 1
-                substitutions = previous_row[j] + (c1 != c2)
-                current_row.append(min(insertions, deletions, substitutions))
-            previous_row = current_row
+        Uses a banded dynamic program that stops as soon as the distance is
+        known to exceed max_dist.
+
+        Args:
+            s1: First string
+            s2: Second string
+            max_dist: Upper bound of interest, or None for the exact distance
 
-        return previous_row[-1]
+        Returns:
+            The distance if it is at most max_dist, otherwise max_dist + 1
+        """
+        return self.distances.distance(s1, s2, max_dist)
 
-    def error_prob(self, error: str, poss: str) -> float:
+    def error_prob(
+        self, error: str, poss: str, max_dist: Optional[int] = None
+    ) -> float:
         """Calculate probability of error transformation.
 
         Uses inverse exponential of edit distance to model
@@ -153,12 +691,14 @@ class Checker:
         Args:
             error: The misspelled word
             poss: A possible correct word
+            max_dist: Optional distance bound; beyond it the probability
+                for max_dist + 1 is returned, which is an upper bound
 
         Returns:
             Probability value between 0 and 1, where higher values
             indicate more likely corrections
         """
-        dist = self.edit_distance(error, poss)
+        dist = self.distance(error, poss, max_dist)
         prob = (1 / (2**dist)) if dist > 0 else 1.0
         return prob
 
@@ -171,6 +711,9 @@ class Checker:
         3. Try edit distance 2 candidates
         4. If no candidates found, return original word
 
+        Corrections of unknown words are reused from the cache, if one is
+        configured, and otherwise from a bounded in-process memo.
+
         Args:
             word: Word to correct
 
@@ -181,13 +724,96 @@ class Checker:
         if not word or not word.strip():
             return ""
 
-        # If the word is already known, return it as is
+        # If the word is already known, return it as is; a single lookup
+        # needs no lock, as updates only ever add words
         if self.is_known(word):
             return word
 
-        # Generate candidates and find the best correction
-        candidates = self.get_candidates(word)
-        return max(candidates, key=lambda x: self.word_count[x])
+        with self._lock.read:
+            cache = self.cache if self.cache is not None else self._memo
+            cached = cache.get(word)
+            if cached is not None:
+                return cached
+
+            # Generate candidates and find the best correction
+            with self._stage("candidates"):
+                candidates = self.get_candidates(word)
+            with self._stage("ranking"):
+                # .get avoids inserting unknown fallbacks into the vocabulary
+                correction = max(candidates, key=lambda x: self.word_count.get(x, 0))
+            cache.put(word, correction)
+            return correction
+
+    def correct_in_context(
+        self, words: List[str], budget: Optional[float] = None
+    ) -> Tuple[List[str], int, int]:
+        """Correct a sequence of words using their neighbours as context.
+
+        Each unknown word gets the same candidates as correct, capped at
+        max_candidates most frequent, and they are ranked by the unigram,
+        bigram and trigram probabilities of check_sentence with the
+        previous corrected word and the next word as context. Once the time
+        budget is used up, the remaining words are corrected by frequency
+        with correct, which can use the correction cache. The budget is
+        also checked during the edits2 search of each word. A word whose
+        search runs past it gets the most frequent of the words found so
+        far, or stays unchanged, and counts as corrected by frequency.
+
+        Args:
+            words: Tokens to correct, in order
+            budget: Seconds available for contextual ranking, None for no
+                limit
+
+        Returns:
+            Tuple of (corrected words, number of unknown words ranked in
+            context, number corrected by frequency after the budget ran
+            out)
+        """
+        deadline = None if budget is None else time.perf_counter() + budget
+        corrected: List[str] = []
+        in_context = by_frequency = 0
+        for i, word in enumerate(words):
+            if not word or not word.strip() or self.is_known(word):
+                corrected.append(self.correct(word))
+                continue
+            if by_frequency or (
+                deadline is not None and time.perf_counter() >= deadline
+            ):
+                corrected.append(self.correct(word))
+                by_frequency += 1
+                continue
+            before = corrected[i - 1] if i > 0 else "^"
+            after = words[i + 1] if i + 1 < len(words) else "$"
+            with self._lock.read:
+                with self._stage("candidates"):
+                    candidates, complete = self._find_candidates(word, deadline)
+                if complete:
+                    choice = self._rank_in_context(word, candidates, before, after)
+                else:
+                    # The edits2 search used up the budget; pick from what it
+                    # found rather than searching again
+                    choice = max(candidates, key=lambda x: self.word_count.get(x, 0))
+            corrected.append(choice)
+            if complete:
+                in_context += 1
+            else:
+                by_frequency += 1
+        return corrected, in_context, by_frequency
+
+    def _rank_in_context(
+        self, word: str, candidates: Set[str], before: str, after: str
+    ) -> str:
+        """Pick the candidate of correct_in_context that fits its context."""
+        candidates = candidates - {word}
+        if not candidates:
+            return word
+        by_count = sorted(candidates, key=lambda w: (-self.word_count.get(w, 0), w))[
+            : self.max_candidates
+        ]
+        # Candidates are all from the nearest edit tier, so the context
+        # decides; ties go to the more frequent word
+        with self._stage("ranking"):
+            return max(by_count, key=lambda w: self.context_prob(w, before, after))
 
     def get_candidates(self, word: str) -> Set[str]:
         """Generate possible corrections for word.
@@ -200,25 +826,91 @@ class Checker:
         Returns:
             Set of candidate corrections
         """
+        return self._find_candidates(word)[0]
+
+    def _find_candidates(
+        self, word: str, deadline: Optional[float] = None
+    ) -> Tuple[Set[str], bool]:
+        """Generate candidates as get_candidates does, up to a deadline.
+
+        Args:
+            word: Word to generate candidates for
+            deadline: time.perf_counter() value after which the edits2
+                search stops, None for no limit
+
+        Returns:
+            Tuple of (candidates, whether the search finished); a search
+            stopped by the deadline returns the known words found so far,
+            or {word} if there are none
+        """
         # First, try known words
         known_candidates = self.knowns({word})
         if known_candidates:
-            return known_candidates
+            return known_candidates, True
+
+        if self.index is not None:
+            for distance in (1, 2):
+                indexed = self.index.lookup(word, distance)
+                if indexed:
+                    return indexed, True
+            return {word}, True
+
+        if self.trie is not None:
+            for distance in (1, 2):
+                found = self.trie.search(word, distance)
+                if found:
+                    return set(found), True
+            return {word}, True
 
         # Try edit distance 1
         edit1 = self.edits1(word)
         known_edit1 = self.knowns(edit1)
         if known_edit1:
-            return known_edit1
+            return known_edit1, True
 
         # Try edit distance 2
-        edit2 = {e2 for e1 in edit1 for e2 in self.edits1(e1)}
-        known_edit2 = self.knowns(edit2)
+        known_edit2: Set[str] = set()
+        for e1 in edit1:
+            if deadline is not None and time.perf_counter() >= deadline:
+                return known_edit2 or {word}, False
+            known_edit2 |= self.knowns(self.edits1(e1))
         if known_edit2:
-            return known_edit2
+            return known_edit2, True
 
         # If nothing found, return the original word
-        return {word}
+        return {word}, True
+
+    def words_within(self, word: str, radius: int) -> Tuple[List[Tuple[int, str]], int]:
+        """Find all vocabulary words within radius edits of word.
+
+        Args:
+            word: Query word
+            radius: Maximum Levenshtein distance
+
+        Returns:
+            Tuple of ((distance, word) matches sorted by distance, number of
+            distance evaluations the query needed)
+        """
+        with self._lock.read:
+            if self.bktree is None:
+                self.bktree = BKTree(self.word_count)
+            return self.bktree.query(word, radius)
+
+    def nearest_words(self, word: str, k: int = 5) -> Tuple[List[Tuple[int, str]], int]:
+        """Find the k vocabulary words closest to word.
+
+        Args:
+            word: Query word
+            k: Number of neighbours to return
+
+        Returns:
+            Tuple of ((distance, word) pairs sorted by distance, number of
+            distance evaluations the query needed)
+        """
+        with self._lock.read:
+            if self.bktree is None:
+                self.bktree = BKTree(self.word_count)
+            return self.bktree.nearest(word, k)
 
     def edits1(self, word: str) -> Set[str]:
         """Generate all strings one edit away from word.
@@ -0,0 +1,151 @@
+"""Bounded Levenshtein distance with a per-instance cache.
+
+Vocabulary scans only care whether a word lies within a small distance of
+the input, so computing the full O(n*m) table is wasted work. The engine
+restricts the dynamic program to a diagonal band of width ``max_dist`` and
+stops as soon as every cell of a row exceeds the bound.
+"""
+
+import collections
+import threading
+from typing import Dict, Optional, Tuple
+
+INF = float("inf")
+
+
+def bounded_levenshtein(s1: str, s2: str, max_dist: Optional[int] = None) -> int:
+    """Calculate the Levenshtein distance between two strings up to a bound.
+
+    Args:
+        s1: First string
+        s2: Second string
+        max_dist: Upper bound of interest, or None for the exact distance
+
+    Returns:
+        The distance if it is at most max_dist, otherwise max_dist + 1
+    """
+    # Common prefixes and suffixes never change the distance
+    start = 0
+    end1, end2 = len(s1), len(s2)
+    while start < end1 and start < end2 and s1[start] == s2[start]:
+        start += 1
+    while end1 > start and end2 > start and s1[end1 - 1] == s2[end2 - 1]:
+        end1 -= 1
+        end2 -= 1
+    s1, s2 = s1[start:end1], s2[start:end2]
+    if len(s1) < len(s2):
+        s1, s2 = s2, s1
+    n, m = len(s1), len(s2)
+
+    k = n if max_dist is None else max_dist
+    if n - m > k:
+        return k + 1
+    if m == 0:
+        return n
+
+    previous = [j if j <= k else INF for j in range(m + 1)]
+    current = [INF] * (m + 1)
+    for i in range(1, n + 1):
+        c1 = s1[i - 1]
+        lo = max(1, i - k)
+        hi = min(m, i + k)
+        current[lo - 1] = i if lo == 1 and i <= k else INF
+        row_min = current[lo - 1]
+        for j in range(lo, hi + 1):
+            value = previous[j - 1] + (c1 != s2[j - 1])
+            if previous[j] + 1 < value:
+                value = previous[j] + 1
+            if current[j - 1] + 1 < value:
+                value = current[j - 1] + 1
+            current[j] = value
+            if value < row_min:
+                row_min = value
+        if hi < m:
+            current[hi + 1] = INF
+        if row_min > k:
+            return k + 1
+        previous, current = current, previous
+
+    result = previous[m]
+    return int(result) if result <= k else k + 1
+
+
+class EditDistance:
+    """Thresholded edit distance engine with an LRU cache.
+
+    Attributes:
+        cache_size: Maximum number of cached string pairs
+        hits: Number of lookups answered from the cache
+        misses: Number of lookups that ran the dynamic program
+    """
+
+    def __init__(self, cache_size: int = 65536) -> None:
+        """Initialize the engine.
+
+        Args:
+            cache_size: Maximum number of cached string pairs, 0 disables
+                caching
+        """
+        self.cache_size = cache_size
+        self.hits = 0
+        self.misses = 0
+        # (s1, s2) -> (distance, exact); inexact entries store the bound
+        # that was exceeded plus one, i.e. a lower bound of the distance
+        self._cache: "collections.OrderedDict[Tuple[str, str], Tuple[int, bool]]" = (
+            collections.OrderedDict()
+        )
+        # Guards the cache order; the checker runs lookups concurrently
+        self._lock = threading.Lock()
+
+    def distance(self, s1: str, s2: str, max_dist: Optional[int] = None) -> int:
+        """Calculate the Levenshtein distance between two strings.
+
+        Args:
+            s1: First string
+            s2: Second string
+            max_dist: Upper bound of interest, or None for the exact distance
+
+        Returns:
+            The distance if it is at most max_dist, otherwise max_dist + 1
+        """
+        key = (s1, s2) if s1 <= s2 else (s2, s1)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                value, exact = cached
+                if exact or (max_dist is not None and value > max_dist):
+                    self.hits += 1
+                    self._cache.move_to_end(key)
+                    if max_dist is not None and value > max_dist:
+                        return max_dist + 1
+                    return value
+            self.misses += 1
+
+        value = bounded_levenshtein(s1, s2, max_dist)
+        exact = max_dist is None or value <= max_dist
+        if self.cache_size > 0:
+            with self._lock:
+                self._cache[key] = (value, exact)
+                self._cache.move_to_end(key)
+                if len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return value
+
+    def stats(self) -> Dict[str, int]:
+        """Return cache statistics.
+
+        Returns:
+            Dictionary with hits, misses, current size and maximum size
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._cache),
+            "max_size": self.cache_size,
+        }
+
+    def clear(self) -> None:
+        """Drop all cached distances and reset statistics."""
+        self._cache.clear()
+        self.hits = 0
+        self.misses = 0
@@ -0,0 +1,79 @@
+"""Reader/writer lock for the checker's model tables.
+
+Lookups only read the tables, so any number of them can run at once. Online
+updates mutate the tables in place and need them to themselves. Writers are
+preferred: once an update is waiting, new lookups wait behind it, so a
+steady stream of requests cannot starve it.
+
+The lock is not reentrant; a thread holding it must not acquire it again.
+"""
+
+import threading
+
+
+class _ReadSide:
+    """Context manager holding a ReadWriteLock for reading."""
+
+    def __init__(self, lock: "ReadWriteLock") -> None:
+        self._lock = lock
+
+    def __enter__(self) -> None:
+        self._lock.acquire_read()
+
+    def __exit__(self, *exc_info) -> None:
+        self._lock.release_read()
+
+
+class _WriteSide:
+    """Context manager holding a ReadWriteLock for writing."""
+
+    def __init__(self, lock: "ReadWriteLock") -> None:
+        self._lock = lock
+
+    def __enter__(self) -> None:
+        self._lock.acquire_write()
+
+    def __exit__(self, *exc_info) -> None:
+        self._lock.release_write()
+
+
+class ReadWriteLock:
+    """Shared lock for readers, exclusive lock for writers.
+
+    Attributes:
+        read: Context manager held while reading
+        write: Context manager held while writing
+    """
+
+    def __init__(self) -> None:
+        self._condition = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writing = False
+        self._waiting_writers = 0
+        self.read = _ReadSide(self)
+        self.write = _WriteSide(self)
+
+    def acquire_read(self) -> None:
+        with self._condition:
+            while self._writing or self._waiting_writers:
+                self._condition.wait()
+            self._readers += 1
+
+    def release_read(self) -> None:
+        with self._condition:
+            self._readers -= 1
+            if not self._readers and self._waiting_writers:
+                self._condition.notify_all()
+
+    def acquire_write(self) -> None:
+        with self._condition:
+            self._waiting_writers += 1
+            while self._writing or self._readers:
+                self._condition.wait()
+            self._waiting_writers -= 1
+            self._writing = True
+
+    def release_write(self) -> None:
+        with self._condition:
+            self._writing = False
+            self._condition.notify_all()
@@ -0,0 +1,446 @@
+"""In-process counters and latency histograms.
+
+Metrics are recorded into plain dicts under a lock, which costs about a
+microsecond per observation, so instrumentation can stay on in production.
+Histograms use fixed buckets, as in Prometheus, so percentiles are
+estimated from bucket counts and merging workers is a sum.
+
+With several gunicorn workers each process only sees its own requests. If
+a directory is configured, every process periodically writes a snapshot of
+its metrics there as <pid>.json, and collect() merges the snapshots of all
+processes. Snapshots of exited workers are kept, so counters never go
+backwards while the server runs.
+"""
+
+import bisect
+import glob
+import json
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# Upper bounds in seconds; the last bucket is +Inf
+LATENCY_BUCKETS = (
+    0.00001,
+    0.000025,
+    0.00005,
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+# Seconds between snapshot writes triggered by flush()
+FLUSH_INTERVAL = 1.0
+PREFIX = "spellcheck_"
+HELP = {
+    "requests_total": "HTTP requests handled, by endpoint and status",
+    "request_seconds": "HTTP request latency until the response is sent",
+    "stage_seconds": "Time spent in each spell checking stage",
+    "tokens_total": "Tokens spell checked",
+    "correction_cache_hits_total": "Correction cache lookups that hit",
+    "correction_cache_misses_total": "Correction cache lookups that missed",
+    "context_fallbacks_total": "Contextual checks that ran out of time budget",
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+Key = Tuple[str, Labels]
+
+
+class _Timer:
+    """Context manager observing its duration into a histogram."""
+
+    __slots__ = ("metrics", "name", "labels", "start")
+
+    def __init__(self, metrics: "Metrics", name: str, labels: Labels) -> None:
+        self.metrics = metrics
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self) -> "_Timer":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.metrics._observe(
+            (self.name, self.labels), time.perf_counter() - self.start
+        )
+
+
+class _NullTimer:
+    """Timer that records nothing, used when metrics are disabled."""
+
+    def __enter__(self) -> "_NullTimer":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        pass
+
+
+NULL_TIMER = _NullTimer()
+
+
+class Metrics:
+    """Registry of counters and histograms for one process.
+
+    Attributes:
+        directory: Directory shared by all worker processes, or None
+        started: Wall clock time the registry was created
+    """
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        buckets: Iterable[float] = LATENCY_BUCKETS,
+    ) -> None:
+        """Initialize the registry.
+
+        Args:
+            directory: Directory where snapshots of every process are
+                written and merged; created if missing
+            buckets: Histogram upper bounds in seconds, ascending
+        """
+        self.directory = directory
+        self.buckets = tuple(buckets)
+        self.started = time.time()
+        self._counters: Dict[Key, float] = {}
+        # key -> [per bucket counts, including +Inf, sum, count]
+        self._histograms: Dict[Key, list] = {}
+        self._collectors: List[Callable[[], Dict[str, float]]] = []
+        self._lock = threading.Lock()
+        self._flushed = 0.0
+        self._timer: Optional[threading.Timer] = None
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def inc(self, name: str, value: float = 1, **labels: str) -> None:
+        """Add value to a counter.
+
+        Args:
+            name: Counter name, ending in _total
+            value: Amount to add
+            **labels: Label values of the series
+        """
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        """Record one observation in a histogram.
+
+        Args:
+            name: Histogram name
+            value: Observed value, usually seconds
+            **labels: Label values of the series
+        """
+        self._observe((name, tuple(sorted(labels.items()))), value)
+
+    def _observe(self, key: Key, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = [
+                    [0] * (len(self.buckets) + 1),
+                    0.0,
+                    0,
+                ]
+            histogram[0][index] += 1
+            histogram[1] += value
+            histogram[2] += 1
+
+    def time(self, name: str, **labels: str) -> _Timer:
+        """Return a context manager observing its duration in a histogram.
+
+        Args:
+            name: Histogram name
+            **labels: Label values of the series
+        """
+        return _Timer(self, name, tuple(sorted(labels.items())))
+
+    def add_collector(self, collector: Callable[[], Dict[str, float]]) -> None:
+        """Register a callback reporting counters kept elsewhere.
+
+        The callback returns absolute counter values, e.g. the hits of a
+        cache, and is called whenever a snapshot is taken.
+
+        Args:
+            collector: Callable returning {counter name: value}
+        """
+        self._collectors.append(collector)
+
+    def snapshot(self) -> Dict:
+        """Return the metrics of this process as a JSON-serializable dict."""
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {
+                key: [list(h[0]), h[1], h[2]] for key, h in self._histograms.items()
+            }
+        for collector in self._collectors:
+            for name, value in collector().items():
+                counters[(name, ())] = value
+        return {
+            "pid": os.getpid(),
+            "started": self.started,
+            "buckets": list(self.buckets),
+            "counters": [[n, dict(lb), v] for (n, lb), v in counters.items()],
+            "histograms": [[n, dict(lb)] + h for (n, lb), h in histograms.items()],
+        }
+
+    def flush(self, force: bool = False) -> None:
+        """Write this process's snapshot to the shared directory.
+
+        Without force, writes at most once every FLUSH_INTERVAL seconds, so
+        it can be called after every request. A call that is skipped
+        schedules a write at the end of the interval, so the snapshot of an
+        idle worker is never more than FLUSH_INTERVAL behind.
+
+        Args:
+            force: Write even if the last write was recent
+        """
+        if not self.directory:
+            return
+        now = time.monotonic()
+        with self._lock:
+            wait = self._flushed + FLUSH_INTERVAL - now
+            if not force and wait > 0:
+                if self._timer is None:
+                    self._timer = threading.Timer(wait, self.flush, (True,))
+                    self._timer.daemon = True
+                    self._timer.start()
+                return
+            self._flushed = now
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        snapshot = self.snapshot()
+        path = os.path.join(self.directory, f"{snapshot['pid']}.json")
+        temporary = f"{path}.{threading.get_ident()}.tmp"
+        with open(temporary, "w") as f:
+            json.dump(snapshot, f)
+        os.replace(temporary, path)
+
+    def collect(self) -> List[Dict]:
+        """Return the snapshots of every process, this one up to date."""
+        own = self.snapshot()
+        snapshots = [own]
+        if self.directory:
+            for path in glob.glob(os.path.join(self.directory, "*.json")):
+                if os.path.basename(path) == f"{own['pid']}.json":
+                    continue
+                try:
+                    with open(path) as f:
+                        snapshots.append(json.load(f))
+                except (OSError, ValueError):
+                    # Removed or being replaced by its worker
+                    continue
+        return snapshots
+
+
+def clear_directory(directory: str) -> None:
+    """Remove the snapshots left in a directory by a previous server run."""
+    for path in glob.glob(os.path.join(directory, "*.json")):
+        os.remove(path)
+
+
+def merge(snapshots: List[Dict]) -> Dict:
+    """Sum counters and histograms over process snapshots.
+
+    Args:
+        snapshots: Snapshots as returned by Metrics.collect
+
+    Returns:
+        Dictionary with processes, started (earliest), buckets, counters
+        {(name, labels): value} and histograms {(name, labels): [counts,
+        sum, count]}
+    """
+    counters: Dict[Key, float] = {}
+    histograms: Dict[Key, list] = {}
+    buckets = snapshots[0]["buckets"] if snapshots else list(LATENCY_BUCKETS)
+    for snapshot in snapshots:
+        for name, labels, value in snapshot["counters"]:
+            key = (name, tuple(sorted(labels.items())))
+            counters[key] = counters.get(key, 0) + value
+        for name, labels, counts, total, count in snapshot["histograms"]:
+            key = (name, tuple(sorted(labels.items())))
+            merged = histograms.setdefault(key, [[0] * len(counts), 0.0, 0])
+            merged[0] = [a + b for a, b in zip(merged[0], counts)]
+            merged[1] += total
+            merged[2] += count
+    return {
+        "processes": len(snapshots),
+        "started": min((s["started"] for s in snapshots), default=time.time()),
+        "buckets": buckets,
+        "counters": counters,
+        "histograms": histograms,
+    }
+
+
+def quantile(q: float, buckets: List[float], counts: List[int]) -> Optional[float]:
+    """Estimate a quantile from histogram bucket counts.
+
+    Interpolates linearly inside the bucket holding the quantile, like
+    Prometheus' histogram_quantile. Values in the +Inf bucket are reported
+    as the largest finite bound.
+
+    Args:
+        q: Quantile between 0 and 1
+        buckets: Finite upper bounds
+        counts: Observations per bucket, +Inf last
+
+    Returns:
+        Estimated value, or None without observations
+    """
+    total = sum(counts)
+    if not total:
+        return None
+    rank = q * total
+    seen = 0
+    for i, count in enumerate(counts):
+        if count and seen + count >= rank:
+            if i == len(buckets):
+                return buckets[-1]
+            lower = buckets[i - 1] if i else 0.0
+            return lower + (buckets[i] - lower) * (rank - seen) / count
+        seen += count
+    return buckets[-1]
+
+
+def _summarize(buckets: List[float], histogram: list) -> Dict[str, Optional[float]]:
+    counts, total, count = histogram
+    return {
+        "count": count,
+        "avg": total / count if count else None,
+        "p50": quantile(0.5, buckets, counts),
+        "p95": quantile(0.95, buckets, counts),
+        "p99": quantile(0.99, buckets, counts),
+    }
+
+
+def summary(merged: Dict, check_endpoints: Iterable[str] = ()) -> Dict:
+    """Build the JSON view of merged metrics.
+
+    Args:
+        merged: Result of merge
+        check_endpoints: Endpoints whose time counts as spell checking time
+            when computing tokens per second
+
+    Returns:
+        Totals, error rate, uptime, tokens per second of checking time,
+        latency per endpoint, timings per stage and cache hit rate
+    """
+    counters, histograms = merged["counters"], merged["histograms"]
+    buckets = merged["buckets"]
+    requests = errors = 0
+    endpoints: Dict[str, Dict] = {}
+    for (name, labels), value in counters.items():
+        if name == "requests_total":
+            label = dict(labels)
+            requests += value
+            entry = endpoints.setdefault(
+                label["endpoint"], {"requests": 0, "errors": 0}
+            )
+            entry["requests"] += value
+            if label["status"].startswith("5"):
+                errors += value
+                entry["errors"] += value
+    stages = {}
+    latency_sum = latency_count = check_seconds = 0.0
+    check_endpoints = set(check_endpoints)
+    for (name, labels), histogram in histograms.items():
+        label = dict(labels)
+        if name == "request_seconds":
+            latency_sum += histogram[1]
+            latency_count += histogram[2]
+            if label["endpoint"] in check_endpoints:
+                check_seconds += histogram[1]
+            entry = endpoints.setdefault(
+                label["endpoint"], {"requests": 0, "errors": 0}
+            )
+            entry["latency"] = _summarize(buckets, histogram)
+        elif name == "stage_seconds":
+            stages[label["stage"]] = _summarize(buckets, histogram)
+    tokens = counters.get(("tokens_total", ()), 0)
+    hits = counters.get(("correction_cache_hits_total", ()), 0)
+    misses = counters.get(("correction_cache_misses_total", ()), 0)
+    return {
+        "total_requests": requests,
+        "avg_response_time": latency_sum / latency_count if latency_count else None,
+        "error_rate": errors / requests if requests else 0.0,
+        "uptime": time.time() - merged["started"],
+        "processes": merged["processes"],
+        "tokens": tokens,
+        "tokens_per_second": tokens / check_seconds if check_seconds else None,
+        "endpoints": endpoints,
+        "stages": stages,
+        "correction_cache": {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / (hits + misses) if hits + misses else None,
+        },
+    }
+
+
+def _format_labels(labels: Labels, extra: Labels = ()) -> str:
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (
+        (k, str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for k, v in pairs
+    )
+    return "{" + ",".join(f'{k}="{v}"' for k, v in escaped) + "}"
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def render_prometheus(merged: Dict) -> str:
+    """Render merged metrics in the Prometheus text exposition format.
+
+    Args:
+        merged: Result of merge
+
+    Returns:
+        Text in format version 0.0.4, metric names prefixed with spellcheck_
+    """
+    lines: List[str] = []
+    typed = set()
+
+    def header(name: str, kind: str) -> None:
+        if name not in typed:
+            typed.add(name)
+            if name in HELP:
+                lines.append(f"# HELP {PREFIX}{name} {HELP[name]}")
+            lines.append(f"# TYPE {PREFIX}{name} {kind}")
+
+    for (name, labels), value in sorted(merged["counters"].items()):
+        header(name, "counter")
+        lines.append(f"{PREFIX}{name}{_format_labels(labels)} {_format_value(value)}")
+    bounds = [_format_value(b) for b in merged["buckets"]] + ["+Inf"]
+    for (name, labels), (counts, total, count) in sorted(merged["histograms"].items()):
+        header(name, "histogram")
+        cumulative = 0
+        for bound, bucket in zip(bounds, counts):
+            cumulative += bucket
+            series = _format_labels(labels, (("le", bound),))
+            lines.append(f"{PREFIX}{name}_bucket{series} {cumulative}")
+        series = _format_labels(labels)
+        lines.append(f"{PREFIX}{name}_sum{series} {repr(float(total))}")
+        lines.append(f"{PREFIX}{name}_count{series} {count}")
+    header("uptime_seconds", "gauge")
+    lines.append(f"{PREFIX}uptime_seconds {time.time() - merged['started']:.3f}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,173 @@
+"""Probability views derived from n-gram counts.
+
+``Trainer.get_probs`` materializes ``count / sum(counts)`` for every n-gram,
+so adding a single document means recomputing every probability because
+the denominator changed. A view keeps the running total next to the count
+table and divides on lookup instead, which lets counts be updated in place.
+"""
+
+from typing import Dict, Hashable, Iterator, Mapping, MutableMapping, Optional
+
+from .snapshot import TABLES
+
+# Probability table name -> count table it is derived from
+PROBABILITY_TABLES = {
+    "unigram_probs": "word_count",
+    "bigram_probs": "bigram_count",
+    "trigram_probs": "trigram_count",
+}
+
+# Tables kept by drop_tables for each mode; word_count is always kept
+# because it doubles as the vocabulary
+KEEP_TABLES = {
+    "all": tuple(PROBABILITY_TABLES) + tuple(PROBABILITY_TABLES.values()),
+    "counts": tuple(PROBABILITY_TABLES.values()),
+    "probs": tuple(PROBABILITY_TABLES) + ("word_count",),
+}
+
+
+class LazyProbabilities(Mapping):
+    """Read-only probability table computed from counts on demand.
+
+    Returns the same values as the table built by ``Trainer.get_probs``:
+    ``count / total`` for counted n-grams and 0 for anything else. Unseen
+    n-grams are never inserted into the counts.
+
+    Attributes:
+        counts: Underlying count table, shared with the trainer
+        total: Sum of all values in counts
+    """
+
+    def __init__(self, counts: MutableMapping, total: Optional[int] = None) -> None:
+        """Create a view over a count table.
+
+        Args:
+            counts: Count table storing occurrences + 1 per n-gram
+            total: Sum of the counts if already known
+        """
+        self.counts = counts
+        self.total = sum(counts.values()) if total is None else total
+
+    def add(self, gram: Hashable, occurrences: int = 1) -> None:
+        """Record new occurrences of an n-gram and update the total.
+
+        New n-grams start from the add-one smoothed count of 1, like the
+        tables built by ``Trainer.train_model``.
+
+        Args:
+            gram: Word or n-gram tuple
+            occurrences: Number of occurrences to add
+        """
+        if gram in self.counts:
+            self.counts[gram] += occurrences
+            self.total += occurrences
+        else:
+            self.counts[gram] = 1 + occurrences
+            self.total += 1 + occurrences
+
+    def __getitem__(self, gram: Hashable) -> float:
+        count = self.counts.get(gram)
+        return count / self.total if count is not None else 0
+
+    def get(self, gram: Hashable, default=None):
+        count = self.counts.get(gram)
+        return count / self.total if count is not None else default
+
+    def __contains__(self, gram: object) -> bool:
+        return gram in self.counts
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    def __iter__(self) -> Iterator:
+        return iter(self.counts)
+
+
+class FrozenTable(dict):
+    """Read-only dict that returns a default for missing keys.
+
+    Unlike ``defaultdict``, looking up an unseen key does not insert it, so
+    the table cannot grow while serving requests. Any attempt to modify
+    the table raises TypeError.
+
+    Attributes:
+        default: Value returned for missing keys
+    """
+
+    def __init__(self, default, *args, **kwargs) -> None:
+        """Copy a table.
+
+        Args:
+            default: Value returned for missing keys
+            *args: Positional arguments for ``dict``
+            **kwargs: Keyword arguments for ``dict``
+        """
+        super().__init__(*args, **kwargs)
+        self.default = default
+
+    def __missing__(self, key):
+        return self.default
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("FrozenTable is read-only")
+
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only  # type: ignore
+
+    def __reduce__(self):
+        return type(self), (self.default, dict(self))
+
+
+def freeze(data: Dict) -> Dict:
+    """Replace every model table with a read-only, non-growing one.
+
+    Count and probability dicts become FrozenTable copies with the same
+    defaults. LazyProbabilities views are rebuilt over the frozen counts.
+    Other entries, such as a prebuilt trie, are kept as they are.
+
+    Args:
+        data: Data dictionary in the same shape as ``Trainer.data``
+
+    Returns:
+        The same data dictionary
+    """
+    for name in PROBABILITY_TABLES.values():
+        if name in data and not isinstance(data[name], FrozenTable):
+            data[name] = FrozenTable(TABLES[name][2], data[name])
+    for name, count_name in PROBABILITY_TABLES.items():
+        table = data.get(name)
+        if isinstance(table, LazyProbabilities):
+            data[name] = LazyProbabilities(data[count_name], table.total)
+        elif table is not None and not isinstance(table, FrozenTable):
+            data[name] = FrozenTable(TABLES[name][2], table)
+    return data
+
+
+def drop_tables(data: Dict, keep: str) -> Dict:
+    """Release duplicated model tables in place.
+
+    With keep="counts" every probability table is replaced by a
+    LazyProbabilities view over its count table, which gives identical
+    values. With keep="probs" the bigram and trigram counts are deleted,
+    after which the model can no longer be updated.
+
+    Args:
+        data: Data dictionary in the same shape as ``Trainer.data``
+        keep: "all", "counts" or "probs"
+
+    Returns:
+        The same data dictionary
+
+    Raises:
+        ValueError: If keep is not a known mode
+    """
+    if keep not in KEEP_TABLES:
+        raise ValueError(f"Unknown table mode: {keep}")
+    if keep == "counts":
+        for name, count_name in PROBABILITY_TABLES.items():
+            if not isinstance(data.get(name), LazyProbabilities):
+                data[name] = LazyProbabilities(data[count_name])
+    for name in PROBABILITY_TABLES.values():
+        if name not in KEEP_TABLES[keep]:
+            data.pop(name, None)
+    return data
@@ -0,0 +1,188 @@
+"""Compact integer-ID n-gram tables.
+
+Tuple-of-strings keys in a dict cost several hundred bytes per n-gram. Here
+words are interned to integer IDs, every n-gram is packed into a single
+64-bit key and the keys are kept in a sorted ``array('Q')`` next to an
+``array('d')`` of values, so an entry costs 16 bytes. Lookups pack the key
+and binary search for it.
+"""
+
+from array import array
+from bisect import bisect_left
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+
+class Vocabulary:
+    """Bidirectional mapping between words and integer IDs.
+
+    Attributes:
+        words: Word for each ID
+        ids: ID for each word
+    """
+
+    def __init__(self, words: Iterable[str] = ()) -> None:
+        """Create a vocabulary.
+
+        Args:
+            words: Initial words, assigned IDs in order
+        """
+        self.words: List[str] = []
+        self.ids: Dict[str, int] = {}
+        for word in words:
+            self.add(word)
+
+    def add(self, word: str) -> int:
+        """Return the ID of word, assigning a new one if needed.
+
+        Args:
+            word: Word to intern
+
+        Returns:
+            Integer ID of the word
+        """
+        word_id = self.ids.get(word)
+        if word_id is None:
+            word_id = len(self.words)
+            self.ids[word] = word_id
+            self.words.append(word)
+        return word_id
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+
+class NGramTable(Mapping):
+    """Read-only n-gram table keyed by packed 64-bit integers.
+
+    Behaves like the ``defaultdict`` tables built by Trainer for reads:
+    missing n-grams return the default value, but are never inserted.
+
+    Attributes:
+        vocabulary: Vocabulary used to intern words
+        order: Number of words per key (1, 2 or 3)
+        default: Value returned for unseen n-grams
+    """
+
+    def __init__(
+        self,
+        vocabulary: Vocabulary,
+        order: int,
+        keys: array,
+        values: array,
+        default: float = 0,
+    ) -> None:
+        """Wrap already packed and sorted arrays.
+
+        Args:
+            vocabulary: Vocabulary used to pack the keys
+            order: Number of words per key
+            keys: Sorted packed keys
+            values: Value for each key
+            default: Value returned for unseen n-grams
+        """
+        self.vocabulary = vocabulary
+        self.order = order
+        self.default = default
+        self._keys = keys
+        self._values = values
+        self._bits = 64 // order
+        self._mask = (1 << self._bits) - 1
+
+    @classmethod
+    def from_dict(
+        cls,
+        table: Mapping,
+        vocabulary: Vocabulary,
+        order: int,
+        typecode: str = "d",
+        default: float = 0,
+    ) -> "NGramTable":
+        """Pack a tuple-keyed (or word-keyed for order 1) table.
+
+        Words missing from the vocabulary are added to it.
+
+        Args:
+            table: Source table
+            vocabulary: Vocabulary to intern words into
+            order: Number of words per key
+            typecode: Array typecode for values, "d" or "q"
+            default: Value returned for unseen n-grams
+
+        Returns:
+            Packed table with the same entries
+
+        Raises:
+            ValueError: If the vocabulary is too large for the key width
+        """
+        bits = 64 // order
+        entries = []
+        for gram, value in table.items():
+            words = (gram,) if order == 1 else gram
+            key = 0
+            for word in words:
+                key = (key << bits) | vocabulary.add(word)
+            entries.append((key, value))
+        if len(vocabulary) > 1 << bits:
+            raise ValueError(
+                f"Vocabulary of {len(vocabulary)} words does not fit "
+                f"{bits}-bit IDs for order {order} n-grams"
+            )
+        entries.sort()
+        keys = array("Q", (k for k, _ in entries))
+        values = array(typecode, (v for _, v in entries))
+        return cls(vocabulary, order, keys, values, default)
+
+    def _pack(self, gram) -> Optional[int]:
+        ids = self.vocabulary.ids
+        key = 0
+        for word in (gram,) if self.order == 1 else gram:
+            word_id = ids.get(word)
+            if word_id is None:
+                return None
+            key = (key << self._bits) | word_id
+        return key
+
+    def _unpack(self, key: int):
+        ids = []
+        for _ in range(self.order):
+            ids.append(key & self._mask)
+            key >>= self._bits
+        words = tuple(self.vocabulary.words[i] for i in reversed(ids))
+        return words[0] if self.order == 1 else words
+
+    def _find(self, gram) -> int:
+        key = self._pack(gram)
+        if key is None:
+            return -1
+        i = bisect_left(self._keys, key)
+        if i < len(self._keys) and self._keys[i] == key:
+            return i
+        return -1
+
+    def __getitem__(self, gram):
+        i = self._find(gram)
+        return self._values[i] if i >= 0 else self.default
+
+    def get(self, gram, default=None):
+        i = self._find(gram)
+        return self._values[i] if i >= 0 else default
+
+    def __contains__(self, gram) -> bool:
+        return self._find(gram) >= 0
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __iter__(self) -> Iterator:
+        for key in self._keys:
+            yield self._unpack(key)
+
+    def items(self) -> Iterator[Tuple]:  # type: ignore[override]
+        for key, value in zip(self._keys, self._values):
+            yield self._unpack(key), value
+
+    def nbytes(self) -> int:
+        """Return the size of the key and value arrays in bytes."""
+        return self._keys.itemsize * len(self._keys) + self._values.itemsize * len(
+            self._values
+        )
@@ -0,0 +1,219 @@
+"""Opt-in profiling of individual spell checking requests.
+
+Profiling is off unless a RequestProfiler is created with enabled=True.
+Requests can then ask to be profiled, and a sample_rate above zero also
+profiles that fraction of all requests, so it can run continuously at a
+low rate. Each profile is summarized, with the time spent in the checker's
+candidate generation, vocabulary lookups and edit distances broken out, and
+saved as a .prof file that pstats or snakeviz can open.
+
+A slow input can also be profiled offline:
+
+    python -m lib.profiling "some text with a verylongunknowntoken"
+"""
+
+import cProfile
+import os
+import pstats
+import random
+import sys
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .checker import Checker
+
+# Checker methods reported separately in every summary
+FOCUS_FUNCTIONS = ("get_candidates", "knowns", "edits1", "edit_distance", "distance")
+
+FunctionKey = Tuple[str, int, str]
+
+
+def _code_key(function: Callable) -> FunctionKey:
+    code = function.__code__
+    return (code.co_filename, code.co_firstlineno, code.co_name)
+
+
+FOCUS_KEYS = {_code_key(getattr(Checker, name)): name for name in FOCUS_FUNCTIONS}
+
+
+def summarize(stats: pstats.Stats, top: int = 15) -> Dict:
+    """Summarize a profile.
+
+    Args:
+        stats: Profile statistics
+        top: Number of functions listed by cumulative time
+
+    Returns:
+        Dictionary with the total time, calls and cumulative seconds of each
+        focus function, and the top functions by cumulative time
+    """
+    focus = {name: {"calls": 0, "seconds": 0.0} for name in FOCUS_FUNCTIONS}
+    rows = []
+    for key, (_, calls, own, cumulative, _) in stats.stats.items():
+        name = FOCUS_KEYS.get(key)
+        if name is not None:
+            focus[name] = {"calls": calls, "seconds": cumulative}
+        filename, line, function = key
+        rows.append(
+            {
+                "function": f"{os.path.basename(filename)}:{line}({function})",
+                "calls": calls,
+                "own_seconds": own,
+                "seconds": cumulative,
+            }
+        )
+    rows.sort(key=lambda row: row["seconds"], reverse=True)
+    return {
+        "total_seconds": stats.total_tt,
+        "focus": focus,
+        "top": rows[:top],
+    }
+
+
+class RequestProfiler:
+    """Decides which requests to profile and stores their profiles.
+
+    Attributes:
+        enabled: Whether profiling is allowed at all
+        sample_rate: Fraction of requests profiled without being asked
+        directory: Where .prof files are saved, None to not save them
+        max_files: Number of saved profiles kept; older ones are deleted
+    """
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        sample_rate: float = 0.0,
+        directory: Optional[str] = None,
+        max_files: int = 100,
+    ) -> None:
+        """Initialize the profiler.
+
+        Args:
+            enabled: Allow profiling; when False nothing is ever profiled
+            sample_rate: Fraction of requests profiled without being asked
+            directory: Directory for .prof files, created if missing
+            max_files: Number of saved profiles kept
+        """
+        self.enabled = enabled
+        self.sample_rate = sample_rate
+        self.directory = directory
+        self.max_files = max_files
+        # Only one profiler can be active per interpreter on newer Pythons,
+        # so concurrent requests are not profiled
+        self._lock = threading.Lock()
+        if enabled and directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def should_profile(self, requested: bool = False) -> bool:
+        """Return whether the next request should be profiled.
+
+        Args:
+            requested: The request asked to be profiled
+        """
+        if not self.enabled:
+            return False
+        return requested or (
+            self.sample_rate > 0 and random.random() < self.sample_rate
+        )
+
+    def start(self) -> Optional[cProfile.Profile]:
+        """Start profiling the current thread.
+
+        Returns:
+            The running profile, or None if another request is being
+            profiled
+        """
+        if not self._lock.acquire(blocking=False):
+            return None
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Another profiler, e.g. a debugger, is already active
+            self._lock.release()
+            return None
+        return profile
+
+    def finish(self, profile: cProfile.Profile, label: str) -> Dict:
+        """Stop a profile started by start, save and summarize it.
+
+        Args:
+            profile: Profile returned by start
+            label: Short name used in the file name, e.g. the endpoint
+
+        Returns:
+            Summary as returned by summarize, plus the saved file name
+        """
+        try:
+            profile.disable()
+        finally:
+            self._lock.release()
+        stats = pstats.Stats(profile)
+        result = summarize(stats)
+        result["file"] = self.save(stats, label)
+        return result
+
+    def save(self, stats: pstats.Stats, label: str) -> Optional[str]:
+        """Dump a profile to the directory and prune old ones.
+
+        Returns:
+            File name of the saved profile, or None without a directory
+        """
+        if not self.directory:
+            return None
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        name = f"{stamp}-{os.getpid()}-{time.monotonic_ns()}-{label}.prof"
+        stats.dump_stats(os.path.join(self.directory, name))
+        saved = sorted(
+            (
+                entry
+                for entry in os.scandir(self.directory)
+                if entry.name.endswith(".prof")
+            ),
+            key=lambda entry: entry.stat().st_mtime,
+        )
+        for entry in saved[: max(0, len(saved) - self.max_files)]:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+        return name
+
+
+def format_summary(summary: Dict) -> str:
+    """Render a profile summary as text."""
+    lines = [f"total {summary['total_seconds']:.4f}s"]
+    for name, entry in summary["focus"].items():
+        lines.append(f"  {name:16}{entry['calls']:>10} calls{entry['seconds']:>10.4f}s")
+    lines.append("")
+    lines.append(f"{'calls':>10}{'own s':>10}{'cum s':>10}  function")
+    for row in summary["top"]:
+        lines.append(
+            f"{row['calls']:10}{row['own_seconds']:10.4f}{row['seconds']:10.4f}"
+            f"  {row['function']}"
+        )
+    return "\n".join(lines)
+
+
+def main() -> None:
+    """Profile correcting the words of the text given on the command line."""
+    if len(sys.argv) < 2:
+        print("Usage: python -m lib.profiling <text> [output.prof]")
+        sys.exit(1)
+    checker = Checker()
+    words: List[str] = sys.argv[1].split()
+    profile = cProfile.Profile()
+    profile.enable()
+    for word in words:
+        checker.correct(word)
+    profile.disable()
+    stats = pstats.Stats(profile)
+    if len(sys.argv) > 2:
+        stats.dump_stats(sys.argv[2])
+    print(format_summary(summarize(stats)))
+
+
+if __name__ == "__main__":
+    main()
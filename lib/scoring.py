@@ -0,0 +1,104 @@
+"""Vectorized candidate scoring with NumPy.
+
+Ranking a misspelling against the whole vocabulary costs one interpreted
+edit distance and five table lookups per word. Here the candidates are
+encoded once into a padded matrix of code points, and the Levenshtein
+distance of a word to every candidate is computed column by column over
+all candidates at once. Within a column the insertion recurrence
+``d[i] = min(x[i], d[i - 1] + 1)`` is a running minimum of ``x[i] - i``,
+so each column is a handful of array operations.
+
+NumPy is optional; the checker falls back to its Python ranking without it.
+"""
+
+from typing import List, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+HAS_NUMPY = np is not None
+
+
+class EncodedWords:
+    """Words packed into a code point matrix, sorted by length.
+
+    Attributes:
+        words: The words in their original order
+    """
+
+    def __init__(self, words: Sequence[str]) -> None:
+        """Encode words.
+
+        Args:
+            words: Words to compare against
+        """
+        self.words = list(words)
+        lengths = np.fromiter(map(len, self.words), np.int32, len(self.words))
+        self._order = np.argsort(lengths, kind="stable")
+        self._lengths = lengths[self._order]
+        width = int(self._lengths[-1]) if len(self.words) else 0
+        self._codes = np.zeros((len(self.words), width), np.int32)
+        for row, index in enumerate(self._order.tolist()):
+            word = self.words[index]
+            self._codes[row, : len(word)] = np.frombuffer(
+                word.encode("utf-32-le"), np.int32
+            )
+
+    def distances(self, word: str) -> "np.ndarray":
+        """Return the Levenshtein distance of word to every encoded word.
+
+        Args:
+            word: Query word
+
+        Returns:
+            Integer array of distances, in the order the words were given
+        """
+        m = len(word)
+        target = np.frombuffer(word.encode("utf-32-le"), np.int32)
+        steps = np.arange(m + 1, dtype=np.int16)
+        result = np.full(len(self.words), m, np.int16)
+        # Column j of the dynamic program for every word at least j long;
+        # sorted by length, those are a suffix of the rows
+        column = np.broadcast_to(steps, (len(self.words), m + 1))
+        first = 0
+        for j in range(1, self._codes.shape[1] + 1):
+            start = int(np.searchsorted(self._lengths, j))
+            column = column[start - first :]
+            first = start
+            cost = self._codes[start:, j - 1, None] != target
+            x = np.empty_like(column)
+            x[:, 0] = j
+            np.minimum(column[:, 1:] + 1, column[:, :-1] + cost, out=x[:, 1:])
+            column = np.minimum.accumulate(x - steps, axis=1) + steps
+            end = int(np.searchsorted(self._lengths, j, side="right"))
+            result[start:end] = column[: end - start, m]
+        distances = np.empty_like(result)
+        distances[self._order] = result
+        return distances
+
+
+def error_probs(distances: "np.ndarray") -> "np.ndarray":
+    """Return 1 / 2**distance, as Checker.error_prob computes it."""
+    return np.ldexp(1.0, -distances)
+
+
+def top_k(scores: "np.ndarray", k: int) -> List[int]:
+    """Return the indices of the k highest scores, best first.
+
+    Uses partial selection instead of a full sort. Ties are ordered by
+    descending index, which matches sorting ascending and reversing.
+
+    Args:
+        scores: Score of every candidate
+        k: Number of indices to return
+    """
+    n = len(scores)
+    if n > k:
+        threshold = np.partition(scores, n - k)[n - k]
+        selected = np.flatnonzero(scores >= threshold)
+    else:
+        selected = np.arange(n)
+    order = np.lexsort((-selected, -scores[selected]))
+    return selected[order[:k]].tolist()
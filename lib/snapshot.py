@@ -0,0 +1,162 @@
+"""Versioned binary snapshots of trained language models.
+
+Training re-reads and re-tokenizes the whole corpus, which every worker
+would otherwise repeat at startup. A snapshot stores the trained tables in
+a compact, pickle-free layout: a header, the vocabulary as one NUL
+separated UTF-8 blob, and every table as packed word-id and value arrays.
+
+Layout (all integers little-endian)::
+
+    magic "SPCKSNAP" | uint16 version | uint32 table count
+    uint64 vocabulary bytes | vocabulary blob
+    per table: uint16 name length | name | uint8 order | uint8 value type
+               uint64 entries | uint32 ids[entries * order] | values[entries]
+
+Usage:
+    python -m lib.snapshot corpus.txt data/model.snap
+"""
+
+import collections
+import struct
+import sys
+from array import array
+from typing import BinaryIO, Dict, Iterable, List, Optional, Tuple
+
+MAGIC = b"SPCKSNAP"
+FORMAT_VERSION = 1
+
+# Table name -> (n-gram order, array typecode, default value)
+TABLES: Dict[str, Tuple[int, str, float]] = {
+    "word_count": (1, "q", 1),
+    "bigram_count": (2, "q", 1),
+    "trigram_count": (3, "q", 1),
+    "unigram_probs": (1, "d", 0),
+    "bigram_probs": (2, "d", 0),
+    "trigram_probs": (3, "d", 0),
+}
+_VALUE_TYPES = {"q": 0, "d": 1}
+
+
+def _write_array(f: BinaryIO, values: array) -> None:
+    if sys.byteorder != "little":
+        values = array(values.typecode, values)
+        values.byteswap()
+    f.write(values.tobytes())
+
+
+def _read_array(f: BinaryIO, typecode: str, length: int) -> array:
+    values = array(typecode)
+    size = values.itemsize * length
+    raw = f.read(size)
+    if len(raw) != size:
+        raise ValueError("Truncated model snapshot")
+    values.frombytes(raw)
+    if sys.byteorder != "little":
+        values.byteswap()
+    return values
+
+
+def save_snapshot(data: Dict, path: str) -> None:
+    """Write trained model tables to a binary snapshot.
+
+    Args:
+        data: Trainer data dictionary
+        path: Destination file path
+    """
+    words: Dict[str, int] = {}
+    for name, (order, _, _) in TABLES.items():
+        for key in data[name]:
+            for word in (key,) if order == 1 else key:
+                if word not in words:
+                    words[word] = len(words)
+
+    blob = "\0".join(words).encode("utf-8")
+    with open(path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<HI", FORMAT_VERSION, len(TABLES)))
+        f.write(struct.pack("<Q", len(blob)))
+        f.write(blob)
+        for name, (order, typecode, _) in TABLES.items():
+            table = data[name]
+            ids = array("I")
+            for key in table:
+                if order == 1:
+                    ids.append(words[key])
+                else:
+                    ids.extend(words[w] for w in key)
+            encoded = name.encode("ascii")
+            f.write(struct.pack("<H", len(encoded)))
+            f.write(encoded)
+            f.write(struct.pack("<BBQ", order, _VALUE_TYPES[typecode], len(table)))
+            _write_array(f, ids)
+            _write_array(f, array(typecode, table.values()))
+
+
+def load_snapshot(path: str, tables: Optional[Iterable[str]] = None) -> Dict:
+    """Load model tables from a binary snapshot.
+
+    Counts come back as ``defaultdict(lambda: 1)`` and probabilities as
+    ``defaultdict(lambda: 0)``, exactly like the tables built by Trainer.
+
+    Args:
+        path: Snapshot file path
+        tables: Names of the tables to load, all of them if None; the
+            others are skipped without being read into memory
+
+    Returns:
+        Data dictionary in the same shape as ``Trainer.data``
+
+    Raises:
+        FileNotFoundError: If the snapshot does not exist
+        ValueError: If the file is not a snapshot or has another version
+    """
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"Not a model snapshot: {path}")
+        version, table_count = struct.unpack("<HI", f.read(6))
+        if version != FORMAT_VERSION:
+            raise ValueError(
+                f"Unsupported snapshot version {version} in {path}, "
+                f"expected {FORMAT_VERSION}"
+            )
+        (blob_size,) = struct.unpack("<Q", f.read(8))
+        blob = f.read(blob_size).decode("utf-8")
+        words: List[str] = blob.split("\0") if blob_size else [""]
+
+        wanted = None if tables is None else set(tables)
+        data: Dict = {}
+        typecodes = {v: k for k, v in _VALUE_TYPES.items()}
+        for _ in range(table_count):
+            (name_size,) = struct.unpack("<H", f.read(2))
+            name = f.read(name_size).decode("ascii")
+            order, value_type, entries = struct.unpack("<BBQ", f.read(10))
+            if wanted is not None and name not in wanted:
+                item_size = array(typecodes[value_type]).itemsize
+                f.seek(entries * (order * array("I").itemsize + item_size), 1)
+                continue
+            ids = _read_array(f, "I", entries * order)
+            values = _read_array(f, typecodes[value_type], entries)
+            if order == 1:
+                keys = map(words.__getitem__, ids)
+            else:
+                columns = [map(words.__getitem__, ids[i::order]) for i in range(order)]
+                keys = zip(*columns)
+            default = TABLES[name][2] if name in TABLES else 0
+            table = collections.defaultdict(lambda d=default: d)
+            table.update(zip(keys, values))
+            data[name] = table
+    return data
+
+
+def main() -> None:
+    """Train on a corpus from data/ and write its snapshot."""
+    from .trainer import Trainer
+
+    if len(sys.argv) != 3:
+        print("Usage: python -m lib.snapshot <corpus> <snapshot path>")
+        sys.exit(1)
+    Trainer(corpus=sys.argv[1]).save_snapshot(sys.argv[2])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+"""Precomputed deletion index for fast candidate lookup.
+
+Implements the symmetric-delete approach popularised by SymSpell: every
+vocabulary word is indexed under all strings obtained by deleting up to
+``max_distance`` characters from it. At query time the same deletions are
+generated for the misspelled word, so all vocabulary words within the edit
+bound are found with a handful of dictionary lookups instead of probing the
+hundreds of thousands of strings produced by ``edits1``/``edits2``.
+"""
+
+import collections
+from typing import DefaultDict, Dict, Iterable, List, Set
+
+LETTERS = "abcdefghijklmnopqrstuvwxyz"
+
+
+def deletes(word: str, max_distance: int) -> Set[str]:
+    """Generate all strings reachable by deleting up to max_distance chars.
+
+    Args:
+        word: Input word
+        max_distance: Maximum number of characters to delete
+
+    Returns:
+        Set of deletion variants, including the word itself
+    """
+    result = {word}
+    frontier = {word}
+    for _ in range(max_distance):
+        next_frontier = set()
+        for w in frontier:
+            for i in range(len(w)):
+                next_frontier.add(w[:i] + w[i + 1 :])
+        next_frontier -= result
+        result |= next_frontier
+        frontier = next_frontier
+    return result
+
+
+def damerau_levenshtein(
+    source: str, target: str, alphabet: Iterable[str] = LETTERS
+) -> float:
+    """Calculate the Damerau-Levenshtein distance from source to target.
+
+    This is the unrestricted (Lowrance-Wagner) variant, i.e. the length of
+    the shortest sequence of deletions, adjacent transpositions,
+    replacements and insertions turning source into target. Mirroring
+    ``Checker.edits1``, characters can only be inserted or replaced with
+    characters from alphabet; any other character in target must come from
+    source. The result is exact when target only uses alphabet characters,
+    see ``within_distance`` for the general case.
+
+    Args:
+        source: Misspelled word
+        target: Candidate word
+        alphabet: Characters that may be inserted or substituted in
+
+    Returns:
+        Edit distance, or ``float("inf")`` if target is unreachable
+    """
+    inf = float("inf")
+    allowed = set(alphabet)
+    n, m = len(source), len(target)
+    insert_cost = [1 if c in allowed else inf for c in target]
+
+    # d is offset by one so that row/column 0 hold the "infinite" sentinel
+    d = [[inf] * (m + 2) for _ in range(n + 2)]
+    d[1][1] = 0
+    for j in range(1, m + 1):
+        d[1][j + 1] = d[1][j] + insert_cost[j - 1]
+    for i in range(1, n + 1):
+        d[i + 1][1] = i
+
+    last_row: Dict[str, int] = {}
+    for i in range(1, n + 1):
+        a = source[i - 1]
+        last_col = 0
+        for j in range(1, m + 1):
+            b = target[j - 1]
+            k = last_row.get(b, 0)
+            col = last_col
+            if a == b:
+                cost = 0
+                last_col = j
+            else:
+                cost = insert_cost[j - 1]
+            best = min(
+                d[i][j] + cost,
+                d[i + 1][j] + insert_cost[j - 1],
+                d[i][j + 1] + 1,
+            )
+            if k and col:
+                between = sum(insert_cost[col : j - 1])
+                best = min(best, d[k][col] + (i - k - 1) + 1 + between)
+            d[i + 1][j + 1] = best
+        last_row[a] = i
+    return d[n + 1][m + 1]
+
+
+def _one_edit(source: str, target: str, alphabet: Set[str]) -> bool:
+    """Check whether target is exactly one ``edits1`` step from source."""
+    n, m = len(source), len(target)
+    if abs(n - m) > 1:
+        return False
+    i = 0
+    while i < min(n, m) and source[i] == target[i]:
+        i += 1
+    if n == m:
+        if i == n:
+            # Replacing a character with itself or swapping equal neighbours
+            return any(c in alphabet for c in source) or any(
+                source[j] == source[j + 1] for j in range(n - 1)
+            )
+        if target[i] in alphabet and source[i + 1 :] == target[i + 1 :]:
+            return True
+        return (
+            i + 1 < n
+            and source[i] == target[i + 1]
+            and source[i + 1] == target[i]
+            and source[i + 2 :] == target[i + 2 :]
+        )
+    if n > m:
+        return source[i + 1 :] == target[i:]
+    return target[i] in alphabet and source[i:] == target[i + 1 :]
+
+
+def _reachable(source: str, target: str, k: int, alphabet: Set[str]) -> bool:
+    """Search for a sequence of at most k ``edits1`` steps to target."""
+    if source == target:
+        return True
+    if k == 0:
+        return False
+    if k == 1:
+        return _one_edit(source, target, alphabet)
+    # Inserting a character that target does not contain never helps
+    useful = alphabet & set(target)
+    splits = [(source[:i], source[i:]) for i in range(len(source) + 1)]
+    steps = [L + R[1:] for L, R in splits if R]
+    steps += [L + R[1] + R[0] + R[2:] for L, R in splits if len(R) > 1]
+    steps += [L + c + R[1:] for L, R in splits if R for c in useful]
+    steps += [L + c + R for L, R in splits for c in useful]
+    return any(_reachable(s, target, k - 1, alphabet) for s in set(steps))
+
+
+def within_distance(
+    source: str, target: str, max_distance: int, alphabet: Iterable[str] = LETTERS
+) -> bool:
+    """Check whether target is within max_distance ``edits1`` steps of source.
+
+    Args:
+        source: Misspelled word
+        target: Candidate word
+        max_distance: Maximum number of edits
+        alphabet: Characters that may be inserted or substituted in
+
+    Returns:
+        True if target can be produced from source within the bound
+    """
+    allowed = set(alphabet)
+    if abs(len(source) - len(target)) > max_distance:
+        return False
+    if all(c in allowed for c in target):
+        return damerau_levenshtein(source, target, allowed) <= max_distance
+    # The transposition shortcut of Lowrance-Wagner assumes any character can
+    # be deleted and re-inserted; fall back to a bounded search otherwise.
+    return _reachable(source, target, max_distance, allowed)
+
+
+class DeletionIndex:
+    """Symmetric-delete index over a vocabulary.
+
+    Attributes:
+        max_distance: Largest edit distance the index can answer
+        index: Mapping from deletion variant to the vocabulary words
+            producing it
+    """
+
+    def __init__(self, vocabulary: Iterable[str], max_distance: int = 2) -> None:
+        """Build the index from a vocabulary.
+
+        Args:
+            vocabulary: Known words to index
+            max_distance: Largest edit distance supported by lookups
+        """
+        self.max_distance = max_distance
+        self.index: DefaultDict[str, List[str]] = collections.defaultdict(list)
+        for word in vocabulary:
+            self.add(word)
+
+    def add(self, word: str) -> None:
+        """Add a single word to the index.
+
+        Args:
+            word: Vocabulary word to index
+        """
+        for variant in deletes(word, self.max_distance):
+            self.index[variant].append(word)
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def lookup(self, word: str, max_distance: int) -> Set[str]:
+        """Return vocabulary words within max_distance edits of word.
+
+        Gives the same answer as filtering the known words out of
+        ``edits1`` (max_distance=1) or ``edits2`` (max_distance=2).
+
+        Args:
+            word: Word to look up
+            max_distance: Maximum edit distance, at most self.max_distance
+
+        Returns:
+            Set of vocabulary words within the distance bound
+
+        Raises:
+            ValueError: If max_distance exceeds the indexed distance
+        """
+        if max_distance > self.max_distance:
+            raise ValueError(
+                f"Index built for distance {self.max_distance}, "
+                f"cannot answer distance {max_distance}"
+            )
+        seen: Set[str] = set()
+        result = set()
+        for variant in deletes(word, max_distance):
+            for candidate in self.index.get(variant, ()):
+                if candidate in seen:
+                    continue
+                seen.add(candidate)
+                if within_distance(word, candidate, max_distance):
+                    result.add(candidate)
+        return result
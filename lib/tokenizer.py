@@ -0,0 +1,196 @@
+"""Tokenizer shared by training, checking and serving.
+
+Words are runs of Latin letters and apostrophes, matched on the original
+text rather than a lowercased copy, so "café" stays one word. Each word is
+reported as a span of the input together with its normalized, lowercase
+form, so callers can look up the normalized word and still rebuild the text
+with its original casing, punctuation and whitespace. Sentences end at ".",
+"?", "!" or a newline, and words and sentence boundaries are found in one
+pass with a single pattern.
+"""
+
+import re
+from typing import (
+    Generator,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
+
+# ASCII, Latin-1 and Latin Extended letters, without × and ÷
+LETTERS = "A-Za-z\u00c0-\u00d6\u00d8-\u00f6\u00f8-\u024f'"
+WORD_PATTERN = re.compile(f"[{LETTERS}]+")
+SENTENCE_BOUNDARY = re.compile(r"[.?!\n]+")
+# A word (group 1) or a run of sentence boundaries
+TOKEN_PATTERN = re.compile(f"([{LETTERS}]+)|[.?!\n]+")
+
+
+class Token(NamedTuple):
+    """A word of the input.
+
+    Attributes:
+        start: Offset of the first character in the text
+        end: Offset after the last character
+        word: Normalized (lowercase) word
+    """
+
+    start: int
+    end: int
+    word: str
+
+
+def tokenize(text: str, pos: int = 0, endpos: Optional[int] = None) -> Iterator[Token]:
+    """Yield the words of text as spans, without copying the text.
+
+    Args:
+        text: Input text
+        pos: Offset to start at
+        endpos: Offset to stop at, the end of the text by default
+
+    Yields:
+        Token for every word, in order
+    """
+    end = len(text) if endpos is None else endpos
+    for match in WORD_PATTERN.finditer(text, pos, end):
+        yield Token(match.start(), match.end(), match.group().lower())
+
+
+def words(text: str) -> List[str]:
+    """Return the normalized words of text."""
+    return [match.group().lower() for match in WORD_PATTERN.finditer(text)]
+
+
+def _scan_sentences(
+    text: str,
+) -> Generator[List[str], None, Tuple[List[str], int]]:
+    """Yield the sentences of text that end at a boundary.
+
+    Returns:
+        Words and start offset of the unfinished sentence after the last
+        boundary
+    """
+    current: List[str] = []
+    start = 0
+    for match in TOKEN_PATTERN.finditer(text):
+        if match.lastindex:
+            current.append(match.group(1).lower())
+            continue
+        if match.start() > start:
+            yield current
+        current = []
+        start = match.end()
+    return current, start
+
+
+def sentences(text: str) -> Iterator[List[str]]:
+    """Split text into sentences of normalized words in one pass.
+
+    A sentence is the text between two boundaries. Sentences that are not
+    empty are yielded even if they contain no words, e.g. " , ", as the
+    n-gram models count them.
+
+    Yields:
+        Words of each sentence
+    """
+    current, start = yield from _scan_sentences(text)
+    if start < len(text):
+        yield current
+
+
+def stream_sentences(chunks: Iterable[str]) -> Iterator[List[str]]:
+    """Split chunked text into sentences, as sentences does for the whole.
+
+    The text after the last boundary of each chunk is carried over, so
+    sentences and words spanning chunk edges are kept intact.
+
+    Args:
+        chunks: Text chunks in order
+
+    Yields:
+        Words of each sentence
+    """
+    carry = ""
+    current: List[str] = []
+    for chunk in chunks:
+        text = carry + chunk
+        current, start = yield from _scan_sentences(text)
+        carry = text[start:]
+    if carry:
+        yield current
+
+
+def stream_tokens(
+    chunks: Iterable[str], max_length: int = 1024
+) -> Iterator[Tuple[Token, str]]:
+    """Tokenize chunked text with offsets into the whole document.
+
+    A word touching the end of a chunk is held back until the next chunk
+    shows whether it continues. Words longer than max_length are cut, so a
+    document of letters only cannot grow the buffer.
+
+    Args:
+        chunks: Text chunks in order
+        max_length: Longest word held back across chunks
+
+    Yields:
+        (token, original text of the word) pairs
+    """
+    carry = ""
+    base = 0  # Offset of the first character of carry + chunk
+    for chunk in chunks:
+        text = carry + chunk
+        carry = ""
+        consumed = len(text)
+        for match in WORD_PATTERN.finditer(text):
+            original = match.group()
+            if match.end() == len(text) and len(original) <= max_length:
+                carry = original
+                consumed = match.start()
+                break
+            start = base + match.start()
+            yield Token(start, start + len(original), original.lower()), original
+        base += consumed
+    if carry:
+        yield Token(base, base + len(carry), carry.lower()), carry
+
+
+def restore_case(original: str, word: str) -> str:
+    """Give a correction the casing of the word it replaces.
+
+    Args:
+        original: Word as written, e.g. "Teh" or "TEH"
+        word: Normalized correction, e.g. "the"
+
+    Returns:
+        word in upper case if original is, capitalized if original is,
+        otherwise unchanged
+    """
+    if len(original) > 1 and original.isupper():
+        return word.upper()
+    if original[:1].isupper():
+        return word[:1].upper() + word[1:]
+    return word
+
+
+def rebuild(text: str, replacements: Iterable[Tuple[int, int, str]]) -> str:
+    """Replace spans of text, keeping everything between them.
+
+    Args:
+        text: Original text
+        replacements: (start, end, replacement) in ascending, non-overlapping
+            order
+
+    Returns:
+        The text with every span replaced
+    """
+    parts = []
+    position = 0
+    for start, end, replacement in replacements:
+        parts.append(text[position:start])
+        parts.append(replacement)
+        position = end
+    parts.append(text[position:])
+    return "".join(parts)
@@ -5,33 +5,188 @@ in contextual spell checking and correction.
 """
 
 import collections
+import functools
+import io
+import multiprocessing
 import os
 import re
-from typing import List, Tuple, Dict, DefaultDict
+import sys
+import time
+from typing import IO, Iterable, Iterator, List, Tuple, Dict, DefaultDict
+
+from . import tokenizer
+from .model import PROBABILITY_TABLES, LazyProbabilities
+from .snapshot import save_snapshot
+from .trie import VocabularyTrie
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None
+
+SENTENCE_BOUNDARY_BYTE = re.compile(rb"[.?!\n]")
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+
+def peak_rss_mb() -> float:
+    """Return the peak resident set size of this process in MB.
+
+    Returns:
+        Peak RSS in megabytes, or 0.0 where it cannot be measured
+    """
+    if resource is None:
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes
+    return peak / (1 << 20) if sys.platform == "darwin" else peak / 1024
+
+
+def current_rss_mb() -> float:
+    """Return the current resident set size of this process in MB.
+
+    Returns:
+        Current RSS in megabytes where /proc is available, otherwise the
+        peak RSS
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / (1 << 20)
+    except (OSError, ValueError):
+        return peak_rss_mb()
+
+
+class _ByteRange(io.RawIOBase):
+    """Raw binary stream restricted to [start, end) of a file."""
+
+    def __init__(self, path: str, start: int, end: int) -> None:
+        self._file = open(path, "rb")
+        self._file.seek(start)
+        self._remaining = end - start
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        size = min(len(buffer), self._remaining)
+        if size <= 0:
+            return 0
+        read = self._file.readinto(memoryview(buffer)[:size])
+        self._remaining -= read
+        return read
+
+    def close(self) -> None:
+        self._file.close()
+        super().close()
+
+
+def shard_offsets(path: str, shards: int) -> List[Tuple[int, int]]:
+    """Split a file into byte ranges that end on sentence boundaries.
+
+    Every range except the last ends right after a boundary character, so
+    splitting each range into sentences gives the same sentences as
+    splitting the whole file. Boundary characters are ASCII, so cuts never
+    fall inside a multi-byte UTF-8 sequence.
+
+    Args:
+        path: Corpus file path
+        shards: Desired number of ranges
+
+    Returns:
+        List of non-empty (start, end) byte ranges covering the file
+    """
+    size = os.path.getsize(path)
+    offsets = [0]
+    with open(path, "rb") as f:
+        for i in range(1, shards):
+            position = max(size * i // shards, offsets[-1])
+            f.seek(position)
+            while True:
+                block = f.read(1 << 16)
+                if not block:
+                    position = size
+                    break
+                match = SENTENCE_BOUNDARY_BYTE.search(block)
+                if match:
+                    position = f.tell() - len(block) + match.end()
+                    break
+            offsets.append(position)
+    offsets.append(size)
+    return [(a, b) for a, b in zip(offsets, offsets[1:]) if b > a]
+
+
+def read_chunks(f: IO[str], chunk_size: int) -> Iterator[str]:
+    """Yield a text file chunk_size characters at a time."""
+    return iter(functools.partial(f.read, chunk_size), "")
+
+
+def _count_shard(args: Tuple[str, int, int, int]) -> Tuple[Dict, Dict, Dict]:
+    """Count n-grams in one byte range of the corpus (process pool task)."""
+    path, start, end, chunk_size = args
+    raw = io.BufferedReader(_ByteRange(path, start, end))
+    # TextIOWrapper applies the same decoding and newline translation as
+    # opening the whole corpus in text mode
+    with io.TextIOWrapper(raw, encoding="utf-8") as f:
+        trainer = Trainer.__new__(Trainer)
+        counts = trainer.count_ngrams(
+            tokenizer.stream_sentences(read_chunks(f, chunk_size))
+        )
+    # Plain dicts, since defaultdicts with lambdas cannot be pickled
+    return tuple(dict(table) for table in counts)
 
 
 class Trainer:
     """Train n-gram language models from text corpus.
 
     Attributes:
-        corpus: Raw text corpus string
+        corpus: Raw text corpus string, None when trained in streaming mode
         data: Dictionary containing trained models and probabilities
+        stats: Training throughput and peak memory figures
     """
 
-    def __init__(self, corpus: str = "corpus.txt") -> None:
+    def __init__(
+        self,
+        corpus: str = "corpus.txt",
+        build_trie: bool = False,
+        streaming: bool = False,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        workers: int = 1,
+        lazy_probs: bool = False,
+    ) -> None:
         """Initialize and train language models from corpus.
 
         Args:
             corpus: Filename of the corpus file in data/ directory
+            build_trie: Also store a packed vocabulary trie under
+                data["trie"]
+            streaming: Read the corpus in chunks and count n-grams on the
+                fly instead of loading it and materializing n-gram lists
+            chunk_size: Number of characters read per chunk when streaming
+            workers: Number of processes; above 1 the corpus is split into
+                sentence-aligned shards counted in a process pool, which
+                implies streaming
+            lazy_probs: Store probabilities as LazyProbabilities views over
+                the counts instead of materializing a second dict per table
 
         Raises:
             FileNotFoundError: If corpus file doesn't exist
             IOError: If corpus file cannot be read
         """
         corpus_path = os.path.join("data", corpus)
+        start = time.perf_counter()
+        streaming = streaming or workers > 1
         try:
             with open(corpus_path, "r", encoding="utf-8") as f:
-                self.corpus = f.read()
+                if workers > 1:
+                    self.corpus = None
+                    counts = self.count_parallel(corpus_path, workers, chunk_size)
+                elif streaming:
+                    self.corpus = None
+                    sentences = tokenizer.stream_sentences(read_chunks(f, chunk_size))
+                    counts = self.count_ngrams(sentences)
+                else:
+                    self.corpus = f.read()
+                    counts = self.count_ngrams(tokenizer.sentences(self.corpus))
         except FileNotFoundError:
             raise FileNotFoundError(
                 f"Corpus file not found: {corpus_path}. "
@@ -41,18 +196,86 @@ class Trainer:
             raise IOError(f"Error reading corpus file {corpus_path}: {str(e)}")
 
         self.data: Dict = {}
-        word_list = self.words(self.corpus)
-        bigram_list = self.bigrams(self.corpus)
-        trigram_list = self.trigrams(self.corpus)
-        word_count = self.train_model(word_list)
-        bigram_count = self.train_model(bigram_list)
-        trigram_count = self.train_model(trigram_list)
+        word_count, bigram_count, trigram_count = counts
         self.data["word_count"] = word_count
         self.data["bigram_count"] = bigram_count
         self.data["trigram_count"] = trigram_count
-        self.data["unigram_probs"] = self.get_probs(word_count)
-        self.data["bigram_probs"] = self.get_probs(bigram_count)
-        self.data["trigram_probs"] = self.get_probs(trigram_count)
+        for name, count_name in PROBABILITY_TABLES.items():
+            count = self.data[count_name]
+            if lazy_probs:
+                self.data[name] = LazyProbabilities(count)
+            else:
+                self.data[name] = self.get_probs(count)
+        if build_trie:
+            self.data["trie"] = VocabularyTrie.from_counts(word_count)
+
+        elapsed = time.perf_counter() - start
+        size = os.path.getsize(corpus_path)
+        self.stats = {
+            "bytes": size,
+            "seconds": elapsed,
+            "mb_per_s": size / 1e6 / elapsed if elapsed > 0 else 0.0,
+            "peak_rss_mb": peak_rss_mb(),
+        }
+
+    @classmethod
+    def from_data(cls, data: Dict) -> "Trainer":
+        """Wrap already trained model data, e.g. a loaded snapshot.
+
+        Args:
+            data: Data dictionary in the same shape as ``Trainer.data``
+
+        Returns:
+            Trainer without corpus or training stats that can be updated
+        """
+        trainer = cls.__new__(cls)
+        trainer.corpus = None
+        trainer.data = data
+        trainer.stats = {}
+        return trainer
+
+    def update(self, text: str) -> Tuple[Dict, Dict, Dict]:
+        """Add a document to the trained model in place.
+
+        Counts are incremented exactly as if text had been appended to the
+        corpus on a new line. On the first update the probability tables
+        are replaced by LazyProbabilities views over the counts, after
+        which an update costs time proportional to the document only.
+
+        Args:
+            text: Document to learn from
+
+        Returns:
+            Tuple of (word, bigram, trigram) occurrences found in text
+        """
+        sentences = tokenizer.sentences(text)
+        added = []
+        for name, table in zip(PROBABILITY_TABLES, self.count_ngrams(sentences)):
+            probs = self.data[name]
+            if not isinstance(probs, LazyProbabilities):
+                probs = LazyProbabilities(self.data[PROBABILITY_TABLES[name]])
+                self.data[name] = probs
+            occurrences = {gram: count - 1 for gram, count in table.items()}
+            for gram, count in occurrences.items():
+                probs.add(gram, count)
+            added.append(occurrences)
+        word_count = self.data["word_count"]
+        if "trie" in self.data and any(
+            word_count[w] == n + 1 for w, n in added[0].items()
+        ):
+            self.data["trie"] = VocabularyTrie.from_counts(word_count)
+        return added[0], added[1], added[2]
+
+    def save_snapshot(self, path: str) -> None:
+        """Export the trained counts and probabilities as a binary snapshot.
+
+        The snapshot can be passed to ``Checker(snapshot=path)`` to skip
+        training at startup.
+
+        Args:
+            path: Destination file path
+        """
+        save_snapshot(self.data, path)
 
     def get_probs(self, count: DefaultDict) -> DefaultDict:
         """Calculate probability distribution from frequency counts.
@@ -78,7 +301,7 @@ class Trainer:
         Returns:
             List of lowercase words and contractions
         """
-        return re.findall("[a-z']+", text.lower())
+        return tokenizer.words(text)
 
     def bigrams(self, text: str) -> List[Tuple[str, str]]:
         """Extract bigrams (word pairs) from text.
@@ -90,9 +313,8 @@ class Trainer:
             List of bigram tuples with sentence boundary markers (^, $)
         """
         word_list = []
-        lines = filter(None, re.split(r"[.?!\n]+", text))
-        for line in lines:
-            mod_line = ["^"] + self.words(line) + ["$"]
+        for sentence in tokenizer.sentences(text):
+            mod_line = ["^"] + sentence + ["$"]
             for i in range(len(mod_line) - 1):
                 word_list.append((mod_line[i], mod_line[i + 1]))
         return word_list
@@ -107,13 +329,69 @@ class Trainer:
             List of trigram tuples with sentence boundary markers (^, $)
         """
         word_list = []
-        lines = filter(None, re.split(r"[.?!\n]+", text))
-        for line in lines:
-            mod_line = ["^"] + self.words(line) + ["$"]
+        for sentence in tokenizer.sentences(text):
+            mod_line = ["^"] + sentence + ["$"]
             for i in range(len(mod_line) - 2):
                 word_list.append((mod_line[i], mod_line[i + 1], mod_line[i + 2]))
         return word_list
 
+    def count_ngrams(
+        self, sentences: Iterable[List[str]]
+    ) -> Tuple[DefaultDict, DefaultDict, DefaultDict]:
+        """Count unigrams, bigrams and trigrams over a stream of sentences.
+
+        Produces the same counts, in the same order, as running train_model
+        over words, bigrams and trigrams of the whole text.
+
+        Args:
+            sentences: Words of each sentence, as yielded by
+                tokenizer.sentences
+
+        Returns:
+            Tuple of (word_count, bigram_count, trigram_count)
+        """
+        word_count = collections.defaultdict(lambda: 1)
+        bigram_count = collections.defaultdict(lambda: 1)
+        trigram_count = collections.defaultdict(lambda: 1)
+        for tokens in sentences:
+            for word in tokens:
+                word_count[word] += 1
+            padded = ["^"] + tokens + ["$"]
+            for bigram in zip(padded, padded[1:]):
+                bigram_count[bigram] += 1
+            for trigram in zip(padded, padded[1:], padded[2:]):
+                trigram_count[trigram] += 1
+        return word_count, bigram_count, trigram_count
+
+    def count_parallel(
+        self, path: str, workers: int, chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> Tuple[DefaultDict, DefaultDict, DefaultDict]:
+        """Count n-grams over sentence-aligned shards in a process pool.
+
+        Shards are merged in file order, so both the counts and the key
+        order are identical to a serial run.
+
+        Args:
+            path: Corpus file path
+            workers: Number of worker processes
+            chunk_size: Number of characters read per chunk in each worker
+
+        Returns:
+            Tuple of (word_count, bigram_count, trigram_count)
+        """
+        merged = tuple(collections.defaultdict(lambda: 1) for _ in range(3))
+        tasks = [
+            (path, start, end, chunk_size)
+            for start, end in shard_offsets(path, workers)
+        ]
+        with multiprocessing.Pool(workers) as pool:
+            for shard in pool.imap(_count_shard, tasks):
+                for total, partial in zip(merged, shard):
+                    for gram, count in partial.items():
+                        # Every table stores occurrences + 1 (add-one smoothing)
+                        total[gram] += count - 1
+        return merged
+
     def train_model(self, features: List) -> DefaultDict:
         """Train frequency model from feature list.
 
@@ -0,0 +1,201 @@
+"""Packed prefix trie over the vocabulary.
+
+The trie is stored as flat arrays in breadth-first order: one label
+character per node, a CSR-style ``children_start`` offset table and the
+word frequency on terminal nodes. Candidate generation walks the trie with
+a Damerau-Levenshtein row per node and abandons any branch whose prefix is
+already too far from the input, so only live branches are visited instead
+of generating every string produced by ``edits1``/``edits2``.
+"""
+
+from array import array
+from collections import deque
+from typing import Dict, Iterator, List, Mapping, Tuple
+
+from .symspell import LETTERS, within_distance
+
+
+class VocabularyTrie:
+    """Read-only prefix trie with frequencies on terminal nodes.
+
+    Attributes:
+        labels: Character of each node, the root holds a placeholder
+        children_start: Children of node i are the nodes
+            children_start[i] .. children_start[i + 1] - 1
+        counts: Word frequency for terminal nodes, 0 otherwise
+    """
+
+    def __init__(self, labels: str, children_start: array, counts: array) -> None:
+        """Wrap already packed trie arrays.
+
+        Args:
+            labels: Node labels in breadth-first order
+            children_start: Offset table of length len(labels) + 1
+            counts: Terminal frequencies, one per node
+        """
+        self.labels = labels
+        self.children_start = children_start
+        self.counts = counts
+        self._size = sum(1 for c in counts if c)
+
+    @classmethod
+    def from_counts(cls, word_count: Mapping[str, int]) -> "VocabularyTrie":
+        """Build a packed trie from a word frequency table.
+
+        Args:
+            word_count: Mapping from word to frequency
+
+        Returns:
+            Packed trie containing every word with a positive count
+        """
+        # Build a temporary nested-dict trie: node = [children, count]
+        root: List = [{}, 0]
+        for word, count in word_count.items():
+            if not count:
+                continue
+            node = root
+            for char in word:
+                node = node[0].setdefault(char, [{}, 0])
+            node[1] = count
+
+        labels = [" "]
+        counts = array("Q", [root[1]])
+        children_start = array("I")
+        queue = deque([root])
+        next_id = 1
+        while queue:
+            node = queue.popleft()
+            children_start.append(next_id)
+            for char in sorted(node[0]):
+                child = node[0][char]
+                labels.append(char)
+                counts.append(child[1])
+                queue.append(child)
+                next_id += 1
+        children_start.append(next_id)
+        return cls("".join(labels), children_start, counts)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _find(self, word: str) -> int:
+        node = 0
+        for char in word:
+            start, end = self.children_start[node], self.children_start[node + 1]
+            for child in range(start, end):
+                if self.labels[child] == char:
+                    node = child
+                    break
+            else:
+                return -1
+        return node
+
+    def __contains__(self, word: object) -> bool:
+        if not isinstance(word, str):
+            return False
+        node = self._find(word)
+        return node >= 0 and self.counts[node] > 0
+
+    def count(self, word: str) -> int:
+        """Return the stored frequency of word, 0 if absent.
+
+        Args:
+            word: Word to look up
+
+        Returns:
+            Frequency stored on the terminal node
+        """
+        node = self._find(word)
+        return self.counts[node] if node >= 0 else 0
+
+    def __iter__(self) -> Iterator[str]:
+        stack: List[Tuple[int, str]] = [(0, "")]
+        while stack:
+            node, prefix = stack.pop()
+            if self.counts[node]:
+                yield prefix
+            start, end = self.children_start[node], self.children_start[node + 1]
+            for child in range(end - 1, start - 1, -1):
+                stack.append((child, prefix + self.labels[child]))
+
+    def search(self, word: str, max_distance: int) -> Dict[str, int]:
+        """Find vocabulary words within max_distance edits of word.
+
+        Gives the same answer as filtering the known words out of
+        ``edits1`` (max_distance=1) or ``edits2`` (max_distance=2).
+
+        Args:
+            word: Word to look up
+            max_distance: Maximum number of edits
+
+        Returns:
+            Mapping from each matching word to its frequency
+        """
+        m = len(word)
+        inf = float("inf")
+        results: Dict[str, int] = {}
+        # rows[i] holds the distances between the first i path characters
+        # and every prefix of word
+        rows: List[List[float]] = [[float(j) for j in range(m + 1)]]
+        path: List[str] = []
+        last_seen: Dict[str, int] = {}
+
+        def visit(node: int, bound: float) -> None:
+            i = len(path)
+            char = path[-1]
+            previous = rows[-1]
+            row = [float(i)] + [inf] * m
+            last_match = 0
+            for j in range(1, m + 1):
+                b = word[j - 1]
+                cost = 0 if char == b else 1
+                value = min(previous[j - 1] + cost, previous[j] + 1, row[j - 1] + 1)
+                k = last_seen.get(b, 0)
+                if k and last_match:
+                    value = min(
+                        value,
+                        rows[k - 1][last_match - 1]
+                        + (i - k - 1)
+                        + 1
+                        + (j - last_match - 1),
+                    )
+                if cost == 0:
+                    last_match = j
+                row[j] = value
+
+            if self.counts[node] and row[m] <= max_distance:
+                candidate = "".join(path)
+                # Distances above treat every character as insertable, which
+                # is exact unless the candidate uses non-alphabet characters
+                if all(c in LETTERS for c in candidate) or within_distance(
+                    word, candidate, max_distance
+                ):
+                    results[candidate] = self.counts[node]
+
+            # Transpositions may still reach back one row per extra edit, so
+            # a subtree is dead only once every earlier row is too far away
+            bound = min(min(row), bound + 1)
+            if bound > max_distance:
+                return
+            rows.append(row)
+            previous_seen = last_seen.get(char, 0)
+            last_seen[char] = i
+            start, end = self.children_start[node], self.children_start[node + 1]
+            for child in range(start, end):
+                path.append(self.labels[child])
+                visit(child, bound)
+                path.pop()
+            if previous_seen:
+                last_seen[char] = previous_seen
+            else:
+                del last_seen[char]
+            rows.pop()
+
+        if self.counts[0] and m <= max_distance:
+            results[""] = self.counts[0]
+        start, end = self.children_start[0], self.children_start[1]
+        for child in range(start, end):
+            path.append(self.labels[child])
+            visit(child, 0.0)
+            path.pop()
+        return results
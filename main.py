@@ -4,17 +4,34 @@ This module provides both a web interface and REST API for spell checking functi
 Includes security headers, CORS configuration, and rate limiting.
 """
 
+import codecs
 from datetime import datetime, timezone
+import json
+import os
 import platform
 import secrets
 import sys
-from typing import Dict, Any, Tuple
-
-from flask import Flask, render_template, request, jsonify, Response
+import tempfile
+import time
+from typing import IO, Dict, Any, Iterator, List, Optional, Tuple
+
+from flask import (
+    Flask,
+    g,
+    render_template,
+    request,
+    jsonify,
+    Response,
+    stream_with_context,
+)
 from flask_cors import CORS
 from werkzeug.exceptions import UnsupportedMediaType, BadRequest
 
+from lib.cache import create_cache
 from lib.checker import Checker
+from lib.metrics import Metrics, merge, render_prometheus, summary
+from lib.profiling import RequestProfiler
+from lib.tokenizer import Token, rebuild, restore_case, stream_tokens, tokenize
 
 app = Flask(__name__)
 CORS(
@@ -39,10 +56,165 @@ app.config["PERMANENT_SESSION_LIFETIME"] = 3600  # 1 hour
 
 # Application constants
 MAX_TEXT_LENGTH = 10000
+MAX_UPDATE_LENGTH = 1000000
+# Batch limits apply to the whole request, on top of MAX_TEXT_LENGTH per item
+MAX_BATCH_ITEMS = 1000
+MAX_BATCH_CHARS = 200000
+# Streaming limits: the body is read STREAM_CHUNK_SIZE bytes at a time and
+# at most STREAM_CACHE_SIZE distinct corrections are remembered, so memory
+# stays constant however large the document is
+MAX_STREAM_BYTES = 64 * 1024 * 1024
+STREAM_CHUNK_SIZE = 64 * 1024
+STREAM_CACHE_SIZE = 4096
+MAX_TOKEN_LENGTH = 1024
 APP_VERSION = "1.0.0"
 
-# Initialize spell checker (singleton pattern)
-checker = Checker()
+# Binary model snapshot built with `python -m lib.snapshot corpus.txt <path>`;
+# loading it skips retraining from the corpus on every worker boot
+MODEL_SNAPSHOT = os.environ.get("SPELLCHECK_SNAPSHOT", "data/model.snap")
+
+# /api/update is disabled unless a token is configured; clients must send it
+# as "Authorization: Bearer <token>"
+UPDATE_TOKEN = os.environ.get("SPELLCHECK_UPDATE_TOKEN")
+
+# Correction cache: "lru" keeps corrections per worker, "file" shares them
+# between all workers on the host through a SQLite file, "none" disables it
+CORRECTION_CACHE = os.environ.get("SPELLCHECK_CACHE", "lru")
+CORRECTION_CACHE_SIZE = int(os.environ.get("SPELLCHECK_CACHE_SIZE", "65536"))
+CORRECTION_CACHE_PATH = os.environ.get(
+    "SPELLCHECK_CACHE_PATH",
+    os.path.join(tempfile.gettempdir(), "spellcheck-corrections.sqlite"),
+)
+
+# Packed n-gram tables: far less memory, and workers forked from a preloaded
+# master (see gunicorn.conf.py) keep sharing them; rules out online updates
+COMPACT_TABLES = os.environ.get("SPELLCHECK_COMPACT") == "1" and not UPDATE_TOKEN
+
+# /api/check corrects by word frequency unless a request asks for
+# "mode": "context", which ranks candidates with the n-gram model of their
+# neighbours. Contextual ranking gets SPELLCHECK_CONTEXT_BUDGET_MS per
+# request; words left when it runs out are corrected by frequency
+CHECK_MODES = ("frequency", "context")
+DEFAULT_CHECK_MODE = os.environ.get("SPELLCHECK_MODE", "frequency")
+if DEFAULT_CHECK_MODE not in CHECK_MODES:
+    raise ValueError(f"Unknown SPELLCHECK_MODE: {DEFAULT_CHECK_MODE}")
+CONTEXT_BUDGET = float(os.environ.get("SPELLCHECK_CONTEXT_BUDGET_MS", "100")) / 1000
+
+# Metrics are kept per process; with several workers set a directory they
+# all share, so that /api/metrics reports the whole server
+METRICS_DIR = os.environ.get("SPELLCHECK_METRICS_DIR")
+# Endpoints whose latency counts as checking time for tokens per second
+CHECK_ENDPOINTS = ("api_check", "api_check_batch", "api_check_stream")
+metrics = Metrics(directory=METRICS_DIR)
+
+# Request profiling is off unless SPELLCHECK_PROFILING=1. Then a request
+# sent with ?profile=1 or "X-Profile: 1" gets its profile summary in the
+# JSON response, and SPELLCHECK_PROFILE_RATE profiles that fraction of all
+# requests in the background. Profiles are saved in SPELLCHECK_PROFILE_DIR
+profiler = RequestProfiler(
+    enabled=os.environ.get("SPELLCHECK_PROFILING") == "1",
+    sample_rate=float(os.environ.get("SPELLCHECK_PROFILE_RATE", "0")),
+    directory=os.environ.get(
+        "SPELLCHECK_PROFILE_DIR",
+        os.path.join(tempfile.gettempdir(), "spellcheck-profiles"),
+    ),
+)
+
+# Initialize spell checker (singleton pattern). Probabilities are derived
+# from the counts, and the model is frozen unless updates are enabled, so
+# lookups of unseen n-grams never grow worker memory
+checker = Checker(
+    snapshot=MODEL_SNAPSHOT if os.path.exists(MODEL_SNAPSHOT) else None,
+    keep_tables="counts",
+    frozen=not UPDATE_TOKEN,
+    compact=COMPACT_TABLES,
+    cache=create_cache(CORRECTION_CACHE, CORRECTION_CACHE_SIZE, CORRECTION_CACHE_PATH),
+    metrics=metrics,
+)
+metrics.add_collector(
+    lambda: (
+        {
+            "correction_cache_hits_total": checker.cache.hits,
+            "correction_cache_misses_total": checker.cache.misses,
+        }
+        if checker.cache is not None
+        else {}
+    )
+)
+
+
+@app.before_request
+def start_request_timer() -> None:
+    """Remember when the request started, for the latency histogram."""
+    g.request_start = time.perf_counter()
+
+
+@app.after_request
+def record_request_metrics(response: Response) -> Response:
+    """Count the request and record its latency per endpoint.
+
+    Args:
+        response: Flask response object
+
+    Returns:
+        The response, unchanged
+    """
+    start = g.get("request_start")
+    endpoint = request.endpoint or "unmatched"
+    metrics.inc("requests_total", endpoint=endpoint, status=str(response.status_code))
+    # Streamed responses record their latency once the body is sent
+    if start is not None and not g.get("timed_by_stream"):
+        metrics.observe(
+            "request_seconds", time.perf_counter() - start, endpoint=endpoint
+        )
+    metrics.flush()
+    return response
+
+
+@app.before_request
+def start_profile() -> None:
+    """Profile the request if it asks for it or is sampled."""
+    requested = (
+        request.args.get("profile") == "1" or request.headers.get("X-Profile") == "1"
+    )
+    if profiler.should_profile(requested):
+        g.profile = profiler.start()
+        g.profile_requested = requested
+
+
+@app.after_request
+def attach_profile(response: Response) -> Response:
+    """Save the request's profile and return its summary if requested.
+
+    Streamed responses are only profiled until the response starts.
+
+    Args:
+        response: Flask response object
+
+    Returns:
+        The response, with the summary under "profile" for JSON responses
+        that asked for it and the saved file in X-Profile-File
+    """
+    profile = g.pop("profile", None)
+    if profile is None:
+        return response
+    result = profiler.finish(profile, request.endpoint or "unmatched")
+    if result["file"]:
+        response.headers["X-Profile-File"] = result["file"]
+    if g.get("profile_requested") and response.is_json and not response.is_streamed:
+        data = response.get_json()
+        if isinstance(data, dict):
+            data["profile"] = result
+            response.set_data(json.dumps(data))
+    return response
+
+
+@app.teardown_request
+def stop_profile(error: Optional[BaseException]) -> None:
+    """Stop a profile left running by a request that failed."""
+    profile = g.pop("profile", None)
+    if profile is not None:
+        profiler.finish(profile, "failed")
 
 
 @app.after_request
@@ -95,18 +267,110 @@ def home() -> str:
     return render_template("home.html", text=text)
 
 
-def spellcheck(text: str) -> str:
+def apply_corrections(text: str, tokens: List[Token], checked: List[str]) -> str:
+    """Rebuild text with every corrected word replaced in place.
+
+    Corrections take the casing of the word they replace; punctuation,
+    whitespace and words left alone keep their original form.
+
+    Args:
+        text: Original text
+        tokens: Words of text, as returned by tokenize
+        checked: Normalized correction of each token
+
+    Returns:
+        Corrected text
+    """
+    return rebuild(
+        text,
+        (
+            (token.start, token.end, restore_case(text[token.start : token.end], word))
+            for token, word in zip(tokens, checked)
+            if word != token.word
+        ),
+    )
+
+
+def spellcheck(text: str, corrections: Optional[Dict[str, str]] = None) -> str:
     """Check and correct spelling of input text.
 
     Args:
         text: Input text to spell check
+        corrections: Optional cache of corrections shared between texts;
+            each distinct word is only corrected once
 
     Returns:
         Corrected text with spelling fixes applied
     """
-    # Use list comprehension for better performance
-    checked = [checker.correct(word) for word in text.split()]
-    return " ".join(checked)
+    with metrics.time("stage_seconds", stage="tokenize"):
+        tokens = list(tokenize(text))
+    metrics.inc("tokens_total", len(tokens))
+    if corrections is None:
+        corrections = {}
+    checked = []
+    for token in tokens:
+        corrected = corrections.get(token.word)
+        if corrected is None:
+            corrected = corrections[token.word] = checker.correct(token.word)
+        checked.append(corrected)
+    return apply_corrections(text, tokens, checked)
+
+
+def spellcheck_in_context(text: str, budget: Optional[float] = None) -> Tuple[str, str]:
+    """Correct text using the context of each word, within a time budget.
+
+    Args:
+        text: Input text to spell check
+        budget: Seconds available for contextual ranking, CONTEXT_BUDGET
+            by default
+
+    Returns:
+        Tuple of (corrected text, mode): "context" if every word was ranked
+        in context, "frequency" if the budget ran out before the first
+        unknown word and "mixed" if it ran out part way
+    """
+    with metrics.time("stage_seconds", stage="tokenize"):
+        tokens = list(tokenize(text))
+    metrics.inc("tokens_total", len(tokens))
+    if budget is None:
+        budget = CONTEXT_BUDGET
+    words = [token.word for token in tokens]
+    checked, in_context, by_frequency = checker.correct_in_context(words, budget)
+    if not by_frequency:
+        mode = "context"
+    else:
+        metrics.inc("context_fallbacks_total")
+        mode = "mixed" if in_context else "frequency"
+    return apply_corrections(text, tokens, checked), mode
+
+
+def check_batch_item(item: Any, corrections: Dict[str, str]) -> Dict[str, Any]:
+    """Validate and correct one text of a batch.
+
+    Args:
+        item: Raw batch item
+        corrections: Corrections shared across the batch
+
+    Returns:
+        Per-item result in the same shape as the /api/check response
+    """
+    if not isinstance(item, str):
+        return {"success": False, "error": "Item is not a string"}
+    text = item.strip()
+    if not text:
+        return {"success": False, "error": "Empty text provided"}
+    if len(text) > MAX_TEXT_LENGTH:
+        return {
+            "success": False,
+            "error": f"Text too long! Maximum {MAX_TEXT_LENGTH} characters allowed.",
+        }
+    corrected_text = spellcheck(text, corrections)
+    return {
+        "success": True,
+        "original": text,
+        "corrected": corrected_text,
+        "has_corrections": text != corrected_text,
+    }
 
 
 @app.route("/api/check", methods=["POST"])
@@ -114,10 +378,14 @@ def api_check() -> Tuple[Dict[str, Any], int]:
     """API endpoint for spell checking.
 
     Accepts JSON payload with 'text' field and returns corrected text.
+    With "mode": "context" candidates are ranked by the n-gram model of
+    their neighbours, within the server's time budget; the response mode
+    says how the text was actually corrected.
 
     Request JSON:
         {
-            "text": "Text to check"
+            "text": "Text to check",
+            "mode": "frequency" | "context"  (optional)
         }
 
     Response JSON:
@@ -125,7 +393,8 @@ def api_check() -> Tuple[Dict[str, Any], int]:
             "success": true,
             "original": "Original text",
             "corrected": "Corrected text",
-            "has_corrections": true
+            "has_corrections": true,
+            "mode": "frequency" | "context" | "mixed"
         }
 
     Returns:
@@ -162,8 +431,23 @@ def api_check() -> Tuple[Dict[str, Any], int]:
                 400,
             )
 
+        mode = data.get("mode", DEFAULT_CHECK_MODE)
+        if mode not in CHECK_MODES:
+            return (
+                jsonify(
+                    {
+                        "success": False,
+                        "error": f"Unknown mode. Use one of: {', '.join(CHECK_MODES)}",
+                    }
+                ),
+                400,
+            )
+
         # Perform spell check
-        corrected_text = spellcheck(text)
+        if mode == "context":
+            corrected_text, mode = spellcheck_in_context(text)
+        else:
+            corrected_text = spellcheck(text)
 
         return (
             jsonify(
@@ -172,6 +456,7 @@ def api_check() -> Tuple[Dict[str, Any], int]:
                     "original": text,
                     "corrected": corrected_text,
                     "has_corrections": text != corrected_text,
+                    "mode": mode,
                 }
             ),
             200,
@@ -200,6 +485,302 @@ def api_check() -> Tuple[Dict[str, Any], int]:
         )
 
 
+@app.route("/api/check/batch", methods=["POST"])
+def api_check_batch() -> Tuple[Dict[str, Any], int]:
+    """API endpoint for spell checking many texts in one request.
+
+    Tokens repeated across the batch are corrected once. Invalid items get
+    an error result of their own instead of failing the whole batch.
+
+    Request JSON:
+        {
+            "texts": ["First text", "Second text"]
+        }
+
+    Response JSON:
+        {
+            "success": true,
+            "results": [
+                {
+                    "success": true,
+                    "original": "First text",
+                    "corrected": "First text",
+                    "has_corrections": false
+                },
+                ...
+            ],
+            "unique_tokens": 3
+        }
+
+    Returns:
+        Tuple of (JSON response, HTTP status code)
+    """
+    try:
+        data = request.get_json(force=False, silent=False)
+
+        if not isinstance(data, dict) or not isinstance(data.get("texts"), list):
+            return (
+                jsonify({"success": False, "error": "No texts array provided"}),
+                400,
+            )
+
+        texts: List[Any] = data["texts"]
+        if len(texts) > MAX_BATCH_ITEMS:
+            return (
+                jsonify(
+                    {
+                        "success": False,
+                        "error": (
+                            f"Too many texts! Maximum {MAX_BATCH_ITEMS} per batch."
+                        ),
+                    }
+                ),
+                400,
+            )
+        total_chars = sum(len(t) for t in texts if isinstance(t, str))
+        if total_chars > MAX_BATCH_CHARS:
+            return (
+                jsonify(
+                    {
+                        "success": False,
+                        "error": (
+                            f"Batch too long! Maximum {MAX_BATCH_CHARS} "
+                            "characters allowed."
+                        ),
+                    }
+                ),
+                400,
+            )
+
+        corrections: Dict[str, str] = {}
+        results = [check_batch_item(item, corrections) for item in texts]
+
+        return (
+            jsonify(
+                {
+                    "success": True,
+                    "results": results,
+                    "unique_tokens": len(corrections),
+                }
+            ),
+            200,
+        )
+
+    except UnsupportedMediaType:
+        return (
+            jsonify(
+                {
+                    "success": False,
+                    "error": "Invalid Content-Type. Please use application/json",
+                }
+            ),
+            415,
+        )
+    except BadRequest as e:
+        return (
+            jsonify({"success": False, "error": f"Invalid JSON: {str(e)}"}),
+            400,
+        )
+    except Exception as e:
+        app.logger.error(f"Batch spell check error: {str(e)}", exc_info=True)
+        return (
+            jsonify({"success": False, "error": f"Server error: {str(e)}"}),
+            500,
+        )
+
+
+class PayloadTooLarge(Exception):
+    """Raised when a streamed request body exceeds its size limit."""
+
+
+def read_text_chunks(stream: IO[bytes], limit: int) -> Iterator[str]:
+    """Decode a UTF-8 byte stream chunk by chunk.
+
+    Args:
+        stream: Binary request body
+        limit: Maximum number of bytes to read
+
+    Yields:
+        Decoded text chunks; multi-byte characters split across reads are
+        kept whole
+
+    Raises:
+        PayloadTooLarge: If the stream is longer than limit
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    total = 0
+    while True:
+        raw = stream.read(STREAM_CHUNK_SIZE)
+        if not raw:
+            break
+        total += len(raw)
+        if total > limit:
+            raise PayloadTooLarge(f"Document too long! Maximum {limit} bytes allowed.")
+        yield decoder.decode(raw)
+    yield decoder.decode(b"", final=True)
+
+
+@app.route("/api/check/stream", methods=["POST"])
+def api_check_stream() -> Response:
+    """Streaming API endpoint for spell checking large documents.
+
+    The request body is the raw UTF-8 document, which may be sent with
+    chunked transfer encoding. It is read and tokenized incrementally, and
+    every correction is written back as soon as it is found, one JSON
+    object per line (NDJSON). Offsets are in characters; "original" is the
+    word as written and "corrected" has the same casing, so replacing each
+    span rebuilds the corrected document.
+
+    Response lines:
+        {"offset": 4, "original": "Tset", "corrected": "Test"}
+        ...
+        {"success": true, "tokens": 1200, "corrections": 3}
+
+    A failure after streaming started is reported as a final
+    {"success": false, "error": "..."} line.
+
+    Returns:
+        Streaming application/x-ndjson response
+    """
+    stream = request.stream
+    start = g.get("request_start", time.perf_counter())
+    g.timed_by_stream = True
+
+    def generate() -> Iterator[str]:
+        corrections: Dict[str, str] = {}
+        tokens = corrected = 0
+        try:
+            chunks = read_text_chunks(stream, MAX_STREAM_BYTES)
+            for token, original in stream_tokens(chunks, MAX_TOKEN_LENGTH):
+                tokens += 1
+                fixed = corrections.get(token.word)
+                if fixed is None:
+                    if len(corrections) >= STREAM_CACHE_SIZE:
+                        corrections.clear()
+                    fixed = corrections[token.word] = checker.correct(token.word)
+                if fixed != token.word:
+                    corrected += 1
+                    line = {
+                        "offset": token.start,
+                        "original": original,
+                        "corrected": restore_case(original, fixed),
+                    }
+                    yield json.dumps(line) + "\n"
+            summary = {"success": True, "tokens": tokens, "corrections": corrected}
+            yield json.dumps(summary) + "\n"
+        except PayloadTooLarge as e:
+            yield json.dumps({"success": False, "error": str(e)}) + "\n"
+        except Exception as e:
+            app.logger.error(f"Streaming spell check error: {str(e)}", exc_info=True)
+            error = {"success": False, "error": f"Server error: {str(e)}"}
+            yield json.dumps(error) + "\n"
+        finally:
+            metrics.inc("tokens_total", tokens)
+            metrics.observe(
+                "request_seconds",
+                time.perf_counter() - start,
+                endpoint="api_check_stream",
+            )
+            metrics.flush()
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+
+@app.route("/api/update", methods=["POST"])
+def api_update() -> Tuple[Dict[str, Any], int]:
+    """API endpoint for teaching the live model a new document.
+
+    Request JSON:
+        {
+            "text": "Document to learn from"
+        }
+
+    Response JSON:
+        {
+            "success": true,
+            "new_words": ["words", "added", "to", "the", "vocabulary"],
+            "vocabulary_size": 12345
+        }
+
+    Returns:
+        Tuple of (JSON response, HTTP status code)
+    """
+    if not UPDATE_TOKEN:
+        return (
+            jsonify({"success": False, "error": "Model updates are disabled"}),
+            404,
+        )
+    expected = f"Bearer {UPDATE_TOKEN}".encode("utf-8")
+    provided = request.headers.get("Authorization", "").encode("utf-8")
+    if not secrets.compare_digest(provided, expected):
+        return jsonify({"success": False, "error": "Invalid update token"}), 403
+
+    try:
+        data = request.get_json(force=False, silent=False)
+
+        if not data or "text" not in data:
+            return (
+                jsonify({"success": False, "error": "No text provided"}),
+                400,
+            )
+
+        text = data["text"].strip()
+        if not text:
+            return (
+                jsonify({"success": False, "error": "Empty text provided"}),
+                400,
+            )
+
+        if len(text) > MAX_UPDATE_LENGTH:
+            return (
+                jsonify(
+                    {
+                        "success": False,
+                        "error": (
+                            f"Text too long! Maximum {MAX_UPDATE_LENGTH} "
+                            "characters allowed."
+                        ),
+                    }
+                ),
+                400,
+            )
+
+        new_words = checker.update(text)
+
+        return (
+            jsonify(
+                {
+                    "success": True,
+                    "new_words": new_words,
+                    "vocabulary_size": len(checker.word_count),
+                }
+            ),
+            200,
+        )
+
+    except UnsupportedMediaType:
+        return (
+            jsonify(
+                {
+                    "success": False,
+                    "error": "Invalid Content-Type. Please use application/json",
+                }
+            ),
+            415,
+        )
+    except BadRequest as e:
+        return (
+            jsonify({"success": False, "error": f"Invalid JSON: {str(e)}"}),
+            400,
+        )
+    except Exception as e:
+        app.logger.error(f"Model update error: {str(e)}", exc_info=True)
+        return (
+            jsonify({"success": False, "error": f"Server error: {str(e)}"}),
+            500,
+        )
+
+
 @app.route("/api/health", methods=["GET"])
 def health_check() -> Tuple[Dict[str, Any], int]:
     """Health check endpoint with detailed system information.
@@ -221,9 +802,12 @@ def health_check() -> Tuple[Dict[str, Any], int]:
                 },
                 "endpoints": {
                     "check": "/api/check",
+                    "check_batch": "/api/check/batch",
+                    "check_stream": "/api/check/stream",
                     "health": "/api/health",
                     "metrics": "/api/metrics",
                     "status": "/api/status",
+                    "update": "/api/update",
                 },
             }
         ),
@@ -233,18 +817,23 @@ def health_check() -> Tuple[Dict[str, Any], int]:
 
 @app.route("/api/metrics", methods=["GET"])
 def get_metrics():
-    """Endpoint for application metrics"""
+    """Endpoint for application metrics, merged over all workers.
+
+    Returns JSON by default: request totals, error rate, latency
+    percentiles per endpoint, timings per checking stage, tokens per second
+    of checking time and correction cache hit rate. With
+    ?format=prometheus the raw counters and histograms are returned in the
+    Prometheus text format instead.
+    """
+    merged = merge(metrics.collect())
+    if request.args.get("format") == "prometheus":
+        return Response(render_prometheus(merged), mimetype="text/plain; version=0.0.4")
     return (
         jsonify(
             {
                 "success": True,
-                "metrics": {
-                    "total_requests": "tracked_in_production",
-                    "avg_response_time": "tracked_in_production",
-                    "error_rate": "tracked_in_production",
-                    "uptime": "tracked_in_production",
-                },
-                "note": "Integrate with monitoring service for detailed metrics",
+                "metrics": summary(merged, CHECK_ENDPOINTS),
+                "model_version": checker.model_version,
             }
         ),
         200,
@@ -1,45 +1,216 @@
-import time, sys, os
-from errors import unigram_one, unigram_two
-
-sys.path.insert(0, os.path.abspath("."))
-
-from lib.checker import Checker
-
-checker = Checker()
-
-
-def evaluator(tests):
-    n, bad, unknown, start, false_neg = 0, 0, 0, time.clock(), 0
-    for target, wrongs in tests.items():
-        for wrong in wrongs.split():
-            n += 1
-            trys = get_ans(wrong)
-            if trys == []:
-                false_neg += 1
-            if target not in trys:
-                bad += 1
-                unknown += target not in checker.word_count
-    return dict(
-        bad=bad,
-        n=n,
-        false_neg=false_neg,
-        pct=int(100.0 - 100.0 * bad / n),
-        unknown=unknown,
-        secs=int(time.clock() - start),
-    )
+"""Accuracy and throughput evaluation on the misspellings in tests/errors.py.
 
+Every (target, misspelling) pair is checked by each configured variant of
+the checker. The pairs are split into chunks and spread over a process pool,
+and every worker builds its own checkers, so all variants see the same
+words. Reported per variant:
 
-what = []
+    accuracy      target ranked first
+    top5          target among the suggestions
+    no_suggestion misspelling was left alone (it is a known word)
+    unknown       target is not in the vocabulary, so it cannot be found
+    words/s       words checked per second of checking in one process
+    p50/p90/p99   per-word latency
 
+A variant is a name and Checker options, e.g. "pruned:ranking=pruned" or
+"index:ranking=pruned,use_index=1". The option corpus selects the training
+corpus and snapshot a model snapshot, so two models can be compared too.
+With several variants the words each one fixes or breaks relative to the
+first are counted.
 
-def get_ans(word):
-    result = checker.check_sentence(word)
+Usage (from the repository root):
+    python tests/evaluate.py [--sets one two] [--workers 4] [--limit 100]
+        [--method sentence|correct] [--variant NAME:KEY=VALUE,... ...]
+"""
+
+import argparse
+import inspect
+import multiprocessing
+import os
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from lib.checker import Checker  # noqa: E402
+from lib.trainer import Trainer  # noqa: E402
+from tests.errors import unigram_one, unigram_two  # noqa: E402
+
+SETS = {"one": unigram_one, "two": unigram_two}
+# The full ranking scores the whole vocabulary for every word, which makes a
+# run take hours; pruned ranking scores the same way over a candidate set
+DEFAULT_VARIANT = "pruned:ranking=pruned"
+CHUNK_SIZE = 10
+CHECKER_OPTIONS = set(inspect.signature(Checker).parameters) - {"trainer"}
+
+Variant = Tuple[str, Dict]
+# (target, misspelling)
+Pair = Tuple[str, str]
+# Per variant: (suggestions best first, seconds, target in vocabulary)
+Outcome = List[Tuple[List[str], float, bool]]
+
+_checkers: List[Checker] = []
+_method = "sentence"
+
+
+def parse_value(value: str):
+    if value.lower() in ("true", "false"):
+        return value.lower() == "true"
     try:
-        words = [w[0] for w in result[0]]
-        return words
-    except IndexError:
-        return []
+        return int(value)
+    except ValueError:
+        return value
+
+
+def parse_variant(spec: str) -> Variant:
+    """Parse "NAME:KEY=VALUE,..." into a name and checker options.
+
+    Raises:
+        argparse.ArgumentTypeError: If an option is malformed or unknown
+    """
+    name, _, options = spec.rpartition(":")
+    parsed = {}
+    for option in filter(None, options.split(",")):
+        key, sep, value = option.partition("=")
+        if not sep or key not in CHECKER_OPTIONS | {"corpus"}:
+            raise argparse.ArgumentTypeError(f"Invalid variant option: {option}")
+        parsed[key] = parse_value(value)
+    return name or options or "default", parsed
+
+
+def build_checker(options: Dict) -> Checker:
+    options = dict(options)
+    corpus = options.pop("corpus", "corpus.txt")
+    return Checker(trainer=lambda: Trainer(corpus=corpus), **options)
+
+
+def init_worker(variants: List[Variant], method: str) -> None:
+    global _method
+    _method = method
+    _checkers[:] = [build_checker(options) for _, options in variants]
+
+
+def suggest(checker: Checker, word: str) -> List[str]:
+    """Return the suggestions for a misspelling, best first."""
+    if _method == "correct":
+        return [checker.correct(word)]
+    result = checker.check_sentence(word)
+    return [candidate for candidate, _ in result[0]] if result else []
+
+
+def check_chunk(pairs: List[Pair]) -> List[Outcome]:
+    outcomes = []
+    for target, wrong in pairs:
+        outcome = []
+        for checker in _checkers:
+            start = time.perf_counter()
+            suggestions = suggest(checker, wrong)
+            seconds = time.perf_counter() - start
+            outcome.append((suggestions, seconds, checker.is_known(target)))
+        outcomes.append(outcome)
+    return outcomes
+
+
+def load_pairs(sets: List[str], limit: Optional[int]) -> List[Pair]:
+    pairs = [
+        (target, wrong)
+        for name in sets
+        for target, wrongs in SETS[name].items()
+        for wrong in wrongs.split()
+    ]
+    return pairs[:limit] if limit else pairs
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Return the q-th quantile of values by the nearest-rank method."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def score(pairs: List[Pair], outcomes: List[Outcome], index: int) -> Dict:
+    """Compute the statistics of one variant."""
+    n = len(pairs)
+    top1 = top5 = none = unknown = 0
+    latencies = []
+    for (target, _), outcome in zip(pairs, outcomes):
+        suggestions, seconds, known = outcome[index]
+        latencies.append(seconds)
+        top1 += bool(suggestions) and suggestions[0] == target
+        top5 += target in suggestions
+        none += not suggestions
+        unknown += not known
+    return {
+        "n": n,
+        "accuracy": top1 / n,
+        "top5": top5 / n,
+        "no_suggestion": none / n,
+        "unknown": unknown / n,
+        "words_per_second": n / sum(latencies),
+        "p50": percentile(latencies, 0.5),
+        "p90": percentile(latencies, 0.9),
+        "p99": percentile(latencies, 0.99),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sets", nargs="+", choices=SETS, default=["one"])
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--limit", type=int, help="Only check the first N pairs")
+    parser.add_argument("--method", choices=("sentence", "correct"), default="sentence")
+    parser.add_argument(
+        "--variant",
+        dest="variants",
+        action="append",
+        type=parse_variant,
+        help="NAME:KEY=VALUE,... of Checker options; repeat to compare",
+    )
+    args = parser.parse_args()
+    variants = args.variants or [parse_variant(DEFAULT_VARIANT)]
+
+    pairs = load_pairs(args.sets, args.limit)
+    chunks = [pairs[i : i + CHUNK_SIZE] for i in range(0, len(pairs), CHUNK_SIZE)]
+    print(
+        f"{len(pairs)} words, {len(variants)} variant(s), {args.workers} worker(s)",
+        flush=True,
+    )
+    start = time.perf_counter()
+    with multiprocessing.Pool(
+        args.workers, init_worker, (variants, args.method)
+    ) as pool:
+        outcomes = [
+            outcome for chunk in pool.imap(check_chunk, chunks) for outcome in chunk
+        ]
+    wall = time.perf_counter() - start
+
+    print(
+        f"\n{'variant':16}{'accuracy':>10}{'top5':>8}{'no sugg':>9}{'unknown':>9}"
+        f"{'words/s':>9}{'p50 ms':>9}{'p90 ms':>9}{'p99 ms':>9}"
+    )
+    for index, (name, _) in enumerate(variants):
+        result = score(pairs, outcomes, index)
+        print(
+            f"{name:16}{result['accuracy']:>10.1%}{result['top5']:>8.1%}"
+            f"{result['no_suggestion']:>9.1%}{result['unknown']:>9.1%}"
+            f"{result['words_per_second']:>9.1f}{result['p50'] * 1e3:>9.2f}"
+            f"{result['p90'] * 1e3:>9.2f}{result['p99'] * 1e3:>9.2f}"
+        )
+
+    for index, (name, _) in enumerate(variants[1:], 1):
+        fixed = broken = changed = 0
+        for (target, _), outcome in zip(pairs, outcomes):
+            before, after = outcome[0][0][:1], outcome[index][0][:1]
+            changed += before != after
+            fixed += before != [target] and after == [target]
+            broken += before == [target] and after != [target]
+        print(
+            f"\n{name} vs {variants[0][0]}: {changed} top suggestions differ, "
+            f"{fixed} fixed, {broken} broken"
+        )
+    print(
+        f"\nEvaluated in {wall:.1f}s ({len(pairs) * len(variants) / wall:.1f} words/s)"
+    )
 
 
-print(evaluator(unigram_one))
-# print(evaluator(unigram_two))
+if __name__ == "__main__":
+    main()
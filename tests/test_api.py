@@ -3,14 +3,21 @@
 Tests all API endpoints including spell checking, health, metrics, and status.
 """
 
+import functools
+import io
 import json
 import sys
 import os
+import time
 
 import pytest
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 import main  # noqa: E402
+from lib.checker import Checker  # noqa: E402
+from lib import tokenizer  # noqa: E402
+from lib.profiling import RequestProfiler  # noqa: E402
+from lib.trainer import Trainer  # noqa: E402
 
 
 @pytest.fixture
@@ -56,6 +63,22 @@ class TestAPICheck:
         # Very common words should not need corrections
         assert data["has_corrections"] is False
 
+    def test_api_check_keeps_case_and_punctuation(self, client):
+        """Test that corrections keep the casing and punctuation around them."""
+        text = "Ths is a TST,  of the lazy dgo."
+        response = client.post(
+            "/api/check",
+            data=json.dumps({"text": text}),
+            content_type="application/json",
+        )
+        data = json.loads(response.data)
+        fix = main.checker.correct
+        expected = (
+            f"{fix('ths').capitalize()} {fix('is')} {fix('a')} {fix('tst').upper()},  "
+            f"{fix('of')} {fix('the')} {fix('lazy')} {fix('dgo')}."
+        )
+        assert data["corrected"] == expected
+
     def test_api_check_empty_text(self, client):
         """Test API check with empty text."""
         response = client.post(
@@ -113,6 +136,40 @@ class TestAPICheck:
         assert data["success"] is True
 
 
+class TestAPICheckContext:
+    """Tests for the contextual mode of /api/check."""
+
+    def check(self, client, payload):
+        response = client.post(
+            "/api/check", data=json.dumps(payload), content_type="application/json"
+        )
+        return response.status_code, json.loads(response.data)
+
+    def test_frequency_is_default(self, client):
+        status, data = self.check(client, {"text": "the lazy dgo"})
+        assert status == 200
+        assert data["mode"] == "frequency"
+
+    def test_context_mode(self, client):
+        status, data = self.check(client, {"text": "the lazy dgo", "mode": "context"})
+        assert status == 200
+        assert data["mode"] == "context"
+        assert data["corrected"] == "the lazy dog"
+
+    def test_budget_exhausted_falls_back(self, client, monkeypatch):
+        monkeypatch.setattr(main, "CONTEXT_BUDGET", 0)
+        text = "the lazy dgo"
+        status, data = self.check(client, {"text": text, "mode": "context"})
+        assert status == 200
+        assert data["mode"] == "frequency"
+        assert data["corrected"] == main.spellcheck(text)
+
+    def test_unknown_mode(self, client):
+        status, data = self.check(client, {"text": "the lazy dgo", "mode": "fast"})
+        assert status == 400
+        assert data["success"] is False
+
+
 class TestAPIHealth:
     """Tests for /api/health endpoint."""
 
@@ -140,6 +197,7 @@ class TestAPIHealth:
         data = json.loads(response.data)
         assert "/api/check" in data["endpoints"]["check"]
         assert "/api/health" in data["endpoints"]["health"]
+        assert data["endpoints"]["update"] == "/api/update"
 
 
 class TestAPIStatus:
@@ -177,6 +235,74 @@ class TestAPIMetrics:
         assert data["success"] is True
         assert "metrics" in data
 
+    def test_metrics_count_requests(self, client):
+        """Test that checks are counted and timed per endpoint."""
+        before = json.loads(client.get("/api/metrics").data)["metrics"]
+        client.post(
+            "/api/check",
+            data=json.dumps({"text": "Ths is a tset"}),
+            content_type="application/json",
+        )
+        after = json.loads(client.get("/api/metrics").data)["metrics"]
+        # The first metrics request is counted too
+        assert after["total_requests"] == before["total_requests"] + 2
+        assert after["tokens"] == before["tokens"] + 4
+        assert after["endpoints"]["api_check"]["latency"]["p50"] > 0
+        assert after["stages"]["tokenize"]["count"] >= 1
+        assert after["tokens_per_second"] > 0
+
+    def test_metrics_prometheus(self, client):
+        """Test the Prometheus text format."""
+        client.get("/api/health")
+        response = client.get("/api/metrics?format=prometheus")
+        assert response.status_code == 200
+        assert response.mimetype == "text/plain"
+        text = response.data.decode("utf-8")
+        assert "# TYPE spellcheck_requests_total counter" in text
+        assert 'spellcheck_requests_total{endpoint="health_check",status="200"}' in text
+
+
+class TestAPIProfiling:
+    """Tests for on-demand request profiling."""
+
+    def test_profiling_disabled_by_default(self, client):
+        """Test that profile requests are ignored unless enabled."""
+        response = client.post(
+            "/api/check?profile=1",
+            data=json.dumps({"text": "Ths is a tset"}),
+            content_type="application/json",
+        )
+        assert response.status_code == 200
+        assert "profile" not in json.loads(response.data)
+        assert "X-Profile-File" not in response.headers
+
+    def test_profile_requested(self, client, monkeypatch, tmp_path):
+        """Test that a requested profile is returned and saved."""
+        profiler = RequestProfiler(enabled=True, directory=str(tmp_path))
+        monkeypatch.setattr(main, "profiler", profiler)
+        response = client.post(
+            "/api/check",
+            data=json.dumps({"text": "Ths is a tset"}),
+            content_type="application/json",
+            headers={"X-Profile": "1"},
+        )
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert data["success"] is True
+        focus = data["profile"]["focus"]
+        assert set(focus) >= {"get_candidates", "knowns", "edit_distance"}
+        assert os.listdir(tmp_path) == [response.headers["X-Profile-File"]]
+
+    def test_sampled_profile_saved_only(self, client, monkeypatch, tmp_path):
+        """Test that sampled requests are saved without changing the response."""
+        profiler = RequestProfiler(
+            enabled=True, sample_rate=1.0, directory=str(tmp_path)
+        )
+        monkeypatch.setattr(main, "profiler", profiler)
+        response = client.get("/api/health")
+        assert "profile" not in json.loads(response.data)
+        assert len(os.listdir(tmp_path)) == 1
+
 
 class TestSecurityHeaders:
     """Tests for security headers."""
@@ -226,3 +352,195 @@ class TestErrorHandling:
         response = client.post("/api/check", data='{"text": "test"}')
         # Should handle gracefully
         assert response.status_code in [200, 400, 415]
+
+
+class TestAPIUpdate:
+    """Tests for /api/update endpoint."""
+
+    @pytest.fixture
+    def small_checker(self, monkeypatch):
+        """Swap in a small checker so updates do not leak into other tests."""
+        small = Checker(trainer=functools.partial(Trainer, corpus="corpus_test.txt"))
+        monkeypatch.setattr(main, "checker", small)
+        monkeypatch.setattr(main, "UPDATE_TOKEN", "secret")
+        return small
+
+    def test_update_disabled_by_default(self, client, monkeypatch):
+        """Test that updates are rejected when no token is configured."""
+        monkeypatch.setattr(main, "UPDATE_TOKEN", None)
+        response = client.post(
+            "/api/update",
+            data=json.dumps({"text": "zorblax"}),
+            content_type="application/json",
+        )
+        assert response.status_code == 404
+
+    def test_update_wrong_token(self, client, small_checker):
+        """Test that a wrong token is rejected."""
+        response = client.post(
+            "/api/update",
+            data=json.dumps({"text": "zorblax"}),
+            content_type="application/json",
+            headers={"Authorization": "Bearer wrong"},
+        )
+        assert response.status_code == 403
+        assert not small_checker.is_known("zorblax")
+
+    def test_update_success(self, client, small_checker):
+        """Test that the live checker learns new words."""
+        response = client.post(
+            "/api/update",
+            data=json.dumps({"text": "The zorblax jumped. The zorblax"}),
+            content_type="application/json",
+            headers={"Authorization": "Bearer secret"},
+        )
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert data["success"] is True
+        assert data["new_words"] == ["zorblax"]
+        assert small_checker.correct("zorblx") == "zorblax"
+
+
+class TestAPICheckBatch:
+    """Tests for /api/check/batch endpoint."""
+
+    def post(self, client, payload):
+        return client.post(
+            "/api/check/batch",
+            data=json.dumps(payload),
+            content_type="application/json",
+        )
+
+    def single(self, client, text):
+        return client.post(
+            "/api/check",
+            data=json.dumps({"text": text}),
+            content_type="application/json",
+        )
+
+    def test_batch_matches_single(self, client):
+        """Test that batch results match the single-item endpoint."""
+        texts = ["Ths is a tst", "the quick brown fox", "tst the fox"]
+        response = self.post(client, {"texts": texts})
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert data["success"] is True
+        assert len(data["results"]) == 3
+        for text, result in zip(texts, data["results"]):
+            single = json.loads(self.single(client, text).data)
+            assert result["corrected"] == single["corrected"]
+            assert result["has_corrections"] == single["has_corrections"]
+
+    def test_batch_corrects_repeated_tokens_once(self, client, monkeypatch):
+        """Test that tokens shared across items are corrected once."""
+        calls = []
+        correct = main.checker.correct
+
+        def counting_correct(word):
+            calls.append(word)
+            return correct(word)
+
+        monkeypatch.setattr(main.checker, "correct", counting_correct)
+        response = self.post(client, {"texts": ["tst tst fox", "fox tst"]})
+        data = json.loads(response.data)
+        assert data["unique_tokens"] == 2
+        assert sorted(calls) == ["fox", "tst"]
+
+    def test_batch_item_errors(self, client):
+        """Test that invalid items fail on their own."""
+        response = self.post(client, {"texts": ["the dog", "", 42, "x" * 10001]})
+        assert response.status_code == 200
+        results = json.loads(response.data)["results"]
+        assert results[0]["success"] is True
+        assert [r["success"] for r in results[1:]] == [False, False, False]
+
+    def test_batch_missing_texts(self, client):
+        """Test batch without a texts array."""
+        response = self.post(client, {"texts": "the dog"})
+        assert response.status_code == 400
+
+    def test_batch_too_many_items(self, client):
+        """Test batch exceeding the item limit."""
+        response = self.post(client, {"texts": ["a"] * (main.MAX_BATCH_ITEMS + 1)})
+        assert response.status_code == 400
+        assert "too many" in json.loads(response.data)["error"].lower()
+
+    def test_batch_too_long(self, client, monkeypatch):
+        """Test batch exceeding the character limit."""
+        monkeypatch.setattr(main, "MAX_BATCH_CHARS", 10)
+        response = self.post(client, {"texts": ["the dog", "the cat"]})
+        assert response.status_code == 400
+        assert "too long" in json.loads(response.data)["error"].lower()
+
+
+class TestAPICheckStream:
+    """Tests for /api/check/stream endpoint."""
+
+    def stream(self, client, body: bytes):
+        response = client.post(
+            "/api/check/stream", data=body, content_type="text/plain"
+        )
+        assert response.status_code == 200
+        assert response.mimetype == "application/x-ndjson"
+        return [json.loads(line) for line in response.data.decode().splitlines()]
+
+    def test_stream_corrections(self, client):
+        """Test that corrections come back as NDJSON with offsets."""
+        text = "Ths is a tst of the fox"
+        lines = self.stream(client, text.encode())
+        summary = lines.pop()
+        assert summary == {"success": True, "tokens": 7, "corrections": len(lines)}
+        for line in lines:
+            assert text[line["offset"] :].startswith(line["original"])
+        spans = [
+            (line["offset"], line["offset"] + len(line["original"]), line["corrected"])
+            for line in lines
+        ]
+        assert tokenizer.rebuild(text, spans) == main.spellcheck(text)
+
+    def test_stream_small_chunks(self, client, monkeypatch):
+        """Test that words and characters split across reads are kept whole."""
+        text = "café tst  the dgo\nfox tst"
+        expected = self.stream(client, text.encode("utf-8"))
+        monkeypatch.setattr(main, "STREAM_CHUNK_SIZE", 3)
+        assert self.stream(client, text.encode("utf-8")) == expected
+        chunks = main.read_text_chunks(io.BytesIO(text.encode()), 100)
+        tokens = list(tokenizer.stream_tokens(chunks))
+        assert [token for token, _ in tokens] == list(tokenizer.tokenize(text))
+
+    def test_stream_latency_covers_body(self, client, monkeypatch):
+        """Test that a stream is timed until its last line is sent."""
+        correct = main.checker.correct
+
+        def slow_correct(word):
+            time.sleep(0.01)
+            return correct(word)
+
+        monkeypatch.setattr(main.checker, "correct", slow_correct)
+
+        def stream_seconds():
+            metrics = json.loads(client.get("/api/metrics").data)["metrics"]
+            latency = metrics["endpoints"].get("api_check_stream", {}).get("latency")
+            return (latency["avg"] * latency["count"]) if latency else 0.0
+
+        before = stream_seconds()
+        self.stream(client, b"ths is a tst")
+        assert stream_seconds() - before >= 0.04
+
+    def test_stream_checker_error_is_server_error(self, client, monkeypatch):
+        """Test that a ValueError while checking is not reported as too long."""
+
+        def broken(word):
+            raise ValueError("broken model")
+
+        monkeypatch.setattr(main.checker, "correct", broken)
+        lines = self.stream(client, b"ths is a tst")
+        assert lines[-1]["success"] is False
+        assert lines[-1]["error"].startswith("Server error")
+
+    def test_stream_too_long(self, client, monkeypatch):
+        """Test that oversized documents end with an error line."""
+        monkeypatch.setattr(main, "MAX_STREAM_BYTES", 10)
+        lines = self.stream(client, b"the quick brown fox")
+        assert lines[-1]["success"] is False
+        assert "too long" in lines[-1]["error"].lower()
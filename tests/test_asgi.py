@@ -0,0 +1,71 @@
+import asyncio
+import json
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import asgi
+import main
+
+
+def call(app, method, path, body=b"", headers=()):
+    """Run one request through an ASGI app and return (status, headers, body)."""
+    scope = {
+        "type": "http",
+        "method": method,
+        "path": path,
+        "query_string": b"",
+        "headers": [(b"content-type", b"application/json"), *headers],
+    }
+    chunks = [body[i : i + 4] for i in range(0, len(body), 4)] or [b""]
+    messages = [
+        {"type": "http.request", "body": c, "more_body": i < len(chunks) - 1}
+        for i, c in enumerate(chunks)
+    ]
+    sent = []
+
+    async def receive():
+        return messages.pop(0) if messages else {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(app(scope, receive, send))
+    start = sent[0]
+    data = b"".join(m.get("body", b"") for m in sent[1:])
+    return start["status"], dict(start["headers"]), data
+
+
+def test_health_inline():
+    status, headers, body = call(asgi.app, "GET", "/api/health")
+    assert status == 200
+    assert json.loads(body)["status"] == "healthy"
+    assert headers[b"x-frame-options"] == b"DENY"
+
+
+def test_check_matches_flask():
+    payload = json.dumps({"text": "Ths is a tst"}).encode()
+    status, _, body = call(asgi.app, "POST", "/api/check", payload)
+    expected = main.app.test_client().post(
+        "/api/check", data=payload, content_type="application/json"
+    )
+    assert status == 200
+    assert json.loads(body) == expected.get_json()
+
+
+def test_stream_endpoint():
+    status, headers, body = call(
+        asgi.app, "POST", "/api/check/stream", b"tset the quikc fox"
+    )
+    assert status == 200
+    assert headers[b"content-type"] == b"application/x-ndjson"
+    assert json.loads(body.splitlines()[-1])["tokens"] == 4
+
+
+def test_rejects_when_busy():
+    busy = asgi.SpellCheckASGI(threads=1, max_pending=0)
+    payload = json.dumps({"text": "the dog"}).encode()
+    status, headers, body = call(busy, "POST", "/api/check", payload)
+    assert status == 503
+    assert headers[b"retry-after"] == b"1"
+    assert json.loads(body)["success"] is False
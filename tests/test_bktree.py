@@ -0,0 +1,48 @@
+import functools
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from lib.bktree import BKTree
+from lib.checker import Checker
+from lib.distance import bounded_levenshtein
+from lib.trainer import Trainer
+
+words = ["book", "books", "cake", "boo", "boon", "cook", "cape", "cart"]
+tree = BKTree(words)
+
+
+def brute_force(word, radius):
+    found = [(bounded_levenshtein(word, w), w) for w in words]
+    return sorted((d, w) for d, w in found if d <= radius)
+
+
+def test_size_ignores_duplicates():
+    assert len(BKTree(words + ["book"])) == len(words)
+
+
+def test_query_matches_brute_force():
+    for query in ["bo", "boko", "cak", "xyz"]:
+        for radius in range(4):
+            assert tree.query(query, radius)[0] == brute_force(query, radius)
+
+
+def test_query_prunes():
+    matches, evaluations = tree.query("book", 0)
+    assert matches == [(0, "book")]
+    assert evaluations < len(words)
+
+
+def test_nearest():
+    matches, _ = tree.nearest("cak", 2)
+    assert matches == [(1, "cake"), (2, "cape")]
+
+
+def test_checker_words_within():
+    checker = Checker(
+        trainer=functools.partial(Trainer, corpus="corpus_test.txt"), use_bktree=True
+    )
+    matches, evaluations = checker.words_within("dgo", 2)
+    assert (2, "dog") in matches
+    assert evaluations <= len(checker.word_count)
+    assert checker.nearest_words("thr", 1)[0] == [(1, "the")]
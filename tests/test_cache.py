@@ -0,0 +1,123 @@
+import functools
+import sys
+import os
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from lib.cache import (
+    CorrectionCache,
+    FileCache,
+    LRUCache,
+    create_cache,
+    model_version,
+    next_version,
+)
+from lib.checker import Checker
+from lib.trainer import Trainer
+
+small_trainer = functools.partial(Trainer, corpus="corpus_test.txt")
+
+
+def test_lru_eviction():
+    cache = LRUCache(max_size=2)
+    cache.set_version("v1")
+    cache.put("teh", "the")
+    cache.put("quikc", "quick")
+    assert cache.get("teh") == "the"
+    cache.put("fxo", "fox")
+    # "quikc" was the least recently used entry
+    assert cache.get("quikc") is None
+    assert cache.get("fxo") == "fox"
+    assert cache.stats() == {"hits": 2, "misses": 1, "size": 2, "max_size": 2}
+
+
+def test_lru_version_change():
+    cache = LRUCache()
+    cache.set_version("v1")
+    cache.put("teh", "the")
+    cache.set_version("v1")
+    assert cache.get("teh") == "the"
+    cache.set_version("v2")
+    assert cache.get("teh") is None
+
+
+def test_file_cache_shared(tmp_path):
+    path = str(tmp_path / "corrections.sqlite")
+    first, second = FileCache(path), FileCache(path)
+    first.set_version("v1")
+    second.set_version("v1")
+    first.put("teh", "the")
+    assert second.get("teh") == "the"
+    second.set_version("v2")
+    assert second.get("teh") is None
+    assert first.get("teh") == "the"
+    first.close()
+    second.close()
+
+
+def test_file_cache_eviction(tmp_path):
+    cache = FileCache(str(tmp_path / "corrections.sqlite"), max_size=3)
+    cache.set_version("v1")
+    for i in range(5):
+        cache.put(f"word{i}", f"fixed{i}")
+    assert cache.size() == 3
+    assert cache.get("word0") is None
+    assert cache.get("word4") == "fixed4"
+    cache.close()
+
+
+def test_create_cache(tmp_path):
+    assert create_cache("none") is None
+    assert isinstance(create_cache("lru", 10), LRUCache)
+    assert isinstance(create_cache("file", 10, str(tmp_path / "c.sqlite")), FileCache)
+    with pytest.raises(ValueError):
+        create_cache("redis")
+    with pytest.raises(ValueError):
+        create_cache("file")
+    with pytest.raises(TypeError):
+        CorrectionCache()
+
+
+def test_model_version():
+    assert model_version({"the": 3, "cat": 2}) == model_version({"the": 3, "cat": 2})
+    assert model_version({"the": 3, "cat": 2}) != model_version({"the": 4, "cat": 2})
+    version = model_version({"the": 3})
+    assert next_version(version, {"a": 1, "b": 2}) == next_version(
+        version, {"b": 2, "a": 1}
+    )
+    assert next_version(version, {"a": 1}) != version
+
+
+def test_checker_cache_matches_uncached():
+    plain = Checker(trainer=small_trainer)
+    cache = LRUCache()
+    cached = Checker(trainer=small_trainer, cache=cache)
+    words = ["teh", "quikc", "fxo", "the", "teh", "zzzzzz", "quikc"]
+    assert [cached.correct(w) for w in words] == [plain.correct(w) for w in words]
+    # Known words bypass the cache
+    assert cache.stats()["hits"] == 2
+    assert cache.stats()["misses"] == 4
+
+
+def test_checker_update_invalidates_cache():
+    cache = LRUCache()
+    checker = Checker(trainer=small_trainer, cache=cache)
+    version = checker.model_version
+    before = checker.correct("zorblx")
+    checker.update("The zorblax jumped. The zorblax")
+    assert checker.model_version != version
+    assert cache.version == checker.model_version
+    assert before != "zorblax"
+    assert checker.correct("zorblx") == "zorblax"
+
+
+def test_checker_memo_without_cache():
+    checker = Checker(trainer=small_trainer, memo_size=2)
+    before = checker.correct("zorblx")
+    assert checker._memo.get("zorblx") == before
+    checker.update("The zorblax jumped. The zorblax")
+    assert checker.correct("zorblx") == "zorblax"
+    for word in ("qzx", "xqz", "zqx"):
+        checker.correct(word)
+    assert checker._memo.size() == 2
@@ -1,8 +1,12 @@
+import functools
 import sys
+import threading
+import time
 import os
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 from lib.checker import Checker
+from lib.trainer import Trainer
 
 # trainer = Trainer(corpus='corpus_test.txt')
 checker = Checker()
@@ -25,3 +29,104 @@ def test_check_sentence():
     results = checker.check_sentence("thh")
     words = [w[0] for w in results[0]]
     assert "the" in words
+
+
+pruned_checker = Checker(ranking="pruned", max_candidates=50)
+
+
+def test_check_sentence_pruned():
+    results = pruned_checker.check_sentence("the quikc brown fox")
+    assert results[0][0] == checker.check_sentence("the quikc brown fox")[0][0]
+    assert len(results[0]) == 5
+
+
+def test_ranking_candidates_capped():
+    candidates = pruned_checker.ranking_candidates("thh", "^", "$")
+    assert "the" in candidates
+    assert len(candidates) <= 50
+    # Looked up in a trie rather than by enumerating edits2
+    assert pruned_checker.trie is not None
+    assert set(pruned_checker.ranking_candidates("quikc", "^", "$")) >= set(
+        pruned_checker.knowns(
+            {e2 for e1 in pruned_checker.edits1("quikc") for e2 in checker.edits1(e1)}
+        )
+    )
+
+
+def test_update_matches_retraining(tmp_path):
+    with open(os.path.join("data", "corpus_test.txt"), encoding="utf-8") as f:
+        base = f.read()
+    extra = "The quikc zorblax jumped. A zorblax is quick"
+    (tmp_path / "base.txt").write_text(base, encoding="utf-8")
+    (tmp_path / "full.txt").write_text(base + "\n" + extra, encoding="utf-8")
+    kwargs = {"ranking": "pruned", "max_candidates": 20, "use_index": True}
+    updated = Checker(
+        trainer=functools.partial(Trainer, corpus=str(tmp_path / "base.txt")),
+        **kwargs,
+    )
+    assert not updated.is_known("zorblax")
+    assert "zorblax" in updated.update(extra)
+    retrained = Checker(
+        trainer=functools.partial(Trainer, corpus=str(tmp_path / "full.txt")),
+        **kwargs,
+    )
+    assert updated.is_known("zorblax")
+    assert updated.correct("zorblx") == "zorblax"
+    assert updated._followers == retrained._followers
+    assert updated._predecessors == retrained._predecessors
+    for sentence in ("a zorblx jumpd", "the quikc brown fox"):
+        assert updated.check_sentence(sentence) == retrained.check_sentence(sentence)
+
+
+def test_threshold_ranking_matches_exhaustive():
+    python = Checker(scoring="python")
+    for word, before, after in [
+        ("thh", "^", "$"),
+        ("quikc", "the", "brown"),
+        ("begining", "a", "$"),
+        ("verylongunknowntoken", "the", "of"),
+    ]:
+        exhaustive = python._rank(word, before, after, list(python.word_count))
+        assert python.calculate(word, before, after) == exhaustive
+
+
+def test_correct_in_context():
+    words = ["the", "lazy", "dgo"]
+    corrected, in_context, by_frequency = checker.correct_in_context(words)
+    assert corrected == ["the", "lazy", "dog"]
+    assert (in_context, by_frequency) == (1, 0)
+    corrected, in_context, by_frequency = checker.correct_in_context(words, 0)
+    assert corrected == [checker.correct(word) for word in words]
+    assert (in_context, by_frequency) == (0, 1)
+
+
+def test_correct_in_context_budget_bounds_long_words():
+    # No known word is one edit away, so the edits2 search hits the budget
+    word = "xqzvbnmklpwrtz"
+    start = time.perf_counter()
+    corrected, in_context, by_frequency = checker.correct_in_context([word], 0.05)
+    assert time.perf_counter() - start < 0.15
+    assert (in_context, by_frequency) == (0, 1)
+    assert corrected[0] == word or checker.is_known(corrected[0])
+
+
+def test_concurrent_lookups_during_update():
+    shared = Checker(trainer=functools.partial(Trainer, corpus="corpus_test.txt"))
+    errors = []
+
+    def check():
+        try:
+            for _ in range(20):
+                assert len(shared.check_sentence("the quikc brown fox")[0]) == 5
+                shared.correct("thh")
+        except Exception as e:  # pragma: no cover - reported below
+            errors.append(e)
+
+    threads = [threading.Thread(target=check) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    shared.update("The zorblax jumped over the fence")
+    for thread in threads:
+        thread.join()
+    assert not errors
+    assert shared.correct("zorblx") == "zorblax"
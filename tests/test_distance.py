@@ -0,0 +1,42 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from lib.distance import EditDistance, bounded_levenshtein
+
+
+def test_exact_distance():
+    assert bounded_levenshtein("kitten", "sitting") == 3
+    assert bounded_levenshtein("", "abc") == 3
+    assert bounded_levenshtein("same", "same") == 0
+
+
+def test_bounded_distance_stops_early():
+    assert bounded_levenshtein("kitten", "sitting", 3) == 3
+    assert bounded_levenshtein("kitten", "sitting", 2) == 3
+    assert bounded_levenshtein("a", "abcdefgh", 1) == 2
+
+
+def test_cache_statistics():
+    engine = EditDistance(cache_size=2)
+    assert engine.distance("chair", "chaire") == 1
+    assert engine.distance("chaire", "chair") == 1
+    assert engine.stats()["hits"] == 1
+    assert engine.stats()["misses"] == 1
+
+
+def test_cache_reuses_bounded_results():
+    engine = EditDistance()
+    assert engine.distance("hello", "world", 1) == 2
+    assert engine.distance("hello", "world", 0) == 1
+    assert engine.stats()["hits"] == 1
+    # A larger bound needs a fresh computation
+    assert engine.distance("hello", "world") == 4
+    assert engine.stats()["misses"] == 2
+
+
+def test_cache_eviction():
+    engine = EditDistance(cache_size=2)
+    for word in ["a", "b", "c"]:
+        engine.distance(word, "xyz")
+    assert engine.stats()["size"] == 2
@@ -0,0 +1,51 @@
+import sys
+import os
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from lib.locks import ReadWriteLock
+
+
+def test_readers_share_the_lock():
+    lock = ReadWriteLock()
+    barrier = threading.Barrier(3, timeout=5)
+
+    def read():
+        with lock.read:
+            # Only passes if all three readers hold the lock at once
+            barrier.wait()
+
+    threads = [threading.Thread(target=read) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not barrier.broken
+
+
+def test_writer_waits_for_readers_and_blocks_new_ones():
+    lock = ReadWriteLock()
+    events = []
+
+    def write():
+        with lock.write:
+            events.append("write")
+
+    def late_read():
+        with lock.read:
+            events.append("late read")
+
+    with lock.read:
+        writer = threading.Thread(target=write)
+        writer.start()
+        while not lock._waiting_writers:
+            time.sleep(0.001)
+        reader = threading.Thread(target=late_read)
+        reader.start()
+        # Give the late reader time to get in, which it must not
+        time.sleep(0.05)
+        events.append("read")
+    writer.join()
+    reader.join()
+    assert events == ["read", "write", "late read"]
@@ -0,0 +1,114 @@
+import functools
+import json
+import sys
+import os
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from lib.checker import Checker
+from lib.metrics import Metrics, merge, quantile, render_prometheus, summary
+from lib.trainer import Trainer
+
+small_trainer = functools.partial(Trainer, corpus="corpus_test.txt")
+
+
+def test_counters_and_histograms():
+    metrics = Metrics(buckets=(0.1, 1.0))
+    metrics.inc("requests_total", endpoint="api_check", status="200")
+    metrics.inc("requests_total", 2, status="200", endpoint="api_check")
+    for value in (0.05, 0.5, 5.0):
+        metrics.observe("request_seconds", value, endpoint="api_check")
+    snapshot = metrics.snapshot()
+    assert snapshot["counters"] == [
+        ["requests_total", {"endpoint": "api_check", "status": "200"}, 3]
+    ]
+    name, labels, counts, total, count = snapshot["histograms"][0]
+    assert counts == [1, 1, 1]
+    assert total == 5.55 and count == 3
+
+
+def test_quantile():
+    buckets = [0.1, 1.0]
+    assert quantile(0.5, buckets, [0, 0, 0]) is None
+    assert quantile(0.5, buckets, [2, 0, 0]) == 0.05
+    assert quantile(0.75, buckets, [1, 2, 0]) == pytest.approx(0.1 + 0.9 * 0.625)
+    assert quantile(0.99, buckets, [1, 0, 1]) == 1.0
+
+
+def test_timer():
+    metrics = Metrics()
+    with metrics.time("stage_seconds", stage="tokenize"):
+        pass
+    histograms = metrics.snapshot()["histograms"]
+    assert histograms[0][:2] == ["stage_seconds", {"stage": "tokenize"}]
+    assert histograms[0][4] == 1
+
+
+def test_merge_across_processes(tmp_path):
+    metrics = Metrics(directory=str(tmp_path), buckets=(0.1, 1.0))
+    metrics.inc("tokens_total", 10)
+    metrics.observe("request_seconds", 0.05, endpoint="api_check")
+    metrics.flush()
+    assert (tmp_path / f"{os.getpid()}.json").exists()
+    # A snapshot written by another worker
+    other = metrics.snapshot()
+    other["pid"] = -1
+    (tmp_path / "-1.json").write_text(json.dumps(other))
+    metrics.inc("tokens_total", 5)
+    merged = merge(metrics.collect())
+    assert merged["processes"] == 2
+    assert merged["counters"][("tokens_total", ())] == 25
+    histogram = merged["histograms"][("request_seconds", (("endpoint", "api_check"),))]
+    assert histogram[0] == [2, 0, 0]
+
+
+def test_collector():
+    metrics = Metrics()
+    metrics.add_collector(lambda: {"correction_cache_hits_total": 3})
+    metrics.add_collector(lambda: {"correction_cache_misses_total": 1})
+    result = summary(merge([metrics.snapshot()]))
+    assert result["correction_cache"]["hit_rate"] == 0.75
+
+
+def test_summary():
+    metrics = Metrics(buckets=(0.1, 1.0))
+    metrics.inc("requests_total", 3, endpoint="api_check", status="200")
+    metrics.inc("requests_total", endpoint="api_check", status="500")
+    metrics.observe("request_seconds", 0.5, endpoint="api_check")
+    metrics.observe("request_seconds", 1.5, endpoint="api_check")
+    metrics.inc("tokens_total", 40)
+    result = summary(merge([metrics.snapshot()]), ["api_check"])
+    assert result["total_requests"] == 4
+    assert result["error_rate"] == 0.25
+    assert result["avg_response_time"] == 1.0
+    assert result["tokens_per_second"] == 20
+    assert result["endpoints"]["api_check"]["errors"] == 1
+    assert result["endpoints"]["api_check"]["latency"]["count"] == 2
+
+
+def test_render_prometheus():
+    metrics = Metrics(buckets=(0.1, 1.0))
+    metrics.inc("requests_total", endpoint="api_check", status="200")
+    metrics.observe("request_seconds", 0.5, endpoint="api_check")
+    text = render_prometheus(merge([metrics.snapshot()]))
+    lines = text.splitlines()
+    assert "# TYPE spellcheck_requests_total counter" in lines
+    assert 'spellcheck_requests_total{endpoint="api_check",status="200"} 1' in lines
+    assert "# TYPE spellcheck_request_seconds histogram" in lines
+    bucket = 'spellcheck_request_seconds_bucket{endpoint="api_check",le="%s"} %d'
+    assert bucket % ("0.1", 0) in lines
+    assert bucket % ("1", 1) in lines
+    assert bucket % ("+Inf", 1) in lines
+    assert 'spellcheck_request_seconds_count{endpoint="api_check"} 1' in lines
+
+
+def test_checker_stage_timings():
+    metrics = Metrics()
+    checker = Checker(trainer=small_trainer, ranking="pruned", metrics=metrics)
+    checker.check_sentence("the quikc brown fox")
+    checker.correct("quikc")
+    stages = summary(merge([metrics.snapshot()]))["stages"]
+    assert stages["tokenize"]["count"] == 1
+    assert stages["candidates"]["count"] == 2
+    assert stages["ranking"]["count"] == 2
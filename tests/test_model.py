@@ -0,0 +1,88 @@
+import functools
+import pickle
+import sys
+import os
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from lib.checker import Checker
+from lib.model import FrozenTable, LazyProbabilities, drop_tables
+from lib.trainer import Trainer
+
+trainer = Trainer(corpus="corpus_test.txt")
+small_trainer = functools.partial(Trainer, corpus="corpus_test.txt")
+
+
+def test_lazy_matches_get_probs():
+    for name, count_name in (
+        ("unigram_probs", "word_count"),
+        ("bigram_probs", "bigram_count"),
+        ("trigram_probs", "trigram_count"),
+    ):
+        lazy = LazyProbabilities(trainer.data[count_name])
+        assert dict(lazy.items()) == dict(trainer.data[name].items())
+
+
+def test_lazy_add_and_missing():
+    counts = {"echo": 3, "tango": 2}
+    probs = LazyProbabilities(counts)
+    assert probs["echo"] == 3 / 5
+    assert probs["golf"] == 0
+    assert "golf" not in counts
+    probs.add("golf", 2)
+    assert counts["golf"] == 3
+    assert probs["echo"] == 3 / 8
+
+
+def test_trainer_lazy_probs():
+    lazy = Trainer(corpus="corpus_test.txt", lazy_probs=True)
+    assert isinstance(lazy.data["bigram_probs"], LazyProbabilities)
+    for name, table in trainer.data.items():
+        assert dict(lazy.data[name].items()) == dict(table.items())
+
+
+def test_drop_tables():
+    data = drop_tables(dict(Trainer(corpus="corpus_test.txt").data), "probs")
+    assert "bigram_count" not in data and "trigram_count" not in data
+    assert "word_count" in data
+    with pytest.raises(ValueError):
+        drop_tables(data, "none")
+
+
+@pytest.mark.parametrize("keep", ["counts", "probs"])
+def test_checker_keep_tables(keep):
+    full = Checker(trainer=small_trainer)
+    dropped = Checker(trainer=small_trainer, keep_tables=keep)
+    for sentence in ("the quikc brown fox", "jumpd ovr the lazy dgo"):
+        assert dropped.check_sentence(sentence) == full.check_sentence(sentence)
+    if keep == "probs":
+        with pytest.raises(ValueError):
+            dropped.update("the dog")
+
+
+def test_frozen_table():
+    table = FrozenTable(0, {("a", "b"): 0.5})
+    assert table[("a", "b")] == 0.5
+    assert table[("b", "a")] == 0
+    assert len(table) == 1
+    with pytest.raises(TypeError):
+        table[("b", "a")] = 1
+    with pytest.raises(TypeError):
+        table.update({})
+    with pytest.raises(TypeError):
+        table |= {("b", "a"): 1}
+    assert len(table) == 1
+    assert pickle.loads(pickle.dumps(table)) == table
+
+
+def test_frozen_checker_does_not_grow():
+    checker = Checker(trainer=small_trainer, frozen=True)
+    sizes = [len(table) for table in checker.model.data.values()]
+    results = checker.check_sentence("jumpd ovr the lazy dgo")
+    assert results == Checker(trainer=small_trainer).check_sentence(
+        "jumpd ovr the lazy dgo"
+    )
+    assert [len(table) for table in checker.model.data.values()] == sizes
+    with pytest.raises(ValueError):
+        checker.update("the dog")
@@ -0,0 +1,70 @@
+import functools
+import sys
+import os
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from lib.checker import Checker
+from lib.ngram_store import NGramTable, Vocabulary
+from lib.trainer import Trainer
+
+bigrams = {("the", "dog"): 0.5, ("a", "cat"): 0.25, ("the", "cat"): 0.25}
+trigrams = {("^", "the", "dog"): 0.75, ("the", "dog", "$"): 0.25}
+vocabulary = Vocabulary(["the", "dog"])
+bigram_table = NGramTable.from_dict(bigrams, vocabulary, 2)
+trigram_table = NGramTable.from_dict(trigrams, vocabulary, 3)
+
+
+def test_vocabulary_ids():
+    assert vocabulary.ids["the"] == 0
+    assert vocabulary.add("dog") == 1
+    assert vocabulary.words[vocabulary.ids["cat"]] == "cat"
+
+
+def test_lookup():
+    assert bigram_table[("the", "dog")] == 0.5
+    assert trigram_table[("^", "the", "dog")] == 0.75
+    assert ("a", "cat") in bigram_table
+    assert ("dog", "the") not in bigram_table
+
+
+def test_missing_keys_not_inserted():
+    assert bigram_table[("the", "unseen")] == 0
+    assert bigram_table[("dog", "the")] == 0
+    assert bigram_table.get(("dog", "the")) is None
+    assert len(bigram_table) == 3
+
+
+def test_round_trip():
+    assert dict(bigram_table.items()) == bigrams
+    assert dict(trigram_table) == trigrams
+
+
+def test_vocabulary_too_large():
+    words = {str(i): 1 for i in range((1 << 21) + 1)}
+    with pytest.raises(ValueError):
+        NGramTable.from_dict({("0", "1", "2"): 1.0}, Vocabulary(words), 3)
+
+
+small_trainer = functools.partial(Trainer, corpus="corpus_test.txt")
+
+
+def test_compact_checker_matches():
+    checker = Checker(trainer=small_trainer)
+    compact = Checker(trainer=small_trainer, compact=True)
+    assert isinstance(compact.bigram_probs, NGramTable)
+    for sentence in ("the quikc brown fox", "jumpd ovr the lazy dgo"):
+        assert compact.check_sentence(sentence) == checker.check_sentence(sentence)
+    bigram = next(iter(checker.bigram_probs))
+    assert compact.bigram_prob(bigram) == checker.bigram_prob(bigram)
+
+
+def test_compact_checker_releases_dicts():
+    compact = Checker(trainer=small_trainer, keep_tables="counts", compact=True)
+    data = compact.model.data
+    assert data["bigram_probs"] is compact.bigram_probs
+    assert data["trigram_probs"] is compact.trigram_probs
+    assert "bigram_count" not in data and "trigram_count" not in data
+    with pytest.raises(ValueError):
+        compact.update("the dog")
@@ -0,0 +1,55 @@
+import functools
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from lib.checker import Checker
+from lib.profiling import FOCUS_FUNCTIONS, RequestProfiler, format_summary
+from lib.trainer import Trainer
+
+small_trainer = functools.partial(Trainer, corpus="corpus_test.txt")
+checker = Checker(trainer=small_trainer)
+
+
+def test_disabled_by_default():
+    profiler = RequestProfiler(sample_rate=1.0)
+    assert not profiler.should_profile(requested=True)
+
+
+def test_should_profile():
+    assert RequestProfiler(enabled=True).should_profile(requested=True)
+    assert not RequestProfiler(enabled=True).should_profile()
+    assert RequestProfiler(enabled=True, sample_rate=1.0).should_profile()
+
+
+def test_focus_breakdown():
+    profiler = RequestProfiler(enabled=True)
+    profile = profiler.start()
+    checker.correct("quikcly")
+    result = profiler.finish(profile, "test")
+    assert set(result["focus"]) == set(FOCUS_FUNCTIONS)
+    assert result["focus"]["get_candidates"]["calls"] == 1
+    assert result["focus"]["knowns"]["calls"] >= 1
+    assert result["focus"]["get_candidates"]["seconds"] <= result["total_seconds"]
+    assert result["file"] is None
+    assert "get_candidates" in format_summary(result)
+
+
+def test_one_profile_at_a_time():
+    profiler = RequestProfiler(enabled=True)
+    profile = profiler.start()
+    assert profiler.start() is None
+    profiler.finish(profile, "test")
+    profiler.finish(profiler.start(), "test")
+
+
+def test_saved_profiles_are_pruned(tmp_path):
+    profiler = RequestProfiler(enabled=True, directory=str(tmp_path), max_files=2)
+    names = []
+    for _ in range(3):
+        profile = profiler.start()
+        checker.correct("teh")
+        names.append(profiler.finish(profile, "api_check")["file"])
+    saved = sorted(os.listdir(tmp_path))
+    assert len(saved) == 2
+    assert names[-1] in saved
@@ -0,0 +1,55 @@
+import functools
+import sys
+import os
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from lib.checker import Checker
+from lib.distance import bounded_levenshtein
+from lib.scoring import EncodedWords, top_k
+from lib.trainer import Trainer
+
+small_trainer = functools.partial(Trainer, corpus="corpus_test.txt")
+
+
+def test_distances_match_levenshtein():
+    words = ["", "a", "dog", "doge", "quick", "kitten", "sitting", "naïve"]
+    encoded = EncodedWords(words)
+    for word in ("", "dgo", "kitten", "quikc", "naive"):
+        expected = [bounded_levenshtein(word, other) for other in words]
+        assert encoded.distances(word).tolist() == expected
+
+
+def test_top_k_breaks_ties_like_sort():
+    scores = np.array([0.5, 0.2, 0.5, 0.9, 0.2, 0.5, 0.1])
+    ranked = sorted(enumerate(scores.tolist()), key=lambda tup: tup[1])
+    ranked.reverse()
+    assert top_k(scores, 5) == [i for i, _ in ranked[:5]]
+    assert top_k(scores[:2], 5) == [0, 1]
+
+
+@pytest.mark.parametrize("ranking", ["full", "pruned"])
+def test_numpy_scoring_matches_python(ranking):
+    python = Checker(trainer=small_trainer, ranking=ranking, scoring="python")
+    vectorized = Checker(trainer=small_trainer, ranking=ranking, scoring="numpy")
+    assert vectorized.scoring == "numpy"
+    for sentence in ("the quikc brown fox", "a lazy dgo jumpd", "thh"):
+        assert vectorized.check_sentence(sentence) == python.check_sentence(sentence)
+
+
+def test_unknown_scoring_mode():
+    with pytest.raises(ValueError):
+        Checker(trainer=small_trainer, scoring="gpu")
+
+
+def test_vocabulary_refreshed_after_update():
+    python = Checker(trainer=small_trainer, scoring="python")
+    vectorized = Checker(trainer=small_trainer, scoring="numpy")
+    vectorized.check_sentence("the quikc fox")
+    for checker in (python, vectorized):
+        checker.update("The zorblax jumped over the fence")
+    for sentence in ("a zorblx jumpd", "the quikc brown fox"):
+        assert vectorized.check_sentence(sentence) == python.check_sentence(sentence)
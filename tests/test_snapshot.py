@@ -0,0 +1,61 @@
+import sys
+import os
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from lib.checker import Checker
+from lib.snapshot import load_snapshot
+from lib.trainer import Trainer
+
+trainer = Trainer(corpus="corpus_test.txt")
+
+
+@pytest.fixture
+def snapshot_path(tmp_path):
+    path = str(tmp_path / "model.snap")
+    trainer.save_snapshot(path)
+    return path
+
+
+def test_round_trip(snapshot_path):
+    data = load_snapshot(snapshot_path)
+    for name, table in trainer.data.items():
+        assert list(data[name].items()) == list(table.items())
+
+
+def test_defaults_preserved(snapshot_path):
+    data = load_snapshot(snapshot_path)
+    assert data["word_count"]["unseen"] == 1
+    assert data["trigram_probs"][("a", "b", "c")] == 0
+
+
+def test_checker_from_snapshot(snapshot_path):
+    checker = Checker(snapshot=snapshot_path)
+    assert checker.is_known("dog")
+    assert checker.correct("dgo") == "dog"
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "model.snap"
+    path.write_bytes(b"not a snapshot")
+    with pytest.raises(ValueError):
+        load_snapshot(str(path))
+
+
+def test_rejects_other_versions(snapshot_path):
+    with open(snapshot_path, "r+b") as f:
+        f.seek(8)
+        f.write(b"\xff\xff")
+    with pytest.raises(ValueError):
+        load_snapshot(snapshot_path)
+
+
+def test_load_selected_tables(snapshot_path):
+    data = load_snapshot(snapshot_path, tables=["word_count", "bigram_count"])
+    assert sorted(data) == ["bigram_count", "word_count"]
+    assert list(data["bigram_count"].items()) == list(
+        trainer.data["bigram_count"].items()
+    )
+    checker = Checker(snapshot=snapshot_path, keep_tables="counts")
+    assert checker.correct("dgo") == "dog"
@@ -0,0 +1,43 @@
+import functools
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from lib.checker import Checker
+from lib.symspell import DeletionIndex, damerau_levenshtein, deletes, within_distance
+from lib.trainer import Trainer
+
+small_trainer = functools.partial(Trainer, corpus="corpus_test.txt")
+checker = Checker(trainer=small_trainer)
+indexed_checker = Checker(trainer=small_trainer, use_index=True)
+
+
+def test_deletes():
+    assert deletes("abc", 1) == {"abc", "bc", "ac", "ab"}
+    assert "a" in deletes("abc", 2)
+
+
+def test_damerau_levenshtein():
+    assert damerau_levenshtein("teh", "the") == 1
+    assert damerau_levenshtein("ca", "abc") == 2
+    assert damerau_levenshtein("dog", "dog") == 0
+
+
+def test_within_distance_respects_alphabet():
+    # Apostrophes can be moved around but never inserted
+    assert within_distance("whats", "what's", 2) is False
+    assert within_distance("wha'ts", "what's", 1) is True
+
+
+def test_lookup():
+    index = DeletionIndex(["the", "dog", "fox"])
+    assert index.lookup("teh", 1) == {"the"}
+    assert index.lookup("dgo", 1) == {"dog"}
+    assert index.lookup("fx", 2) == {"fox"}
+
+
+def test_index_matches_edits():
+    typos = ["teh", "quikc", "brwn", "fx", "jmuped", "lzy", "dgo", "bunnny", "xyzzy"]
+    for typo in typos:
+        assert indexed_checker.get_candidates(typo) == checker.get_candidates(typo)
+        assert indexed_checker.correct(typo) == checker.correct(typo)
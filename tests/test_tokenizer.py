@@ -0,0 +1,71 @@
+import io
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from lib import tokenizer
+from lib.tokenizer import Token
+from lib.trainer import read_chunks
+
+
+def test_tokenize_spans():
+    text = "Teh café, isn't  it?"
+    tokens = list(tokenizer.tokenize(text))
+    assert [token.word for token in tokens] == ["teh", "café", "isn't", "it"]
+    assert [text[token.start : token.end] for token in tokens] == [
+        "Teh",
+        "café",
+        "isn't",
+        "it",
+    ]
+    assert list(tokenizer.tokenize(text, 4, 9)) == [Token(4, 8, "café")]
+
+
+def test_sentences_match_split():
+    text = "The dog. A CAT!\n\n , why? end"
+    expected = [
+        tokenizer.words(sentence)
+        for sentence in filter(None, tokenizer.SENTENCE_BOUNDARY.split(text))
+    ]
+    assert list(tokenizer.sentences(text)) == expected
+    for size in (1, 2, 5):
+        chunks = [text[i : i + size] for i in range(0, len(text), size)]
+        assert list(tokenizer.stream_sentences(chunks)) == expected
+
+
+def test_stream_sentences_across_chunks():
+    f = io.StringIO("Hello World!. What's up?\nThe quick brown fox")
+    sentences = list(tokenizer.stream_sentences(read_chunks(f, 4)))
+    assert sentences == [
+        ["hello", "world"],
+        ["what's", "up"],
+        ["the", "quick", "brown", "fox"],
+    ]
+
+
+def test_stream_tokens_across_chunks():
+    text = "Ths is a tst. Café dgo!"
+    expected = list(tokenizer.tokenize(text))
+    for size in (1, 3, 7):
+        chunks = [text[i : i + size] for i in range(0, len(text), size)]
+        tokens = list(tokenizer.stream_tokens(chunks))
+        assert [token for token, _ in tokens] == expected
+        assert all(text[t.start : t.end] == original for t, original in tokens)
+
+
+def test_stream_tokens_cuts_long_words():
+    tokens = list(tokenizer.stream_tokens(["ab", "cd", "ef"], max_length=3))
+    assert "".join(original for _, original in tokens) == "abcdef"
+    assert all(len(original) <= 4 for _, original in tokens)
+
+
+def test_rebuild_restores_case():
+    text = "Teh DGO sat, on teh mat."
+    fixes = {"teh": "the", "dgo": "dog"}
+    spans = [
+        (t.start, t.end, tokenizer.restore_case(text[t.start : t.end], fixes[t.word]))
+        for t in tokenizer.tokenize(text)
+        if t.word in fixes
+    ]
+    assert tokenizer.rebuild(text, spans) == "The DOG sat, on the mat."
+    assert tokenizer.rebuild(text, []) == text
@@ -2,7 +2,7 @@ import sys
 import os
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
-from lib.trainer import Trainer
+from lib.trainer import Trainer, shard_offsets
 
 trainer = Trainer(corpus="corpus_test.txt")
 
@@ -69,3 +69,48 @@ def test_get_prob():
     model = trainer.train_model(l)
     probs = trainer.get_probs(model)
     assert probs[("echo", "tango")] == (3 / 11)
+
+
+def test_streaming_matches_in_memory():
+    streamed = Trainer(corpus="corpus_test.txt", streaming=True, chunk_size=5)
+    assert streamed.corpus is None
+    for name, table in trainer.data.items():
+        assert list(streamed.data[name].items()) == list(table.items())
+
+
+def test_training_stats():
+    assert trainer.stats["bytes"] > 0
+    assert trainer.stats["mb_per_s"] >= 0
+
+
+def test_parallel_matches_serial(tmp_path):
+    corpus = tmp_path / "corpus.txt"
+    text = "Hello World!\r\nWhat's up? Café crème.\n" * 50 + "The quick brown fox"
+    corpus.write_bytes(text.encode("utf-8"))
+    serial = Trainer(corpus=str(corpus))
+    parallel = Trainer(corpus=str(corpus), workers=3)
+    for name, table in serial.data.items():
+        assert list(parallel.data[name].items()) == list(table.items())
+
+
+def test_shard_offsets_end_on_boundaries(tmp_path):
+    corpus = tmp_path / "corpus.txt"
+    corpus.write_bytes(b"one two. three four! five six\nseven")
+    shards = shard_offsets(str(corpus), 3)
+    assert shards[0][0] == 0 and shards[-1][1] == len(corpus.read_bytes())
+    for start, end in shards[:-1]:
+        assert corpus.read_bytes()[end - 1 : end] in (b".", b"!", b"?", b"\n")
+
+
+def test_update_matches_retraining(tmp_path):
+    base = "Hello World! What's up?\nThe quick brown fox"
+    extra = "The quick red fox. Hello there"
+    (tmp_path / "base.txt").write_text(base)
+    (tmp_path / "full.txt").write_text(base + "\n" + extra)
+    updated = Trainer(corpus=str(tmp_path / "base.txt"))
+    updated.update(extra)
+    retrained = Trainer(corpus=str(tmp_path / "full.txt"))
+    for name, table in retrained.data.items():
+        assert list(updated.data[name].items()) == list(table.items())
+    assert updated.data["bigram_probs"][("red", "unseen")] == 0
+    assert ("red", "unseen") not in updated.data["bigram_count"]
@@ -0,0 +1,39 @@
+import functools
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from lib.checker import Checker
+from lib.trainer import Trainer
+from lib.trie import VocabularyTrie
+
+trie = VocabularyTrie.from_counts({"the": 5, "then": 2, "they": 3, "dog": 4})
+
+
+def test_membership_and_counts():
+    assert len(trie) == 4
+    assert "then" in trie
+    assert "th" not in trie
+    assert trie.count("dog") == 4
+    assert trie.count("cat") == 0
+    assert sorted(trie) == ["dog", "the", "then", "they"]
+
+
+def test_search():
+    assert trie.search("teh", 1) == {"the": 5}
+    assert trie.search("thn", 1) == {"the": 5, "then": 2}
+    assert set(trie.search("tehy", 2)) == {"the", "then", "they"}
+    assert trie.search("xyz", 2) == {}
+
+
+def test_trainer_builds_trie():
+    trainer = Trainer(corpus="corpus_test.txt", build_trie=True)
+    assert set(trainer.data["trie"]) == set(trainer.data["word_count"])
+
+
+def test_trie_matches_edits():
+    small_trainer = functools.partial(Trainer, corpus="corpus_test.txt")
+    checker = Checker(trainer=small_trainer)
+    trie_checker = Checker(trainer=small_trainer, use_trie=True)
+    for typo in ["teh", "quikc", "brwn", "fx", "jmuped", "lzy", "dgo", "xyzzy"]:
+        assert trie_checker.get_candidates(typo) == checker.get_candidates(typo)